@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+
+from backtesting.seasonBacktest import (
+    STAGE_CACHE_DIR, STAT_KEYS, prepare_seasons, stage_keys, tournament_games, tournament_years
+)
+from mathHelpers.pairwise import pythagorean_log_ratio, pythagorean_probability, barthag_log5
+
+# Tunes the blend used by simulate_matchup / the backtest:
+#   p = log5_weight * p_log5 + pythag_weight * p_pythag + barthag_weight * p_barthag
+# (log5_weight = 1 - pythag_weight - barthag_weight) together with the
+# Pythagorean exponent, against every tournament game in data/cbb.csv.
+#
+# The three components are computed once per historical game and cached under
+# data/.cache/backtest. The Pythagorean one is stored as its log ratio, so any
+# exponent is one exp away. The search is then pure array work: a grid over
+# the weight simplex x exponent range, refined around the best point.
+
+COMPONENTS_VERSION = 1
+LOSSES = ('brier', 'log_loss')
+DEFAULT_WEIGHT_STEP = 0.05
+DEFAULT_EXPONENT_RANGE = (1.0, 20.0)
+DEFAULT_EXPONENT_STEP = 0.5
+# Blended probabilities evaluated per chunk (weights x exponents x games).
+CHUNK_ELEMENTS = 1 << 22
+
+
+def game_components(prepared):
+    """
+    One row per tournament game of a prepared season (upper team's view):
+    possession-model probability, Pythagorean log ratio, BARTHAG-log5
+    probability, outcome, round and the season's fitted exponent.
+    """
+    rounds, uppers, lowers, outcomes = tournament_games(prepared['wins'])
+    stats = prepared['stats']
+    log_oe = np.log(stats[:, STAT_KEYS.index('ADJOE')])
+    log_de = np.log(stats[:, STAT_KEYS.index('ADJDE')])
+    barthag = stats[:, STAT_KEYS.index('BARTHAG')]
+    return {
+        'year': np.full(len(rounds), int(prepared['year'])),
+        'round': rounds,
+        'log5': prepared['log5'][uppers, lowers],
+        # Stored as the log ratio so any exponent is one pythagorean_probability away.
+        'log_ratio': pythagorean_log_ratio(log_oe[uppers], log_de[uppers], log_oe[lowers], log_de[lowers]),
+        'barthag': barthag_log5(barthag[uppers], barthag[lowers]),
+        'outcome': outcomes,
+        'season_exponent': np.full(len(rounds), float(prepared['exponent']))
+    }
+
+
+def load_game_components(years=None, workers=1, use_cache=True):
+    """
+    Components of every tournament game in `years` (default: all), pooled into
+    one dict of arrays. The pooled table is cached, keyed by the seasons'
+    stage keys, so a warm run reads one file and never touches the stages.
+    Raises ValueError if none of the seasons has a usable tournament.
+    """
+    years = years or tournament_years()
+    digest = hashlib.sha1(repr(COMPONENTS_VERSION).encode())
+    for year in years:
+        digest.update(stage_keys(year)[1].encode())
+    path = STAGE_CACHE_DIR / f"components-{digest.hexdigest()[:16]}.npz"
+    if use_cache and path.exists():
+        with np.load(path, allow_pickle=False) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    prepared = prepare_seasons(years, workers, use_cache)
+    tables = [game_components(season) for season in prepared.values()]
+    if not tables:
+        raise ValueError(f"No tournament games to tune on in seasons {', '.join(str(year) for year in years)}")
+    components = {name: np.concatenate([table[name] for table in tables]) for name in tables[0]}
+    if use_cache:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, **components)
+        os.replace(tmp, path)
+    return components
+
+
+def simplex_weights(step, center=None, radius=None):
+    """
+    (W, 3) rows of (log5, pythag, barthag) weights on a `step` grid, all
+    non-negative and summing to 1; optionally only those within `radius` of
+    `center` in the pythag and barthag weights.
+    """
+    pythag, barthag = np.meshgrid(np.arange(0, 1 + step / 2, step), np.arange(0, 1 + step / 2, step), indexing='ij')
+    pythag, barthag = pythag.ravel(), barthag.ravel()
+    if center is not None:
+        pythag, barthag = pythag + center[1] - radius, barthag + center[2] - radius
+        near = (pythag <= center[1] + radius + 1e-12) & (barthag <= center[2] + radius + 1e-12)
+        pythag, barthag = pythag[near], barthag[near]
+    pythag, barthag = np.round(pythag, 10), np.round(barthag, 10)
+    valid = (pythag >= 0) & (barthag >= 0) & (pythag + barthag <= 1 + 1e-9)
+    pythag, barthag = pythag[valid], barthag[valid]
+    return np.column_stack([np.clip(1 - pythag - barthag, 0, 1), pythag, barthag])
+
+
+def blend_losses(components, weights, exponents, loss='brier', mask=None):
+    """
+    Loss of every (weights row, exponent) pair over the games in `mask`, as a
+    (W, E) array. Blended probabilities are built as a weights x exponents x
+    games tensor in chunks of exponents.
+    """
+    if loss not in LOSSES:
+        raise ValueError(f"loss must be one of {LOSSES}, got {loss!r}")
+    mask = slice(None) if mask is None else mask
+    log5, barthag = components['log5'][mask], components['barthag'][mask]
+    log_ratio, outcome = components['log_ratio'][mask], components['outcome'][mask]
+    weights, exponents = np.asarray(weights, dtype=float), np.atleast_1d(np.asarray(exponents, dtype=float))
+
+    # The log5 and BARTHAG terms do not depend on the exponent.
+    fixed = weights[:, 0, None] * log5 + weights[:, 2, None] * barthag           # (W, G)
+    losses = np.empty((len(weights), len(exponents)))
+    chunk = max(1, CHUNK_ELEMENTS // max(len(weights) * len(outcome), 1))
+    for start in range(0, len(exponents), chunk):
+        block = exponents[start:start + chunk]
+        pythag = pythagorean_probability(log_ratio, block[:, None])               # (E, G)
+        blended = fixed[:, None, :] + weights[:, 1, None, None] * pythag[None]   # (W, E, G)
+        if loss == 'brier':
+            losses[:, start:start + chunk] = np.mean((blended - outcome) ** 2, axis=2)
+        else:
+            blended = np.clip(blended, 1e-12, 1 - 1e-12)
+            losses[:, start:start + chunk] = -np.mean(outcome * np.log(blended) + (1 - outcome) * np.log(1 - blended), axis=2)
+    return losses
+
+
+def search(components, mask=None, loss='brier', weight_step=DEFAULT_WEIGHT_STEP,
+           exponent_range=DEFAULT_EXPONENT_RANGE, exponent_step=DEFAULT_EXPONENT_STEP, refine_rounds=3):
+    """
+    Grid over the weight simplex and exponent range, then `refine_rounds`
+    passes that re-grid around the best point at a quarter of the step.
+    Returns the best weights, exponent and loss. `exponent_at_bound` is True
+    when the Pythagorean term is used and its best exponent sits on an end of
+    `exponent_range`, i.e. the true optimum is probably outside the grid.
+    """
+    low, high = exponent_range
+    weights = simplex_weights(weight_step)
+    exponents = np.arange(low, high + exponent_step / 2, exponent_step)
+    evaluated = 0
+    for round_ in range(refine_rounds + 1):
+        losses = blend_losses(components, weights, exponents, loss, mask)
+        evaluated += losses.size
+        w, e = np.unravel_index(int(np.argmin(losses)), losses.shape)
+        best_weights, best_exponent, best_loss = weights[w], float(exponents[e]), float(losses[w, e])
+        if round_ == refine_rounds:
+            break
+        weights = simplex_weights(weight_step / 4, center=best_weights, radius=weight_step)
+        exponents = np.arange(max(low, best_exponent - exponent_step),
+                              min(high, best_exponent + exponent_step) + exponent_step / 8, exponent_step / 4)
+        weight_step, exponent_step = weight_step / 4, exponent_step / 4
+
+    games = len(components['outcome']) if mask is None else int(np.count_nonzero(mask))
+    tolerance = exponent_step / 2
+    at_bound = best_weights[1] > 0 and (best_exponent <= low + tolerance or best_exponent >= high - tolerance)
+    return {
+        'log5_weight': float(best_weights[0]),
+        'pythag_weight': float(best_weights[1]),
+        'barthag_weight': float(best_weights[2]),
+        'exponent': best_exponent,
+        'exponent_at_bound': bool(at_bound),
+        'loss': best_loss,
+        'games': games,
+        'evaluated': evaluated
+    }
+
+
+def baseline_loss(components, pythag_weight=0.10, barthag_weight=0.10, loss='brier', mask=None):
+    """Loss of fixed weights with each season's own fitted exponent (the backtest default)."""
+    mask = slice(None) if mask is None else mask
+    pythag = pythagorean_probability(components['log_ratio'][mask], components['season_exponent'][mask])
+    blended = ((1 - pythag_weight - barthag_weight) * components['log5'][mask]
+               + pythag_weight * pythag + barthag_weight * components['barthag'][mask])
+    outcome = components['outcome'][mask]
+    if loss == 'brier':
+        return float(np.mean((blended - outcome) ** 2))
+    blended = np.clip(blended, 1e-12, 1 - 1e-12)
+    return float(-np.mean(outcome * np.log(blended) + (1 - outcome) * np.log(1 - blended)))
+
+
+def tune(years=None, workers=1, loss='brier', weight_step=DEFAULT_WEIGHT_STEP, exponent_range=DEFAULT_EXPONENT_RANGE,
+         exponent_step=DEFAULT_EXPONENT_STEP, refine_rounds=3, use_cache=True):
+    """
+    Best blend weights and exponent for each season and for all seasons pooled.
+    Returns {'seasons': {year: result}, 'pooled': result}; each result also
+    carries `baseline_loss`, the loss of the current defaults.
+    """
+    components = load_game_components(years, workers, use_cache)
+    settings = dict(loss=loss, weight_step=weight_step, exponent_range=exponent_range,
+                    exponent_step=exponent_step, refine_rounds=refine_rounds)
+
+    seasons = {}
+    for year in np.unique(components['year']):
+        mask = components['year'] == year
+        seasons[int(year)] = dict(search(components, mask, **settings),
+                                  baseline_loss=baseline_loss(components, loss=loss, mask=mask))
+    pooled = dict(search(components, **settings), baseline_loss=baseline_loss(components, loss=loss))
+    return {'seasons': seasons, 'pooled': pooled, 'loss': loss}
+
+
+def print_tuning_report(results):
+    print(f"\n--- Blend Tuning ({results['loss']}) ---")
+    print(f"{'Season':<8}{'Games':>6}{'Log5':>7}{'Pythag':>8}{'Barthag':>9}{'Exp':>7}{'Loss':>9}{'Default':>9}")
+    rows = list(results['seasons'].items()) + [('Pooled', results['pooled'])]
+    for label, result in rows:
+        flag = "*" if result['exponent_at_bound'] else " "
+        print(f"{label!s:<8}{result['games']:>6}{result['log5_weight']:>7.3f}{result['pythag_weight']:>8.3f}"
+              f"{result['barthag_weight']:>9.3f}{result['exponent']:>7.2f}{flag}{result['loss']:>8.4f}{result['baseline_loss']:>9.4f}")
+    if any(result['exponent_at_bound'] for _, result in rows):
+        print("* exponent on the edge of --exponent-range; the best value is likely outside it (widen the range)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the blend weights and Pythagorean exponent over past tournaments.")
+    parser.add_argument("--years", type=int, nargs="*", help="seasons to use (default: all with results)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="workers for uncached stages")
+    parser.add_argument("--loss", choices=LOSSES, default='brier')
+    parser.add_argument("--weight-step", type=float, default=DEFAULT_WEIGHT_STEP)
+    parser.add_argument("--exponent-range", type=float, nargs=2, default=DEFAULT_EXPONENT_RANGE, metavar=("LOW", "HIGH"))
+    parser.add_argument("--exponent-step", type=float, default=DEFAULT_EXPONENT_STEP)
+    parser.add_argument("--refine-rounds", type=int, default=3)
+    parser.add_argument("--no-cache", action="store_true", help="recompute the stages and components")
+    args = parser.parse_args()
+
+    try:
+        results = tune(args.years, args.workers, args.loss, args.weight_step, tuple(args.exponent_range),
+                       args.exponent_step, args.refine_rounds, use_cache=not args.no_cache)
+    except ValueError as error:
+        print(error)
+        return
+    print_tuning_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 
 #from mathHelpers.simulator import simulate_matchup
-from mathHelpers.simulator import simulate_matchup
-import networkx as nx
-import matplotlib.pyplot as plt
+# Batched drop-in for simulator.simulate_matchup: same model, games simulated as arrays.
+from mathHelpers.simulator import simulate_matchup_batch
 
 
 # Initial matchups: Round of 64 (2025)
@@ -49,7 +48,7 @@ initial_matchups = [
 def simulate_round(matchups):
     winners = []
     for team1, team2 in matchups:
-        winner = simulate_matchup(team1, team2)
+        winner = simulate_matchup_batch(team1, team2, verbose=False)
         print(f"{team1} vs {team2} → Winner: {winner}")
         winners.append(winner)
     return winners
@@ -74,10 +73,11 @@ def simulate_tournament(initial_matchups):
 
     return rounds
 
-# Run the simulation
-rounds = simulate_tournament(initial_matchups)
-
 def visualize_bracket(rounds):
+    # Plotting libraries are only loaded when a bracket is drawn
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     G = nx.DiGraph()
     label_pos = {}
     pos = {}
@@ -106,4 +106,11 @@ def visualize_bracket(rounds):
     plt.title("March Madness Bracket Visualization")
     plt.axis('off')
     plt.show()
-visualize_bracket(rounds)
\ No newline at end of file
+
+def main():
+    # Run the simulation
+    rounds = simulate_tournament(initial_matchups)
+    visualize_bracket(rounds)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,14 +1,16 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-from collections import defaultdict
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # --- Section 1: Import all necessary simulation and data functions ---
 # Note the import from 'log5sim' (or whatever you named your main simulator file)
-from mathHelpers.log5sim import simulate_matchup 
-from helpers.getTeams import getTeams
+from mathHelpers.log5sim import simulate_matchup, build_matchup_matrices, matchup_win_probability
 from helpers.findTeam import findTeam
 from helperFunctions import data
-from helpers.prepare_stats import prepare_team_stats, calculate_league_averages
+from helpers.prepare_stats import prepare_team_stats, season_league_averages
+from helpers.matchupCache import MatchupCache, matchup_key as cache_key
+from mathHelpers.bracket import bracket_probabilities
+from mathHelpers.bracketStore import BracketStore, encode_bracket
+from helpers.instrumentation import timed, timer, count
 PYTHAGOREAN_EXPONENT = 4.386 # backtested variable
 
 # --- Section 2: Define the Tournament Bracket ---
@@ -33,9 +35,12 @@ initial_matchups = [
 
 
 # --- Section 3: Modified Simulation Functions for Monte Carlo Analysis ---
-def simulate_single_game(team1_name, team2_name, all_teams_csv, league_averages, exponent):
+@timed("prepare_matchup")
+def prepare_matchup(team1_name, team2_name, all_teams_csv, league_averages):
     """
-    Helper function to simulate just one game and return the winner.
+    Everything about a pairing that does not change between replicas: prepared
+    stats and both transition matrices. If data is missing, the entry only
+    records the team that advances by default.
     """
     team1_csv = findTeam(team1_name, all_teams_csv)
     team1_obj = data(team1_name)
@@ -43,49 +48,185 @@ def simulate_single_game(team1_name, team2_name, all_teams_csv, league_averages,
     team2_obj = data(team2_name)
 
     if not all((team1_csv, team1_obj, team2_csv, team2_obj)):
-        return team1_name if (team1_csv and team1_obj) else team2_name
+        return {'default_winner': team1_name if (team1_csv and team1_obj) else team2_name}
     
     team1_stats = prepare_team_stats(team1_csv, team1_obj)
     team2_stats = prepare_team_stats(team2_csv, team2_obj)
 
     if not team1_stats or not team2_stats:
-        return team1_name if team1_stats else team2_name
-        
-    return simulate_matchup(
-        team1_name, team1_stats,
-        team2_name, team2_stats,
-        league_averages,
-        exponent=exponent
-    )
-def run_monte_carlo_tournament(num_tournaments, initial_matchups, all_teams_csv, league_averages, exponent):
+        return {'default_winner': team1_name if team1_stats else team2_name}
+
+    return {
+        'default_winner': None,
+        'team1_stats': team1_stats,
+        'team2_stats': team2_stats,
+        'matrices': build_matchup_matrices(team1_stats, team2_stats, league_averages),
+        'win_prob': None
+    }
+
+def simulate_single_game(team1_name, team2_name, all_teams_csv, league_averages, exponent, cache=None, resolve_win_prob=False, rng=None):
     """
-    Runs the entire tournament simulation `num_tournaments` times.
+    Helper function to simulate just one game and return the winner, drawn
+    with `rng` from team1's blended win probability (so an upset happens as
+    often as the model says it should). With a MatchupCache the pairing's
+    setup is reused across calls; with `resolve_win_prob` the exact blended
+    probability is computed once per pairing and used for every later game
+    instead of re-simulating the matchup.
     """
-    matchup_win_counts = defaultdict(lambda: defaultdict(int))
-    
-    print(f"--- Running {num_tournaments} Full Tournament Simulations ---")
-    for i in range(num_tournaments):
-        print(f"\rSimulating Tournament {i + 1}/{num_tournaments}", end="")
+    key = cache_key(team1_name, team2_name, all_teams_csv, exponent=exponent)
+    entry = cache.get(key) if cache is not None else None
+    if entry is None:
+        entry = prepare_matchup(team1_name, team2_name, all_teams_csv, league_averages)
+        if cache is not None:
+            cache.put(key, entry)
+
+    if entry['default_winner']:
+        return entry['default_winner']
+
+    if resolve_win_prob:
+        if entry['win_prob'] is None:
+            entry['win_prob'] = matchup_win_probability(
+                entry['team1_stats'], entry['team2_stats'], league_averages, exponent, matrices=entry['matrices']
+            )
+        win_prob = entry['win_prob']
+    else:
+        win_prob = simulate_matchup(
+            team1_name, entry['team1_stats'],
+            team2_name, entry['team2_stats'],
+            league_averages,
+            exponent=exponent,
+            matrices=entry['matrices'],
+            rng=rng,
+            verbose=False
+        ).win_prob
+
+    rng = np.random.default_rng() if rng is None else rng
+    return team1_name if rng.random() < win_prob else team2_name
+
+def run_tournament_shard(replica_seeds, initial_matchups, all_teams_csv, league_averages, exponent, resolve_win_prob=False, cache=None):
+    """
+    Plays one tournament replica per seed, each with its own numpy Generator,
+    and returns the replicas' bracket codes (a uint64 array, see
+    mathHelpers.bracketStore) plus the shard's matchup-cache stats. Runs in a
+    worker process or in-process.
+    """
+    cache = MatchupCache() if cache is None else cache
+    codes = np.zeros(len(replica_seeds), dtype=np.uint64)
+    for replica, seed in enumerate(replica_seeds):
+        count("tournament.replicas")
+        rng = np.random.default_rng(seed)
         current_winners = [team for matchup in initial_matchups for team in matchup]
+        lower_won = []
         while len(current_winners) > 1:
             next_round_winners = []
             current_matchups = list(zip(current_winners[0::2], current_winners[1::2]))
             for team1, team2 in current_matchups:
                 # Pass the exponent to the game simulator
-                winner = simulate_single_game(team1, team2, all_teams_csv, league_averages, exponent)
+                with timer("tournament.game"):
+                    winner = simulate_single_game(team1, team2, all_teams_csv, league_averages, exponent, cache, resolve_win_prob, rng)
                 next_round_winners.append(winner)
-                matchup_key = tuple(sorted((team1, team2)))
-                matchup_win_counts[matchup_key][winner] += 1
+                lower_won.append(winner == team2)
             current_winners = next_round_winners
+        codes[replica] = encode_bracket(lower_won)
+    return codes, cache.stats()
+
+@timed("run_monte_carlo_tournament")
+def run_monte_carlo_tournament(num_tournaments, initial_matchups, all_teams_csv, league_averages, exponent, cache=None, resolve_win_prob=False, workers=1, seed=None, store=None):
+    """
+    Runs the entire tournament simulation `num_tournaments` times and returns
+    the whole-bracket outcome of every replica as a BracketStore (pass
+    `store`, e.g. BracketStore.create(path, teams), to append to a file; its
+    teams must be the field of `initial_matchups` in bracket order).
+
+    Replica i always draws from the i-th child of SeedSequence(seed) and is
+    stored at position i, so a given seed gives the same brackets whatever
+    `workers` is. With workers > 1 replicas are sharded across a process pool
+    (each worker keeps its own matchup cache).
+    """
+    replica_seeds = np.random.SeedSequence(seed).spawn(num_tournaments)
+    args = (initial_matchups, all_teams_csv, league_averages, exponent, resolve_win_prob)
+    teams = [team for matchup in initial_matchups for team in matchup]
+    if store is None:
+        store = BracketStore(teams)
+    elif store.teams != teams:
+        raise ValueError("store holds brackets for a different field than initial_matchups")
+    
+    print(f"--- Running {num_tournaments} Full Tournament Simulations ---")
+    if workers <= 1:
+        codes, stats = run_tournament_shard(replica_seeds, *args, cache=cache)
+        shard_stats = [stats]
+    else:
+        num_shards = min(num_tournaments, workers * 4)
+        codes = np.zeros(num_tournaments, dtype=np.uint64)
+        shard_stats = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_tournament_shard, replica_seeds[i::num_shards], *args): i for i in range(num_shards)}
+            for done, future in enumerate(as_completed(futures), 1):
+                shard_codes, stats = future.result()
+                codes[futures[future]::num_shards] = shard_codes
+                shard_stats.append(stats)
+                print(f"\rCompleted shard {done}/{num_shards}", end="")
+    store.append(codes)
     
     print("\n\n--- Monte Carlo Simulation Complete ---")
-    return matchup_win_counts
+    hits = sum(stats['hits'] for stats in shard_stats)
+    misses = sum(stats['misses'] for stats in shard_stats)
+    print(f"Matchup cache: {hits} hits, {misses} misses across {len(shard_stats)} shard(s)")
+    return store
+
+def make_win_prob_fn(all_teams_csv, league_averages, exponent, cache=None):
+    """
+    Pairwise win-probability function for `bracket_probabilities`: the exact
+    blended probability for each pairing, computed once through the matchup cache.
+    Teams with missing data win or lose with certainty, as in simulate_single_game.
+    """
+    cache = MatchupCache() if cache is None else cache
+
+    def win_prob(team1_name, team2_name):
+        key = cache_key(team1_name, team2_name, all_teams_csv, exponent=exponent)
+        entry = cache.get_or_create(key, lambda: prepare_matchup(team1_name, team2_name, all_teams_csv, league_averages))
+        if entry['default_winner']:
+            return 1.0 if entry['default_winner'] == team1_name else 0.0
+        if entry['win_prob'] is None:
+            entry['win_prob'] = matchup_win_probability(
+                entry['team1_stats'], entry['team2_stats'], league_averages, exponent, matrices=entry['matrices']
+            )
+        return entry['win_prob']
+
+    return win_prob
+
+def print_exact_bracket_odds(initial_matchups, all_teams_csv, league_averages, exponent, top=10):
+    """
+    Exact advancement odds for the whole field via the bracket DP. Prints the
+    top title contenders and returns the full result.
+    """
+    result = bracket_probabilities(initial_matchups, make_win_prob_fn(all_teams_csv, league_averages, exponent))
+    print(f"\n--- Exact Bracket Odds ({result['win_prob_calls']} pairings evaluated) ---")
+    widths = [max(len(name), 6) + 2 for name in result['rounds']]
+    print(f"{'Team':<25}" + "".join(f"{name:>{width}}" for name, width in zip(result['rounds'], widths)))
+    contenders = sorted(result['teams'], key=result['champion'].get, reverse=True)[:top]
+    for team in contenders:
+        print(f"{team:<25}" + "".join(f"{p:>{width}.1%}" for p, width in zip(result['table'][team].values(), widths)))
+    return result
+
+def print_bracket_summary(store, top=3):
+    """Most frequent full brackets of a Monte Carlo run and the simulated title odds."""
+    print(f"\n--- {len(store)} Simulated Brackets ---")
+    for rank, (code, hits, share) in enumerate(store.most_frequent(top), 1):
+        rounds = store.decode(code)
+        print(f"{rank}. {share:.2%} ({hits}x): Final Four {', '.join(rounds[-3])}; champion {rounds[-1][0]}")
+    champions = store.round_marginals()['champion']
+    contenders = [team for team in sorted(champions, key=champions.get, reverse=True)[:top] if champions[team] > 0]
+    print("Title odds: " + ", ".join(f"{team} {champions[team]:.1%}" for team in contenders))
 
 def determine_most_probable_bracket(initial_matchups, matchup_win_counts):
     """
-    Analyzes the win counts to build the single most probable bracket outcome.
+    Analyzes the win counts (a BracketStore or {matchup: {winner: count}}) to
+    build the single most probable bracket outcome.
     """
     print("Building most probable bracket...")
+    if isinstance(matchup_win_counts, BracketStore):
+        matchup_win_counts = matchup_win_counts.matchup_win_counts()
     all_rounds_winners = []
     
     current_winners = [team for matchup in initial_matchups for team in matchup]
@@ -112,6 +253,9 @@ def determine_most_probable_bracket(initial_matchups, matchup_win_counts):
 # --- Section 4: Your Visualization Function (Unchanged) ---
 def visualize_bracket(rounds):
     # ... (This function is perfect as is)
+    # Plotting libraries are only loaded when a bracket is drawn
+    import networkx as nx
+    import matplotlib.pyplot as plt
     G = nx.DiGraph(); labels = {}; pos = {}; y_gap = 1.5
     for r, winners in enumerate(rounds):
         x = r
@@ -131,9 +275,7 @@ def visualize_bracket(rounds):
 def main():
     """Main execution block for the Monte Carlo tournament simulation."""
     # ... (data loading) ...
-    all_teams_csv = getTeams("cbb25.csv")
-    if not all_teams_csv: return
-    league_averages = calculate_league_averages(all_teams_csv, data)
+    league_averages = season_league_averages("cbb25.csv")
     
     # Run the Monte Carlo simulation, passing the exponent
     matchup_results = run_monte_carlo_tournament(
@@ -145,6 +287,7 @@ def main():
     )
     
     most_probable_rounds = determine_most_probable_bracket(initial_matchups, matchup_results)
+    print_exact_bracket_odds(initial_matchups, "cbb25.csv", league_averages, PYTHAGOREAN_EXPONENT)
     visualize_bracket(most_probable_rounds)
 
 if __name__ == "__main__":
@@ -0,0 +1,427 @@
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from helpers.seasonData import load_season, CACHE_DIR as SEASON_CACHE_DIR
+from helpers.prepare_stats import season_league_averages
+from mathHelpers.log5sim import build_matchup_matrices_batch, analytic_matchup
+from mathHelpers.bracket import bracket_probabilities, most_likely_bracket
+from mathHelpers.pythagoreanExponent import season_exponent
+from mathHelpers.pairwise import pythagorean_matrix, barthag_matrix
+
+# Multi-season tournament backtest over data/cbb.csv (POSTSEASON, SEED, YEAR).
+#
+# Stages, each cached per season under data/.cache/backtest:
+#   1. field - the 64-team bracket rebuilt from seeds and results, prepared
+#              stats, league averages and the season's fitted exponent
+#   2. log5  - the possession-model win probability for every pairing
+#   3. score - blend with Pythagorean/BARTHAG and score (cheap, never cached)
+# Changing the blend weights only reruns stage 3.
+
+STAGE_CACHE_DIR = SEASON_CACHE_DIR.parent / "backtest"
+FIELD_STAGE_VERSION = 1
+LOG5_STAGE_VERSION = 1
+
+# Games won in the tournament for each POSTSEASON result (First Four losers are not in the field).
+POSTSEASON_WINS = {'R64': 0, 'R32': 1, 'S16': 2, 'E8': 3, 'F4': 4, '2ND': 5, 'Champions': 6}
+# Seed in each of a region's 16 slots, in bracket order.
+REGION_SLOT_SEEDS = [1, 16, 8, 9, 5, 12, 4, 13, 6, 11, 3, 14, 7, 10, 2, 15]
+FIELD_SIZE = 64
+ROUND_POINTS = [10, 20, 40, 80, 160, 320]
+ROUND_LABELS = ['Round of 64', 'Round of 32', 'Sweet 16', 'Elite 8', 'Final Four', 'Championship']
+
+# Prepared-stat keys, in column order of the cached stats array.
+STAT_KEYS = [
+    'p_turnover', 'p_shooting_foul', 'p_fga', '2P_pct', '3P_pct', 'FT_pct', '3PAr', 'ORB_pct',
+    'def_eFG_pct', 'def_TOV_pct', 'poss_per_g', 'def_ORB_pct', 'def_FTR', 'ADJOE', 'ADJDE', 'BARTHAG'
+]
+LEAGUE_KEYS = ['eFG_pct', 'TOV_pct', 'ORB_pct', 'FTR', 'PPG']
+# The season files have no free-throw percentage; roughly the D-I average.
+DEFAULT_FT_PCT = 0.70
+
+
+# --- Stage 1: season field and prepared stats ---
+
+def prepare_season_stats(season):
+    """
+    Prepared stats (STAT_KEYS columns) for every team in `season`, from the
+    barttorvik rate columns alone. Event shares follow prepare_team_stats:
+    a possession ends in a turnover with probability TOR, and the remaining
+    1 - TOR is split between shots and shooting-foul trips in the ratio
+    1 : 0.44 * FTR (FTR is free-throw attempts per shot, 0.44 trips per
+    attempt), i.e. p_fga = (1 - TOR) / (1 + 0.44 * FTR) and
+    p_shooting_foul = 0.44 * FTR * p_fga. The three-point attempt rate
+    comes from 3PR when present, otherwise it is solved from
+    eFG = 2P% * (1 - r) + 1.5 * 3P% * r.
+    """
+    tov = season['TOR'] / 100.0
+    ftr = season['FTR'] / 100.0
+    two_pct = season['2P_O'] / 100.0
+    three_pct = season['3P_O'] / 100.0
+    if '3PR' in season:
+        three_rate = season['3PR'] / 100.0
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            three_rate = (season['EFG_O'] / 100.0 - two_pct) / (1.5 * three_pct - two_pct)
+        three_rate = np.clip(np.nan_to_num(three_rate, nan=0.35), 0.0, 1.0)
+
+    shot_share = (1.0 - tov) / (1.0 + 0.44 * ftr)
+    columns = {
+        'p_turnover': tov,
+        'p_shooting_foul': 0.44 * ftr * shot_share,
+        'p_fga': shot_share,
+        '2P_pct': two_pct,
+        '3P_pct': three_pct,
+        'FT_pct': np.full(len(season), DEFAULT_FT_PCT),
+        '3PAr': three_rate,
+        'ORB_pct': season['ORB'] / 100.0,
+        'def_eFG_pct': season['EFG_D'] / 100.0,
+        'def_TOV_pct': season['TORD'] / 100.0,
+        'poss_per_g': season['ADJ_T'],
+        'def_ORB_pct': season['DRB'] / 100.0,
+        'def_FTR': season['FTRD'] / 100.0,
+        'ADJOE': season['ADJOE'],
+        'ADJDE': season['ADJDE'],
+        'BARTHAG': season['BARTHAG']
+    }
+    return np.column_stack([np.asarray(columns[key], dtype=float) for key in STAT_KEYS])
+
+
+def _subtrees_consistent(wins, filled, size):
+    """The aligned block of `size` slots ending at `filled` has exactly one team with log2(size)+ wins (its winner)."""
+    depth = size.bit_length() - 1
+    block = wins[filled - size:filled]
+    return np.count_nonzero(block >= depth) == 1
+
+
+def reconstruct_field(wins, seeds):
+    """
+    Places the 64 tournament teams into bracket order from seeds and wins.
+
+    `wins` and `seeds` are per-team arrays. Regions use REGION_SLOT_SEEDS;
+    a placement is accepted when every aligned subtree of 2^k slots holds
+    exactly one team with at least k wins, which is exactly the condition
+    for the results to be playable. Teams with the same seed and result are
+    interchangeable as far as the results show, so only one of each is tried
+    (the pairing between them cannot be recovered from the data). Seeds
+    present more than four times are treated as data errors: any of their
+    teams may fill a slot of a seed that is short. Returns a list of team
+    indices in bracket order, or None if no placement fits.
+    """
+    seeds = np.asarray(seeds, dtype=int)
+    wins = np.asarray(wins, dtype=int)
+    by_seed = {seed: [int(i) for i in np.flatnonzero(seeds == seed)] for seed in range(1, 17)}
+    floating = [team for teams in by_seed.values() if len(teams) > 4 for team in teams]
+    short = {seed for seed, teams in by_seed.items() if len(teams) < 4}
+
+    slot_seeds = REGION_SLOT_SEEDS * 4
+    order = []
+    placed_wins = np.zeros(FIELD_SIZE, dtype=int)
+    used = set()
+
+    def candidates(seed):
+        pool = by_seed[seed] + (floating if seed in short else [])
+        seen = set()
+        for team in pool:
+            if team not in used and (wins[team], seeds[team]) not in seen:
+                seen.add((wins[team], seeds[team]))
+                yield team
+
+    def place(slot):
+        if slot == FIELD_SIZE:
+            return True
+        for team in candidates(slot_seeds[slot]):
+            order.append(team)
+            used.add(team)
+            placed_wins[slot] = wins[team]
+            filled = slot + 1
+            size, ok = 2, True
+            while ok and size <= FIELD_SIZE and filled % size == 0:
+                ok = _subtrees_consistent(placed_wins, filled, size)
+                size *= 2
+            if ok and place(filled):
+                return True
+            order.pop()
+            used.discard(team)
+        return False
+
+    return list(order) if place(0) else None
+
+
+def _stage_path(year, stage, key):
+    return STAGE_CACHE_DIR / f"{year}-{stage}-{key[:16]}.npz"
+
+
+def _load_stage(year, stage, key):
+    path = _stage_path(year, stage, key)
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def _save_stage(year, stage, key, arrays):
+    path = _stage_path(year, stage, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def _hash_arrays(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(np.ascontiguousarray(part).tobytes() if isinstance(part, np.ndarray) else repr(part).encode())
+    return digest.hexdigest()
+
+
+def build_field_stage(year, season_file="cbb"):
+    """Stage 1 for one YEAR of data/cbb.csv. Returns a dict of arrays, or None if the field can't be rebuilt."""
+    data = load_season(season_file)
+    season = data.subset(np.flatnonzero(data['YEAR'] == year))
+    postseason = season['POSTSEASON'].tolist()
+    in_field = np.array([result in POSTSEASON_WINS for result in postseason])
+    field = np.flatnonzero(in_field)
+    if len(field) != FIELD_SIZE:
+        print(f"{year}: expected {FIELD_SIZE} tournament teams, found {len(field)}; skipping")
+        return None
+
+    wins = np.array([POSTSEASON_WINS[postseason[i]] for i in field])
+    order = reconstruct_field(wins, season['SEED'][field])
+    if order is None:
+        print(f"{year}: no bracket is consistent with the seeds and results; skipping")
+        return None
+    rows = field[order]
+
+    league = season_league_averages(season)
+    return {
+        'teams': season['TEAM'][rows],
+        'seeds': season['SEED'][rows],
+        'wins': wins[order],
+        'stats': prepare_season_stats(season)[rows],
+        'league': np.array([league[key] for key in LEAGUE_KEYS]),
+        'exponent': np.array(season_exponent(season))
+    }
+
+
+def build_log5_stage(field, max_steps_per_possession=15):
+    """
+    Stage 2: exact possession-model probability that the upper-bracket team
+    beats the lower one, for every pair of the field (any two teams can meet).
+    L[i, j] for i < j is that probability; L[j, i] = 1 - L[i, j].
+    """
+    league = dict(zip(LEAGUE_KEYS, field['league'].tolist()))
+    stats = field['stats']
+    n = len(stats)
+    # Every pair's two matrices in one pass: rows [0, P) attack as the upper team, [P, 2P) as the lower.
+    upper, lower = np.triu_indices(n, 1)
+    batch = build_matchup_matrices_batch(dict(zip(STAT_KEYS, stats.T)), league,
+                                         np.concatenate([upper, lower]), np.concatenate([lower, upper]))
+    matrices, num_pairs = batch['matrices'], len(upper)
+    possessions = (stats[upper, STAT_KEYS.index('poss_per_g')] + stats[lower, STAT_KEYS.index('poss_per_g')]) / 2
+    log5 = np.full((n, n), 0.5)
+    for k, (i, j) in enumerate(zip(upper.tolist(), lower.tolist())):
+        p = analytic_matchup(matrices[k], matrices[num_pairs + k], possessions[k], max_steps_per_possession)['p_win']
+        log5[i, j], log5[j, i] = p, 1.0 - p
+    return {'log5': log5}
+
+
+def stage_keys(year, max_steps_per_possession=15, season_file="cbb"):
+    """Cache keys of the field and log5 stages: hashes of the season's rows and the stage settings."""
+    data = load_season(season_file)
+    rows = np.flatnonzero(data['YEAR'] == year)
+    source_key = _hash_arrays(FIELD_STAGE_VERSION, *(data[name][rows] for name in sorted(data.columns)))
+    return source_key, _hash_arrays(LOG5_STAGE_VERSION, source_key, max_steps_per_possession)
+
+
+def prepare_season(year, use_cache=True, max_steps_per_possession=15, season_file="cbb"):
+    """Stages 1 and 2 for one season, each read from or written to the stage cache."""
+    source_key, log5_key = stage_keys(year, max_steps_per_possession, season_file)
+
+    field = _load_stage(year, "field", source_key) if use_cache else None
+    if field is None:
+        field = build_field_stage(year, season_file)
+        if field is None:
+            return None
+        if use_cache:
+            _save_stage(year, "field", source_key, field)
+
+    log5 = _load_stage(year, "log5", log5_key) if use_cache else None
+    if log5 is None:
+        log5 = build_log5_stage(field, max_steps_per_possession)
+        if use_cache:
+            _save_stage(year, "log5", log5_key, log5)
+    return dict(field, year=year, **log5)
+
+
+# --- Stage 3: blending and scoring ---
+
+def component_matrices(prepared, exponent=None):
+    """(log5, pythagorean, barthag) pairwise win-probability matrices for a prepared season."""
+    stats = prepared['stats']
+    exponent = float(prepared['exponent']) if exponent is None else exponent
+    adj_oe = stats[:, STAT_KEYS.index('ADJOE')]
+    adj_de = stats[:, STAT_KEYS.index('ADJDE')]
+    barthag = stats[:, STAT_KEYS.index('BARTHAG')]
+    pythag = pythagorean_matrix(adj_oe, adj_de, exponent)
+    return prepared['log5'], pythag, barthag_matrix(barthag)
+
+
+def blended_matrix(prepared, pythag_weight=0.10, barthag_weight=0.10, exponent=None):
+    log5, pythag, barthag = component_matrices(prepared, exponent)
+    log5_weight = 1.0 - pythag_weight - barthag_weight
+    blended = log5_weight * log5 + pythag_weight * pythag + barthag_weight * barthag
+    np.fill_diagonal(blended, 0.5)
+    return blended
+
+
+def tournament_games(wins):
+    """
+    Every game actually played, round by round, as arrays of (round, upper
+    team, lower team, upper team won) over bracket positions.
+    """
+    wins = np.asarray(wins)
+    rounds, uppers, lowers, outcomes = [], [], [], []
+    for r in range(int(np.log2(len(wins)))):
+        half = 1 << r
+        for start in range(0, len(wins), 2 * half):
+            upper = start + int(np.argmax(wins[start:start + half]))
+            lower = start + half + int(np.argmax(wins[start + half:start + 2 * half]))
+            rounds.append(r)
+            uppers.append(upper)
+            lowers.append(lower)
+            outcomes.append(wins[upper] > r)
+    return np.array(rounds), np.array(uppers), np.array(lowers), np.array(outcomes, dtype=float)
+
+
+def score_season(prepared, pythag_weight=0.10, barthag_weight=0.10, exponent=None):
+    """
+    Brier score, log loss, accuracy and bracket points per round for one
+    prepared season. The bracket is the pre-tournament most likely bracket
+    from the exact advancement odds; a pick earns ROUND_POINTS[r] when the
+    picked team won that game.
+    """
+    blended = blended_matrix(prepared, pythag_weight, barthag_weight, exponent)
+    rounds, uppers, lowers, outcomes = tournament_games(prepared['wins'])
+    p = np.clip(blended[uppers, lowers], 1e-12, 1 - 1e-12)
+
+    n = len(prepared['wins'])
+    initial = [(i, i + 1) for i in range(0, n, 2)]
+    picks = most_likely_bracket(bracket_probabilities(initial, lambda a, b: blended[a, b]))
+
+    per_round = []
+    for r in range(int(np.log2(n))):
+        games = rounds == r
+        correct_picks = sum(prepared['wins'][team] > r for team in picks[r + 1])
+        per_round.append({
+            'round': ROUND_LABELS[r],
+            'games': int(games.sum()),
+            'brier': float(np.mean((p[games] - outcomes[games]) ** 2)),
+            'log_loss': float(-np.mean(outcomes[games] * np.log(p[games]) + (1 - outcomes[games]) * np.log(1 - p[games]))),
+            'accuracy': float(np.mean((p[games] > 0.5) == (outcomes[games] == 1))),
+            'bracket_points': int(correct_picks * ROUND_POINTS[r])
+        })
+
+    return {
+        'year': int(prepared['year']),
+        'exponent': float(prepared['exponent']) if exponent is None else exponent,
+        'champion_pick': str(prepared['teams'][picks[-1][0]]),
+        'champion': str(prepared['teams'][int(np.argmax(prepared['wins']))]),
+        'brier': float(np.mean((p - outcomes) ** 2)),
+        'log_loss': float(-np.mean(outcomes * np.log(p) + (1 - outcomes) * np.log(1 - p))),
+        'accuracy': float(np.mean((p > 0.5) == (outcomes == 1))),
+        'bracket_points': sum(entry['bracket_points'] for entry in per_round),
+        'rounds': per_round
+    }
+
+
+def tournament_years(season_file="cbb"):
+    data = load_season(season_file)
+    years = data['YEAR'][np.isin(data['POSTSEASON'], list(POSTSEASON_WINS))]
+    return sorted(int(year) for year in np.unique(years))
+
+
+def prepare_seasons(years=None, workers=1, use_cache=True, max_steps_per_possession=15):
+    """Stages 1-2 for every season, in parallel when workers > 1. Returns {year: prepared}."""
+    years = years or tournament_years()
+    args = [(year, use_cache, max_steps_per_possession) for year in years]
+    if workers <= 1:
+        prepared = [prepare_season(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            prepared = list(pool.map(prepare_season, *zip(*args)))
+    return {year: season for year, season in zip(years, prepared) if season is not None}
+
+
+def run_backtest(years=None, workers=1, pythag_weight=0.10, barthag_weight=0.10, exponent=None, use_cache=True):
+    """
+    Backtests the blend over every tournament in data/cbb.csv (or `years`).
+    `exponent=None` uses each season's own fitted exponent. Returns
+    {'seasons': [per-season scores], 'overall': pooled scores}.
+    """
+    prepared = prepare_seasons(years, workers, use_cache)
+    seasons = [score_season(season, pythag_weight, barthag_weight, exponent) for season in prepared.values()]
+
+    overall = {}
+    if seasons:
+        games = sum(round_['games'] for round_ in seasons[0]['rounds'])
+        overall = {
+            'seasons': len(seasons),
+            'games': games * len(seasons),
+            'brier': float(np.mean([season['brier'] for season in seasons])),
+            'log_loss': float(np.mean([season['log_loss'] for season in seasons])),
+            'accuracy': float(np.mean([season['accuracy'] for season in seasons])),
+            'bracket_points': float(np.mean([season['bracket_points'] for season in seasons])),
+            'rounds': [
+                {
+                    'round': label,
+                    'brier': float(np.mean([season['rounds'][r]['brier'] for season in seasons])),
+                    'log_loss': float(np.mean([season['rounds'][r]['log_loss'] for season in seasons])),
+                    'accuracy': float(np.mean([season['rounds'][r]['accuracy'] for season in seasons])),
+                    'bracket_points': float(np.mean([season['rounds'][r]['bracket_points'] for season in seasons]))
+                }
+                for r, label in enumerate(ROUND_LABELS)
+            ]
+        }
+    return {'seasons': seasons, 'overall': overall}
+
+
+def print_backtest_report(results):
+    print("\n--- Tournament Backtest ---")
+    print(f"{'Year':<6}{'Exp':>7}{'Brier':>9}{'LogLoss':>9}{'Acc':>7}{'Points':>8}  Champion pick / actual")
+    for season in results['seasons']:
+        print(f"{season['year']:<6}{season['exponent']:>7.3f}{season['brier']:>9.4f}{season['log_loss']:>9.4f}"
+              f"{season['accuracy']:>7.1%}{season['bracket_points']:>8}  {season['champion_pick']} / {season['champion']}")
+
+    overall = results['overall']
+    if not overall:
+        return
+    print(f"\nAll {overall['seasons']} seasons ({overall['games']} games): Brier {overall['brier']:.4f}, "
+          f"log loss {overall['log_loss']:.4f}, accuracy {overall['accuracy']:.1%}, "
+          f"bracket points {overall['bracket_points']:.1f}")
+    print(f"\n{'Round':<16}{'Brier':>9}{'LogLoss':>9}{'Acc':>7}{'Points':>8}")
+    for round_ in overall['rounds']:
+        print(f"{round_['round']:<16}{round_['brier']:>9.4f}{round_['log_loss']:>9.4f}"
+              f"{round_['accuracy']:>7.1%}{round_['bracket_points']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the blended model over past tournaments in data/cbb.csv.")
+    parser.add_argument("--years", type=int, nargs="*", help="seasons to run (default: all with results)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pythag-weight", type=float, default=0.10)
+    parser.add_argument("--barthag-weight", type=float, default=0.10)
+    parser.add_argument("--exponent", type=float, help="fixed Pythagorean exponent (default: fit per season)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    args = parser.parse_args()
+
+    results = run_backtest(args.years, args.workers, args.pythag_weight, args.barthag_weight,
+                           args.exponent, use_cache=not args.no_cache)
+    print_backtest_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Checks PageFetcher against a local stub server standing in for
+sports-reference (through `base_url`), with no network access needed:
+
+  - 429 responses are retried, honouring Retry-After, until a 200 arrives
+  - a stale cached page is revalidated with If-None-Match and a 304 reuses it
+  - offline=True re-parses cached team pages without making a request
+  - cache=None fetches every time and writes nothing to disk
+
+    python benchmarks/fetcher_check.py
+
+Exits with status 1 if any check fails.
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.parse_benchmark import synthetic_team_page
+from scraperFunctions.generalScraper import scrape_teams, team_page_path
+from scraperFunctions.pageFetcher import PageFetcher, ResponseCache
+
+TEAM = "stub-state"
+ETAG = '"v1"'
+BUSY_RESPONSES = 2
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /busy answers 429 (Retry-After: 0) BUSY_RESPONSES times, then 200. Team
+    pages are a synthetic school page with an ETag, answered with 304 when
+    If-None-Match matches. Every request's path and headers are recorded.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+            hits = sum(1 for path, _ in server.requests if path == self.path)
+        if self.path == "/busy" and hits <= BUSY_RESPONSES:
+            self._reply(429, b"", {"Retry-After": "0"})
+        elif self.path == "/busy":
+            self._reply(200, b"ok")
+        elif self.path == team_page_path(TEAM):
+            if self.headers.get("If-None-Match") == ETAG:
+                self._reply(304, b"", {"ETag": ETAG})
+            else:
+                self._reply(200, synthetic_team_page().encode("utf-8"), {"ETag": ETAG})
+        else:
+            self._reply(404, b"")
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def fetcher_for(server, cache, **kwargs):
+    return PageFetcher(base_url=f"http://127.0.0.1:{server.server_port}", requests_per_minute=None,
+                       backoff=0.01, timeout=5, cache=cache, **kwargs)
+
+
+def run_checks(cache_dir):
+    """[(check name, passed)] for every check."""
+    results = []
+    quiet = io.StringIO()
+    with stub_server() as server, contextlib.redirect_stdout(quiet):
+        # --- 429 retry / backoff ---
+        fetcher = fetcher_for(server, cache=None)
+        body = fetcher.fetch("/busy")
+        results.append(("429 retried until 200", body == "ok" and fetcher.stats['retries'] == BUSY_RESPONSES))
+
+        # --- ETag revalidation (max_age=0 makes every cached entry stale) ---
+        cache = ResponseCache(cache_dir, max_age=0)
+        fetcher = fetcher_for(server, cache)
+        first = fetcher.fetch(team_page_path(TEAM))
+        second = fetcher.fetch(team_page_path(TEAM))
+        sent = [headers.get("If-None-Match") for path, headers in server.requests if path == team_page_path(TEAM)]
+        results.append(("ETag sent as If-None-Match", sent == [None, ETAG]))
+        results.append(("304 reuses the cached body", first is not None and second == first and fetcher.stats['revalidated'] == 1))
+
+        # --- Offline re-parse ---
+        before = len(server.requests)
+        offline = fetcher_for(server, cache, offline=True)
+        parsed = scrape_teams([TEAM, "not-cached"], offline)
+        results.append(("offline re-parse makes no requests", len(server.requests) == before and offline.stats['requests'] == 0))
+        results.append(("offline re-parse reads the cached page", parsed[TEAM] is not None and parsed["not-cached"] is None))
+
+        # --- No cache ---
+        fetcher = fetcher_for(server, cache=None)
+        fetcher.fetch(team_page_path(TEAM))
+        fetcher.fetch(team_page_path(TEAM))
+        results.append(("cache=None always fetches", fetcher.stats['requests'] == 2 and fetcher.stats['revalidated'] == 0))
+        results.append(("cache=None writes nothing", fetcher.cache is None and ResponseCache().load(fetcher.url(team_page_path(TEAM))) is None))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = run_checks(cache_dir)
+    for name, passed in results:
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+    if not all(passed for _, passed in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
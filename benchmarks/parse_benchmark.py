@@ -0,0 +1,110 @@
+"""
+Benchmarks the team-page parse stage over saved pages.
+
+Pages come from a directory of saved .html files (the scraper's response
+cache, data/.cache/pages, by default). Without any, it falls back to
+benchmarks/samples/synthetic_team_page.html: a generated page with the
+table layout of a sports-reference school page, not a real download, so
+the numbers are always comparable between backends.
+
+    python benchmarks/parse_benchmark.py [--pages DIR] [--repeat N]
+    python benchmarks/parse_benchmark.py --write-sample   # regenerate the checked-in synthetic page
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+from scraperFunctions.generalScraper import (
+    TEAM_COUNT_STATS, OPP_COUNT_STATS, PCT_STATS, extract_stat_cells, lxml_html
+)
+from scraperFunctions.pageFetcher import CACHE_DIR
+
+SYNTHETIC_PAGE = Path(__file__).parent / "samples" / "synthetic_team_page.html"
+SYNTHETIC_NOTE = ("<!-- Synthetic page shaped like a sports-reference school season page, not a real\n"
+                  "     download (written by benchmarks/parse_benchmark.py --write-sample). -->\n")
+PLAYER_STATS = ["games", "mp", "fg", "fga", "fg_pct", "fg2", "fg2a", "fg2_pct", "fg3", "fg3a", "fg3_pct",
+                "ft", "fta", "ft_pct", "orb", "drb", "trb", "ast", "stl", "blk", "tov", "pf", "pts"]
+
+
+def _row(cells, header="player", label=""):
+    tds = "".join(f'<td class="right " data-stat="{stat}" >{value}</td>' for stat, value in cells)
+    return f'<tr ><th scope="row" class="left " data-stat="{header}" >{label}</th>{tds}</tr>\n'
+
+
+def synthetic_team_page(num_players=15):
+    """A page with the same table layout (and roughly the size) of a school season page."""
+    team = [(stat, 1000 + 7 * i) for i, stat in enumerate(TEAM_COUNT_STATS)] + [(stat, ".456") for stat in PCT_STATS if not stat.startswith("opp_")]
+    opponent = [(stat, 900 + 5 * i) for i, stat in enumerate(OPP_COUNT_STATS)] + [(stat, ".432") for stat in PCT_STATS if stat.startswith("opp_")]
+    players = "".join(_row([(stat, 10 + i) for stat in PLAYER_STATS], label=f"Player {i}") for i in range(num_players))
+    advanced = "".join(_row([("per", 15.1), ("ws", 2.2), ("bpm", 1.5 + i)], label=f"Player {i}") for i in range(num_players))
+    filler = "".join(f'<div class="note"><p>Game {i} recap <a href="/boxscores/{i}.html">box score</a></p></div>\n' for i in range(400))
+    return f"""<!DOCTYPE html><html><head><title>Sample Team</title></head><body>
+<div id="wrap"><div id="info"><h1>Sample Team</h1></div>
+<table id="season-total_per_game"><thead><tr><th>Team</th></tr></thead><tbody>
+{_row(team, label="Team")}{_row(opponent, label="Opponent")}</tbody></table>
+<table id="players_per_game"><tbody>{players}</tbody></table>
+<table id="players_advanced"><tbody>{advanced}</tbody>
+<tfoot>{_row([("per", 20.0), ("ws", 25.0), ("bpm", 9.8)], label="Team Totals")}</tfoot></table>
+<!-- <table id="players_totals"><tbody>{players}</tbody></table> -->
+{filler}</div></body></html>"""
+
+
+def legacy_extract(html):
+    """The old approach: build a BeautifulSoup tree and find() each stat separately."""
+    soup = BeautifulSoup(html, "html.parser")
+    return {stat: soup.find("td", {"data-stat": stat}) for stat in TEAM_COUNT_STATS + OPP_COUNT_STATS + list(PCT_STATS)}
+
+
+def load_pages(directory):
+    return [path.read_text(encoding="utf-8") for path in sorted(Path(directory).glob("*.html"))]
+
+
+def time_backend(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", default=CACHE_DIR, help="directory of saved team pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--write-sample", action="store_true", help=f"write {SYNTHETIC_PAGE.name} and exit")
+    args = parser.parse_args()
+
+    if args.write_sample:
+        SYNTHETIC_PAGE.parent.mkdir(parents=True, exist_ok=True)
+        SYNTHETIC_PAGE.write_text(SYNTHETIC_NOTE + synthetic_team_page(), encoding="utf-8")
+        print(f"Wrote {SYNTHETIC_PAGE}")
+        return
+
+    pages_dir = args.pages
+    pages = load_pages(pages_dir) if Path(pages_dir).is_dir() else []
+    source = f"{len(pages)} saved pages from {pages_dir}"
+    if not pages:
+        pages = [SYNTHETIC_PAGE.read_text(encoding="utf-8") if SYNTHETIC_PAGE.exists() else synthetic_team_page()]
+        source = f"1 synthetic page ({SYNTHETIC_PAGE.name})"
+    print(f"Parsing {source} ({sum(map(len, pages)) / len(pages) / 1024:.0f} KB average)")
+
+    backends = {"bs4 find x45 (legacy)": legacy_extract,
+                "stdlib single pass": lambda html: extract_stat_cells(html, "stdlib")}
+    if lxml_html is not None:
+        backends["lxml single pass"] = lambda html: extract_stat_cells(html, "lxml")
+    else:
+        print("lxml not installed; skipping the lxml backend")
+
+    for name, fn in backends.items():
+        per_page = time_backend(fn, pages, args.repeat)
+        print(f"{name:<24} {per_page * 1000:8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Offline benchmark suite for the simulation and data hot paths.
+
+Every benchmark uses fixed seeds and only checked-in data (data/*.csv,
+stats2025.csv and the synthetic team page in benchmarks/samples), so runs
+are comparable across commits on the same machine.
+
+    python benchmarks/run.py                          # run all, print a table
+    python benchmarks/run.py --output results.json    # also write JSON
+    python benchmarks/run.py --compare baseline.json  # flag regressions
+    python benchmarks/run.py --filter matchup         # only matching names
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+
+SYNTHETIC_PAGE = Path(__file__).parent / "samples" / "synthetic_team_page.html"
+SEED = 12345
+TEAM1, TEAM2 = "duke", "houston"
+EXPONENT = 4.386
+# A result slower than baseline median by more than this fraction is a regression.
+DEFAULT_THRESHOLD = 0.15
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallows the prints the simulators and loaders make."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _matchup_setup():
+    """League averages, prepared stats and matrices for TEAM1 vs TEAM2 (not timed)."""
+    from helpers.findTeam import findTeam
+    from helperFunctions import data
+    from helpers.prepare_stats import prepare_team_stats, season_league_averages
+    from mathHelpers.log5sim import build_matchup_matrices
+
+    with quiet():
+        league_averages = season_league_averages("cbb25.csv")
+        stats1 = prepare_team_stats(findTeam(TEAM1, "cbb25.csv"), data(TEAM1))
+        stats2 = prepare_team_stats(findTeam(TEAM2, "cbb25.csv"), data(TEAM2))
+    matrices = build_matchup_matrices(stats1, stats2, league_averages)
+    possessions = (stats1["poss_per_g"] + stats2["poss_per_g"]) / 2
+    return league_averages, stats1, stats2, matrices, possessions
+
+
+# --- Benchmarks: each returns (callable, calls per timing, number of timings) ---
+
+def bench_log5sim_simulate_game():
+    from mathHelpers.log5sim import simulate_game
+    _, _, _, (m1, m2), possessions = _matchup_setup()
+    np.random.seed(SEED)
+    return lambda: simulate_game(m1, m2, possessions), 1, 5
+
+
+def bench_simulator_simulate_game():
+    with quiet():
+        from mathHelpers.simulator import simulate_game, create_transition_matrix, points_per_state
+        from mathHelpers.bayesian import probabilities
+        from helpers.findTeam import findTeam
+        team1, team2 = findTeam(TEAM1, "cbb25.csv"), findTeam(TEAM2, "cbb25.csv")
+        possessions = (float(team1["ADJ_T"]) + float(team2["ADJ_T"])) / 2
+        m1 = create_transition_matrix(probabilities(team1, team2, possessions))
+        m2 = create_transition_matrix(probabilities(team2, team1, possessions))
+    np.random.seed(SEED)
+    return lambda: simulate_game(m1, m2, points_per_state, possessions), 1, 5
+
+
+def bench_simulator_batch():
+    from mathHelpers.simulator import batch_matchup, MatchupCache
+    cache = MatchupCache()
+    with quiet():
+        batch_matchup(TEAM1, TEAM2, 10, cache=cache)
+    return lambda: batch_matchup(TEAM1, TEAM2, 1000, np.random.default_rng(SEED), cache=cache), 1, 5
+
+
+def bench_possession_engine():
+    from mathHelpers.log5sim import points_per_state
+    from mathHelpers.possessionEngine import simulate_team_games
+    _, _, _, (m1, _), possessions = _matchup_setup()
+    points = np.array(list(points_per_state.values()))
+    return lambda: simulate_team_games(m1, points, round(possessions), 10000, np.random.default_rng(SEED)), 1, 5
+
+
+def bench_matrices_batch():
+    from helpers.seasonData import load_season
+    from backtesting.seasonBacktest import STAT_KEYS, prepare_season_stats
+    from helpers.prepare_stats import season_league_averages
+    from mathHelpers.log5sim import build_matchup_matrices_batch
+    season = load_season("cbb25.csv")
+    stats = dict(zip(STAT_KEYS, prepare_season_stats(season)[:64].T))
+    league_averages = season_league_averages(season)
+    return lambda: build_matchup_matrices_batch(stats, league_averages), 1, 10
+
+
+def _bench_simulate_matchup(num_simulations, repeat):
+    def setup():
+        from mathHelpers.log5sim import simulate_matchup
+        league_averages, stats1, stats2, matrices, _ = _matchup_setup()
+
+        def run():
+            with quiet():
+                simulate_matchup(TEAM1, stats1, TEAM2, stats2, league_averages, EXPONENT,
+                                 num_simulations=num_simulations, rng=np.random.default_rng(SEED))
+        return run, 1, repeat
+    return setup
+
+
+def bench_tournament_replica():
+    from backtesting.marchmadness2025log5 import run_monte_carlo_tournament, initial_matchups
+    league_averages = _matchup_setup()[0]
+
+    def run():
+        with quiet():
+            run_monte_carlo_tournament(1, initial_matchups, "cbb25.csv", league_averages, EXPONENT, seed=SEED)
+    return run, 1, 3
+
+
+def bench_best_pythagorean_exponent():
+    with quiet():
+        from mathHelpers.pythagoreanExponent import best_pythagorean_exponent
+
+    def run():
+        with quiet():
+            best_pythagorean_exponent("cbb25.csv")
+    return run, 1, 5
+
+
+def bench_calculate_league_averages():
+    from helpers.getTeams import getTeams
+    from helperFunctions import data
+    from helpers.prepare_stats import calculate_league_averages
+
+    def run():
+        with quiet():
+            calculate_league_averages(getTeams("cbb25.csv"), data)
+    return run, 10, 5
+
+
+def bench_data_lookup():
+    from helperFunctions import data
+    data(TEAM1)
+    return lambda: data(TEAM1), 1000, 5
+
+
+def bench_data_cold_load():
+    from helperFunctions import data
+    from helpers.teamRepository import invalidate_repositories
+
+    def run():
+        invalidate_repositories()
+        data(TEAM1)
+    return run, 10, 5
+
+
+def bench_parse_synthetic_html():
+    """Parses the generated sample page (same table layout as a school page, not a real download)."""
+    from scraperFunctions.generalScraper import parse_team_html
+    html = SYNTHETIC_PAGE.read_text(encoding="utf-8")
+
+    def run():
+        with quiet():
+            parse_team_html(html, "sample")
+    return run, 1, 10
+
+
+BENCHMARKS = {
+    "log5sim.simulate_game": bench_log5sim_simulate_game,
+    "simulator.simulate_game": bench_simulator_simulate_game,
+    "simulator.batch_matchup[1000]": bench_simulator_batch,
+    "possessionEngine.simulate_team_games[10000]": bench_possession_engine,
+    "build_matchup_matrices_batch[4032 pairs]": bench_matrices_batch,
+    "simulate_matchup[100]": _bench_simulate_matchup(100, 10),
+    "simulate_matchup[1000]": _bench_simulate_matchup(1000, 5),
+    "simulate_matchup[10000]": _bench_simulate_matchup(10000, 3),
+    "run_monte_carlo_tournament[1 replica]": bench_tournament_replica,
+    "best_pythagorean_exponent": bench_best_pythagorean_exponent,
+    "calculate_league_averages": bench_calculate_league_averages,
+    "helperFunctions.data": bench_data_lookup,
+    "helperFunctions.data[cold]": bench_data_cold_load,
+    "scrape_team_data[parse synthetic html]": bench_parse_synthetic_html,
+}
+
+
+def time_benchmark(setup):
+    """Seconds per call: min, median and mean over the timings."""
+    fn, number, repeat = setup()
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def compare(results, baseline, threshold):
+    """Per-benchmark ratio of median time to the baseline's; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'Benchmark':<40}{'Baseline':>12}{'Current':>12}{'Ratio':>8}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<40}{'-':>12}{_format_time(result['median']):>12}{'new':>8}")
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<40}{_format_time(base['median']):>12}{_format_time(result['median']):>12}{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def _format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON from an earlier --output run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown fraction before flagging a regression (default %(default)s)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    selected = {name: setup for name, setup in BENCHMARKS.items() if not args.filter or args.filter in name}
+    results = {}
+    print(f"{'Benchmark':<40}{'Median':>12}{'Min':>12}")
+    for name, setup in selected.items():
+        results[name] = time_benchmark(setup)
+        print(f"{name:<40}{_format_time(results[name]['median']):>12}{_format_time(results[name]['min']):>12}")
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
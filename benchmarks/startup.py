@@ -0,0 +1,76 @@
+"""
+Startup benchmark for the CLI: how long a fresh process takes to print one
+matchup prediction.
+
+    python benchmarks/startup.py                  # 5 runs of cbbpredict matchup duke houston
+    python benchmarks/startup.py --runs 10 --budget 0.2
+
+Each run is a new interpreter. "first prediction" is measured inside the
+process from before `import cbbpredict` to the printed result (imports, data
+loading and the model), which is what the budget applies to; "process" is
+the wall time of the whole command including interpreter startup.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+COMMAND = ["matchup", "duke", "houston"]
+DEFAULT_BUDGET = 0.200
+DEFAULT_RUNS = 5
+
+PROBE = (
+    "import time, io, contextlib\n"
+    "start = time.perf_counter()\n"
+    "import cbbpredict\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    cbbpredict.main({command!r})\n"
+    "print(time.perf_counter() - start)\n"
+)
+# Modules a single matchup must not pull in.
+HEAVY_MODULES = ("scipy", "networkx", "matplotlib")
+
+
+def run_once(command):
+    """(seconds to first prediction inside the process, process wall seconds)."""
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", PROBE.format(command=command)], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1]), time.perf_counter() - start
+
+
+def heavy_imports(command):
+    """Heavy modules loaded while running `command` (should be empty for a matchup)."""
+    probe = (f"import sys, io, contextlib\nimport cbbpredict\n"
+             f"with contextlib.redirect_stdout(io.StringIO()):\n    cbbpredict.main({command!r})\n"
+             f"print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}} & set({HEAVY_MODULES!r}))))\n")
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return output.strip().splitlines()[-1].split() if output.strip() else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a fresh-process cbbpredict matchup.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds allowed to first prediction")
+    args = parser.parse_args()
+
+    run_once(COMMAND)  # warm the OS file cache and the season cache
+    first, process = zip(*(run_once(COMMAND) for _ in range(args.runs)))
+    print(f"cbbpredict {' '.join(COMMAND)} ({args.runs} fresh processes)")
+    print(f"  first prediction: median {statistics.median(first) * 1e3:.0f} ms, min {min(first) * 1e3:.0f} ms")
+    print(f"  whole process:    median {statistics.median(process) * 1e3:.0f} ms, min {min(process) * 1e3:.0f} ms")
+
+    loaded = heavy_imports(COMMAND)
+    if loaded:
+        print(f"  heavy modules imported: {', '.join(loaded)}")
+    if statistics.median(first) > args.budget or loaded:
+        print(f"Over budget ({args.budget * 1e3:.0f} ms, no {', '.join(HEAVY_MODULES)})")
+        sys.exit(1)
+    print(f"Within budget ({args.budget * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Command-line entry point for one-off predictions.
+
+    python cbbpredict.py matchup duke houston            # exact possession model
+    python cbbpredict.py matchup duke houston --mode simulation --sims 5000
+    python cbbpredict.py bracket                          # exact 2025 advancement odds
+    python cbbpredict.py bracket --simulate 1000 --plot   # Monte Carlo + most probable bracket
+    python cbbpredict.py bracket --simulate 100000 --save runs/2025.u64
+    python cbbpredict.py fit-exponent cbb24.csv cbb25.csv
+    python cbbpredict.py scrape [--offline] [--full]
+
+Only argparse is imported up front; every subcommand imports what it needs
+when it runs, so a single matchup never loads scipy, networkx or matplotlib.
+"""
+import argparse
+import sys
+
+DEFAULT_SEASON = "cbb25.csv"
+DEFAULT_EXPONENT = 4.386
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _league_context(season):
+    """League averages for `season`, from the columnar season loader."""
+    from helpers.prepare_stats import season_league_averages
+
+    return season_league_averages(season)
+
+
+def cmd_matchup(args):
+    import numpy as np
+    from helpers.findTeam import findTeam
+    from helperFunctions import data
+    from helpers.prepare_stats import prepare_team_stats
+    from mathHelpers.log5sim import simulate_matchup, format_matchup_result
+
+    league_averages = _league_context(args.season)
+    stats = []
+    for team in (args.team1, args.team2):
+        csv_row, team_obj = findTeam(team, args.season), data(team)
+        prepared = prepare_team_stats(csv_row, team_obj) if csv_row and team_obj else None
+        if prepared is None:
+            print(f"Could not get stats for {team}")
+            return 1
+        stats.append(prepared)
+
+    rng = np.random.default_rng(args.seed)
+    result = simulate_matchup(
+        args.team1, stats[0], args.team2, stats[1], league_averages, args.exponent,
+        pythag_weight=args.pythag_weight, barthag_weight=args.barthag_weight,
+        num_simulations=args.sims, rng=rng, mode=args.mode, verbose=False
+    )
+    print(format_matchup_result(result))
+    return 0
+
+
+def cmd_bracket(args):
+    from backtesting import marchmadness2025log5 as tournament
+
+    league_averages = _league_context(args.season)
+    if not args.simulate:
+        tournament.print_exact_bracket_odds(tournament.initial_matchups, args.season, league_averages, args.exponent)
+        return 0
+
+    store = None
+    if args.save:
+        from mathHelpers.bracketStore import BracketStore
+        teams = [team for matchup in tournament.initial_matchups for team in matchup]
+        store = BracketStore.open_or_create(args.save, teams)
+        if store.teams != teams:
+            print(f"{args.save} holds brackets for a different field; choose another --save path")
+            return 1
+    results = tournament.run_monte_carlo_tournament(
+        args.simulate, tournament.initial_matchups, args.season, league_averages, args.exponent,
+        workers=args.workers, seed=args.seed, store=store
+    )
+    tournament.print_bracket_summary(results)
+    rounds = tournament.determine_most_probable_bracket(tournament.initial_matchups, results)
+    if args.plot:
+        tournament.visualize_bracket(rounds)
+    return 0
+
+
+def cmd_fit_exponent(args):
+    from mathHelpers.pythagoreanExponent import best_pythagorean_exponents
+
+    exponents = best_pythagorean_exponents(args.files or None, mode=args.mode)
+    return 0 if all(value is not None for value in exponents.values()) else 1
+
+
+def cmd_scrape(args):
+    import scraper
+
+    scraper.main(offline=args.offline, full=args.full)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cbbpredict", description="College basketball game predictions.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    matchup = subcommands.add_parser("matchup", help="predict one game")
+    matchup.add_argument("team1")
+    matchup.add_argument("team2")
+    matchup.add_argument("--mode", choices=("analytic", "simulation", "adaptive"), default="analytic")
+    matchup.add_argument("--sims", type=positive_int, default=5000, help="simulations (budget in adaptive mode)")
+    matchup.add_argument("--pythag-weight", type=float, default=0.10)
+    matchup.add_argument("--barthag-weight", type=float, default=0.0)
+    matchup.add_argument("--exponent", type=float, default=DEFAULT_EXPONENT)
+    matchup.add_argument("--season", default=DEFAULT_SEASON)
+    matchup.add_argument("--seed", type=int)
+    matchup.set_defaults(func=cmd_matchup)
+
+    bracket = subcommands.add_parser("bracket", help="2025 tournament odds")
+    bracket.add_argument("--simulate", type=int, metavar="N", help="run N Monte Carlo replicas instead of the exact odds")
+    bracket.add_argument("--workers", type=int, default=1)
+    bracket.add_argument("--plot", action="store_true", help="draw the most probable bracket (needs networkx and matplotlib)")
+    bracket.add_argument("--save", metavar="PATH", help="append every replica's bracket to PATH, creating it if needed (8 bytes each, see BracketStore.open)")
+    bracket.add_argument("--exponent", type=float, default=DEFAULT_EXPONENT)
+    bracket.add_argument("--season", default=DEFAULT_SEASON)
+    bracket.add_argument("--seed", type=int)
+    bracket.set_defaults(func=cmd_bracket)
+
+    fit = subcommands.add_parser("fit-exponent", help="fit the Pythagorean exponent per season file")
+    fit.add_argument("files", nargs="*", help="season files in data/ (default: every cbbXX.csv)")
+    fit.add_argument("--mode", choices=("grid", "coarse", "golden"), default="grid")
+    fit.set_defaults(func=cmd_fit_exponent)
+
+    scrape = subcommands.add_parser("scrape", help="refresh stats2025.csv from Sports Reference")
+    scrape.add_argument("--offline", action="store_true", help="re-parse cached pages only")
+    scrape.add_argument("--full", action="store_true", help="scrape every team, not just those that played")
+    scrape.set_defaults(func=cmd_scrape)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,6 @@
-from helpers.getTeams import getTeams
+from helpers.teamRepository import DATA_DIR, get_repository
 
 def findTeam(teamName, file):
-    teams = getTeams(file)
-    for team in teams: 
-        if team['Team'] == teamName:
-            return team
-        
+    """The team's row of data/<file> as a fresh dict (callers may modify it), or None."""
+    row = get_repository(DATA_DIR / f"{file}", 'Team').get(teamName)
+    return dict(row) if row is not None else None
@@ -1,12 +1,10 @@
-import csv
-from pathlib import Path
+from helpers.teamRepository import DATA_DIR, get_repository
 
 
 def getTeams(file):
-    filepath = Path(__file__).parent.parent / "data" / f"{file}"
-    teams = []
-    with open(filepath, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            teams.append(row)
-    return teams
+    """
+    All rows of data/<file> as dicts. The file is parsed once per process;
+    each call returns fresh copies so callers may modify them.
+    """
+    repository = get_repository(DATA_DIR / f"{file}", 'Team')
+    return [dict(row) for row in repository.rows()]
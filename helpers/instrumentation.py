@@ -0,0 +1,140 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import time
+
+# Set CBB_INSTRUMENT=1 to collect timings and counters for the whole run; a
+# summary table is printed at exit and the metrics are written as JSON to
+# CBB_METRICS_FILE (default metrics.json). Disabled, every hook is a flag
+# check and nothing else.
+ENV_FLAG = "CBB_INSTRUMENT"
+ENV_OUTPUT = "CBB_METRICS_FILE"
+DEFAULT_OUTPUT = "metrics.json"
+
+_enabled = False
+_output = None
+_exit_hook_registered = False
+_timers = {}    # name -> [calls, total seconds, max seconds]
+_counters = {}  # name -> count
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(output=None, report_at_exit=True):
+    """Starts collecting. With report_at_exit the summary and JSON dump happen at interpreter exit."""
+    global _enabled, _output, _exit_hook_registered
+    _enabled = True
+    _output = output or os.environ.get(ENV_OUTPUT) or DEFAULT_OUTPUT
+    if report_at_exit and not _exit_hook_registered:
+        atexit.register(_report_at_exit)
+        _exit_hook_registered = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    _timers.clear()
+    _counters.clear()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        entry = _timers.get(self.name)
+        if entry is None:
+            _timers[self.name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+        return False
+
+
+def timer(name):
+    """Context manager timing the block under `name` (a shared no-op when disabled)."""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name=None):
+    """Decorator timing every call under `name` (default module.function)."""
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Timer(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Adds `n` to counter `name` when enabled."""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot():
+    """Current metrics as plain dicts: {'timers': {name: {...}}, 'counters': {name: n}}."""
+    return {
+        "timers": {
+            name: {"calls": calls, "total": total, "mean": total / calls, "max": longest}
+            for name, (calls, total, longest) in _timers.items()
+        },
+        "counters": dict(_counters)
+    }
+
+
+def summary_table():
+    metrics = snapshot()
+    lines = [f"{'Stage':<48}{'Calls':>9}{'Total s':>11}{'Mean ms':>11}{'Max ms':>11}"]
+    for name, entry in sorted(metrics["timers"].items(), key=lambda item: -item[1]["total"]):
+        lines.append(f"{name:<48}{entry['calls']:>9}{entry['total']:>11.3f}"
+                     f"{entry['mean'] * 1000:>11.3f}{entry['max'] * 1000:>11.3f}")
+    if metrics["counters"]:
+        lines.append("")
+        lines.append(f"{'Counter':<48}{'Count':>9}")
+        for name, value in sorted(metrics["counters"].items()):
+            lines.append(f"{name:<48}{value:>9}")
+    return "\n".join(lines)
+
+
+def dump(path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot(), file, indent=2)
+
+
+def _report_at_exit():
+    if not (_timers or _counters):
+        return
+    print("\n--- Instrumentation ---")
+    print(summary_table())
+    try:
+        dump(_output)
+        print(f"Metrics written to {_output}")
+    except OSError as e:
+        print(f"Error writing metrics to {_output}: {e}")
+
+
+if os.environ.get(ENV_FLAG, "").strip().lower() not in ("", "0", "false", "no"):
+    enable()
@@ -0,0 +1,85 @@
+import weakref
+from collections import OrderedDict
+
+# Every live MatchupCache, so a stats refresh can drop the pairings it affects.
+_live_caches = weakref.WeakSet()
+
+
+def matchup_key(team_a, team_b, season, **params):
+    """Cache key for one ordered pairing under one season file and set of model params."""
+    return (team_a, team_b, season, tuple(sorted(params.items())))
+
+
+class MatchupCache:
+    """
+    LRU cache of per-pairing setup work (prepared stats, transition matrices,
+    resolved win probability) so repeated tournament replicas pay it once per
+    distinct pairing. Entries are plain dicts; hit/miss/eviction counters are
+    kept for reporting.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _live_caches.add(self)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def get_or_create(self, key, factory):
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, factory())
+        return entry
+
+    def invalidate_teams(self, teams):
+        """Drops every pairing that involves one of `teams`. Returns how many entries went."""
+        teams = {str(team).strip().lower() for team in teams}
+        stale = [key for key in self._entries
+                 if str(key[0]).strip().lower() in teams or str(key[1]).strip().lower() in teams]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+def invalidate_teams(teams):
+    """invalidate_teams on every live cache in the process. Returns the total entries dropped."""
+    return sum(cache.invalidate_teams(teams) for cache in list(_live_caches))
@@ -1,6 +1,11 @@
 # stats_calculator.py
+import numpy as np
 
+from helpers.instrumentation import timed
+from helpers.seasonData import load_season
 
+
+@timed("prepare_team_stats")
 def prepare_team_stats(team_csv_data, team_object_data):
     """
     Calculates true, normalized, and mutually exclusive per-possession event rates.
@@ -49,6 +54,7 @@ def prepare_team_stats(team_csv_data, team_object_data):
         return None
 
 
+@timed("calculate_league_averages")
 def calculate_league_averages(all_teams_raw_data, get_team_obj_func):
     league_totals = {'eFG_pct': 0, 'TOV_pct': 0, 'ORB_pct': 0, 'FTR': 0, 'PPG': 0}
     num_teams = 0
@@ -64,4 +70,21 @@ def calculate_league_averages(all_teams_raw_data, get_team_obj_func):
     league_averages = {key: (total / num_teams) / 100.0 for key, total in league_totals.items()}
     print("\nCalculated League Averages (from CSV):")
     for key, val in league_averages.items(): print(f"  {key}: {val:.3f}")
-    return league_averages
\ No newline at end of file
+    return league_averages
+
+
+def season_league_averages(season):
+    """
+    calculate_league_averages for a season file or SeasonData, from its
+    column arrays (load_season) and without printing. Files with the older
+    header names (EFG%, ...) work too.
+    """
+    season = load_season(season)
+    averages = {
+        'eFG_pct': np.nanmean(season['EFG_O']),
+        'TOV_pct': np.nanmean(season['TOR']),
+        'ORB_pct': np.nanmean(season['ORB']),
+        'FTR': np.nanmean(season['FTR']),
+        'PPG': np.nanmean(season['ADJOE']) * 100
+    }
+    return {key: float(value) / 100.0 for key, value in averages.items()}
\ No newline at end of file
@@ -0,0 +1,207 @@
+import csv
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+from helpers.teamRepository import DATA_DIR, normalize_team_name
+from helpers.instrumentation import timer
+
+CACHE_DIR = DATA_DIR / ".cache" / "seasons"
+CACHE_VERSION = 1
+
+# The season files disagree on a few header names; columns are stored under the canonical name.
+COLUMN_ALIASES = {"Team": "TEAM", "EFG%": "EFG_O", "EFGD%": "EFG_D", "EFGD_D": "EFG_D"}
+TEXT_COLUMNS = ("TEAM", "CONF", "POSTSEASON")
+MISSING_VALUES = ("", "NA", "N/A")
+
+
+def season_file(season):
+    """File name for a season given as 'cbb25.csv', 'cbb25', 25 or 2025."""
+    if isinstance(season, str) and not season.isdigit():
+        return season if season.endswith(".csv") else f"{season}.csv"
+    return f"cbb{int(season) % 100:02d}.csv"
+
+
+class SeasonData:
+    """
+    One season file as typed NumPy columns: numeric columns are float64 with
+    NaN for missing values, TEAM/CONF/POSTSEASON are fixed-width strings.
+    Columns loaded from the binary cache are read-only memory maps, so worker
+    processes share the same pages. `index` maps normalized team names to
+    row numbers (first row wins, as in TeamRepository).
+    """
+
+    def __init__(self, source, columns):
+        self.source = source
+        self.columns = columns
+        self.index = {}
+        for i, name in enumerate(columns["TEAM"].tolist()):
+            self.index.setdefault(normalize_team_name(name), i)
+
+    @property
+    def teams(self):
+        return self.columns["TEAM"]
+
+    def __getitem__(self, column):
+        return self.columns[COLUMN_ALIASES.get(column, column)]
+
+    def __contains__(self, column):
+        return COLUMN_ALIASES.get(column, column) in self.columns
+
+    def __len__(self):
+        return len(self.columns["TEAM"])
+
+    def team_index(self, team):
+        """Row number of `team`, or None."""
+        return self.index.get(normalize_team_name(team))
+
+    def row(self, team):
+        """{column: value} for `team` as Python scalars, or None."""
+        i = self.team_index(team)
+        if i is None:
+            return None
+        return {name: values[i].item() for name, values in self.columns.items()}
+
+    def subset(self, mask):
+        """A SeasonData over the rows selected by a boolean mask or index array (e.g. one YEAR of cbb.csv)."""
+        return SeasonData(self.source, {name: values[mask] for name, values in self.columns.items()})
+
+
+def _parse_csv(path):
+    """Parses a season CSV once into {canonical column: typed array}."""
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = [COLUMN_ALIASES.get(name.strip(), name.strip()) for name in next(reader)]
+        raw = [row for row in reader if row]
+
+    columns = {}
+    for j, name in enumerate(header):
+        values = [row[j].strip() if j < len(row) else "" for row in raw]
+        if name not in TEXT_COLUMNS:
+            try:
+                columns[name] = np.array(
+                    [np.nan if value in MISSING_VALUES else float(value) for value in values], dtype=np.float64
+                )
+                continue
+            except ValueError:
+                pass  # Not numeric after all; keep it as text
+        columns[name] = np.array(values, dtype=str)
+    return columns
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _source_hash(path):
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def _cache_paths(path, cache_dir):
+    directory = Path(cache_dir) / Path(path).stem
+    return directory, directory / "meta.json"
+
+
+def _column_file(name):
+    return re.sub(r"[^A-Za-z0-9_]", lambda m: f"%{ord(m.group()):02X}", name) + ".npy"
+
+
+def _read_cache(path, cache_dir, mmap):
+    """Columns from the cache if it matches the source (by mtime/size, else by content hash), or None."""
+    directory, meta_path = _cache_paths(path, cache_dir)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION:
+        return None
+
+    signature = _source_signature(path)
+    if meta["signature"] != signature:
+        # Touched but unchanged (e.g. a fresh checkout): re-stamp instead of re-parsing.
+        if meta["sha1"] != _source_hash(path):
+            return None
+        meta["signature"] = signature
+        _write_json(meta_path, meta)
+
+    try:
+        return {
+            name: np.load(directory / _column_file(name), mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in meta["columns"]
+        }
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path, obj):
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as file:
+        json.dump(obj, file)
+    os.replace(tmp, path)
+
+
+def _write_cache(path, cache_dir, columns):
+    """One .npy per column, then meta.json last so a partial write is never picked up."""
+    directory, meta_path = _cache_paths(path, cache_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, values in columns.items():
+        target = directory / _column_file(name)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as file:
+            np.save(file, values, allow_pickle=False)
+        os.replace(tmp, target)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": str(path),
+        "signature": _source_signature(path),
+        "sha1": _source_hash(path),
+        "columns": list(columns)
+    }
+    _write_json(meta_path, meta)
+
+
+_seasons = {}
+
+
+def load_season(season, cache=True, mmap=True, cache_dir=CACHE_DIR):
+    """
+    The SeasonData for a season file under data/ (see season_file for the
+    accepted forms). Parsed CSVs are cached as .npy columns under
+    data/.cache/seasons and reused until the source changes; the result is
+    also kept in-process until the file's mtime or size changes. A SeasonData
+    is returned as is, so functions taking a season accept either.
+    """
+    if isinstance(season, SeasonData):
+        return season
+    path = DATA_DIR / season_file(season)
+    key = (os.path.abspath(path), cache, mmap)
+    signature = _source_signature(path)
+    loaded = _seasons.get(key)
+    if loaded is not None and loaded[0] == signature:
+        return loaded[1]
+
+    with timer("load_season.read_cache"):
+        columns = _read_cache(path, cache_dir, mmap) if cache else None
+    if columns is None:
+        with timer("load_season.parse_csv"):
+            columns = _parse_csv(path)
+        if cache:
+            with timer("load_season.write_cache"):
+                _write_cache(path, cache_dir, columns)
+            if mmap:
+                columns = _read_cache(path, cache_dir, mmap) or columns
+    season_data = SeasonData(path.name, columns)
+    _seasons[key] = (signature, season_data)
+    return season_data
+
+
+def clear_season_cache():
+    """Drops the in-process season memo (the on-disk cache is left alone)."""
+    _seasons.clear()
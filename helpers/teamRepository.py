@@ -0,0 +1,122 @@
+import csv
+import os
+from pathlib import Path
+
+from helpers.instrumentation import timer, count
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def normalize_team_name(name):
+    """Key used for every team lookup: case- and whitespace-insensitive."""
+    return str(name).strip().lower()
+
+
+class TeamRepository:
+    """
+    Loads one team CSV once and indexes its rows by normalized team name.
+
+    Rows are plain CSV dicts; `get_record` additionally builds (and keeps) an
+    object per team through `record_factory`, e.g. a TeamStats, and `derived`
+    keeps whole-file structures such as a TeamStatsTable. Every lookup
+    stats the file and re-reads it if its mtime or size changed; `invalidate`
+    forces a re-read on the next lookup and `reload` does it immediately. A
+    reload keeps the built records of rows whose contents did not change.
+    A missing file raises FileNotFoundError, as open() would.
+    """
+
+    def __init__(self, path, key_column, record_factory=None):
+        self.path = Path(path)
+        self.key_column = key_column
+        self.record_factory = record_factory
+        self._signature = None
+        self._rows = []
+        self._index = {}
+        self._records = {}
+        self._derived = {}
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self):
+        signature = self._file_signature()
+        with timer("load.csv"), open(self.path, 'r', newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        count("load.csv.rows", len(rows))
+
+        index = {}
+        for row in rows:
+            name = row.get(self.key_column)
+            if name:
+                index.setdefault(normalize_team_name(name), row)
+        records = {key: record for key, record in self._records.items() if self._index.get(key) == index.get(key)}
+        self._rows, self._index, self._records, self._derived = rows, index, records, {}
+        self._signature = signature
+
+    def refresh(self):
+        """Re-reads the file if it changed on disk. Returns True if it was reloaded."""
+        signature = self._file_signature()
+        if signature is not None and signature == self._signature:
+            return False
+        self.reload()
+        return True
+
+    def invalidate(self):
+        self._signature = None
+
+    def rows(self):
+        self.refresh()
+        return self._rows
+
+    def get(self, team):
+        """The CSV row for `team`, or None."""
+        self.refresh()
+        return self._index.get(normalize_team_name(team))
+
+    def get_record(self, team):
+        """The `record_factory` object for `team`, built on first use, or None."""
+        self.refresh()
+        key = normalize_team_name(team)
+        if key not in self._records:
+            row = self._index.get(key)
+            if row is None:
+                return None
+            self._records[key] = self.record_factory(row) if self.record_factory else row
+        return self._records[key]
+
+    def derived(self, name, build):
+        """`build(rows)` for the current file contents, built once per load under `name`."""
+        self.refresh()
+        if name not in self._derived:
+            self._derived[name] = build(self._rows)
+        return self._derived[name]
+
+    def __contains__(self, team):
+        return self.get(team) is not None
+
+    def __len__(self):
+        return len(self.rows())
+
+
+_repositories = {}
+
+
+def get_repository(path, key_column, record_factory=None):
+    """The process-wide repository for `path`, created on first use."""
+    key = (os.path.abspath(path), key_column)
+    repository = _repositories.get(key)
+    if repository is None:
+        repository = _repositories[key] = TeamRepository(path, key_column, record_factory)
+    elif record_factory is not None and repository.record_factory is None:
+        repository.record_factory = record_factory
+    return repository
+
+
+def invalidate_repositories():
+    """Forces every repository to re-read its file on the next lookup."""
+    for repository in _repositories.values():
+        repository.invalidate()
@@ -0,0 +1,75 @@
+import numpy as np
+
+# Columns of the advancement table: the round a team reaches by winning each game.
+ROUND_NAMES = ['Round of 32', 'Sweet 16', 'Elite 8', 'Final Four', 'Championship Game', 'Champion']
+
+
+def bracket_probabilities(initial_matchups, win_prob_fn):
+    """
+    Exact advancement odds for a single-elimination bracket, no simulation.
+
+    `initial_matchups` lists first-round pairs in bracket order (winners of
+    adjacent pairs meet next round). `win_prob_fn(team_a, team_b)` returns the
+    probability that team_a beats team_b; it is called once per pairing that
+    can actually occur (at most n*(n-1)/2 calls), with team_a from the upper
+    half of the subtree where the two teams would meet.
+
+    Round by round, a team's chance to win its subtree is its chance to reach
+    the game times the sum over possible opponents of (opponent reaches the game)
+    x (team beats opponent). Returns a dict with the team order, round names,
+    the team x round `advancement` array, a per-team `table`, `champion` odds
+    and the number of `win_prob_fn` calls made.
+    """
+    teams = [team for matchup in initial_matchups for team in matchup]
+    num_teams = len(teams)
+    num_rounds = num_teams.bit_length() - 1
+    if num_teams < 2 or num_teams != 1 << num_rounds:
+        raise ValueError(f"Bracket needs a power-of-two number of teams, got {num_teams}")
+
+    reach = np.ones(num_teams)
+    advancement = np.zeros((num_teams, num_rounds))
+    calls = 0
+    for r in range(num_rounds):
+        half = 1 << r
+        next_reach = np.zeros(num_teams)
+        for start in range(0, num_teams, 2 * half):
+            upper = slice(start, start + half)
+            lower = slice(start + half, start + 2 * half)
+            wins = np.array([
+                [win_prob_fn(team_a, team_b) for team_b in teams[lower]]
+                for team_a in teams[upper]
+            ], dtype=float)
+            calls += wins.size
+            next_reach[upper] = reach[upper] * (wins @ reach[lower])
+            next_reach[lower] = reach[lower] * ((1.0 - wins).T @ reach[upper])
+        reach = next_reach
+        advancement[:, r] = reach
+
+    names = ROUND_NAMES[-num_rounds:]
+    return {
+        'teams': teams,
+        'rounds': names,
+        'advancement': advancement,
+        'table': {team: dict(zip(names, row)) for team, row in zip(teams, advancement.tolist())},
+        'champion': {team: float(p) for team, p in zip(teams, advancement[:, -1])},
+        'win_prob_calls': calls
+    }
+
+
+def most_likely_bracket(result):
+    """
+    Builds a bracket round by round, advancing from each game whichever of the
+    two previous-round picks is more likely to win that round. Returns the list
+    of winners per round in the format used by the bracket visualizations (the
+    first entry is the full field).
+    """
+    teams, advancement = result['teams'], result['advancement']
+    index = {team: i for i, team in enumerate(teams)}
+    rounds = [list(teams)]
+    for r in range(advancement.shape[1]):
+        previous = rounds[-1]
+        rounds.append([
+            max(pair, key=lambda team: advancement[index[team], r])
+            for pair in zip(previous[0::2], previous[1::2])
+        ])
+    return rounds
@@ -0,0 +1,250 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from mathHelpers.bracket import ROUND_NAMES
+
+# Whole-bracket outcomes of Monte Carlo tournament replicas, one uint64 per
+# replica. Games are numbered in play order (round by round, bracket order
+# within a round) and bit g is 1 when game g went to the lower team of its
+# pairing (the second team of a first-round matchup, or the winner coming up
+# from the lower half of the subtree). 64 teams play 63 games, so a million
+# replicas take 8 MB.
+MAX_TEAMS = 64
+# Replicas decoded per chunk by the per-round queries.
+DECODE_CHUNK = 1 << 16
+SIDECAR_VERSION = 1
+
+
+def round_offsets(num_teams):
+    """Bit index of the first game of each round (round r has num_teams >> (r + 1) games)."""
+    num_rounds = num_teams.bit_length() - 1
+    return [num_teams - (num_teams >> r) for r in range(num_rounds)]
+
+
+def encode_bracket(lower_won):
+    """Code for one replica from its games' outcomes in play order (True where the lower team won)."""
+    code = 0
+    for game, lower in enumerate(lower_won):
+        if lower:
+            code |= 1 << game
+    return code
+
+
+def decode_winners(codes, num_teams):
+    """
+    Field slot of every game's winner: one (R, games in round) uint8 array per
+    round, for the R codes given.
+    """
+    codes = np.asarray(codes, dtype=np.uint64)
+    previous = np.arange(num_teams, dtype=np.uint8)[None, :]
+    winners = []
+    for offset in round_offsets(num_teams):
+        games = previous.shape[1] // 2
+        shifts = np.arange(offset, offset + games, dtype=np.uint64)
+        lower = ((codes[:, None] >> shifts) & np.uint64(1)).astype(bool)
+        previous = np.where(lower, previous[:, 1::2], previous[:, 0::2])
+        winners.append(previous)
+    return winners
+
+
+class BracketStore:
+    """
+    Bracket outcomes of tournament replicas as packed uint64 codes (see the
+    module comment), for a field of up to 64 teams in bracket order.
+
+    In memory the codes live in a growable array; a store made with `create`
+    appends them to a raw little-endian file instead (teams in a JSON file
+    next to it) and `open` memory-maps that file back, so a run can be
+    analyzed later without re-simulating. Stores pickle as plain arrays.
+
+    Queries: `most_frequent` full brackets, `round_marginals` (the same
+    advancement table bracket_probabilities gives), `matchup_win_counts`, and
+    conditionals through `given` / `probability`, e.g. the title odds of every
+    team if Duke makes the Final Four:
+
+        store.given("duke", "Final Four").round_marginals()['champion']
+    """
+
+    def __init__(self, teams, codes=None, capacity=1024):
+        self.teams = list(teams)
+        num_teams = len(self.teams)
+        self.num_rounds = num_teams.bit_length() - 1
+        if num_teams < 2 or num_teams != 1 << self.num_rounds or num_teams > MAX_TEAMS:
+            raise ValueError(f"BracketStore needs a power-of-two field of at most {MAX_TEAMS} teams, got {num_teams}")
+        self.index = {team: i for i, team in enumerate(self.teams)}
+        self.round_names = ROUND_NAMES[-self.num_rounds:]
+        self.path = None
+        self._mapped = None
+        self._buffer = np.empty(max(capacity, 1), dtype=np.uint64)
+        self._size = 0
+        if codes is not None:
+            self.append(codes)
+
+    # --- Storage ---
+
+    @classmethod
+    def create(cls, path, teams):
+        """Empty store that appends to the file `path` (truncated), with the teams in `path`.json."""
+        store = cls(teams, capacity=1)
+        store.path = Path(path)
+        store.path.parent.mkdir(parents=True, exist_ok=True)
+        store.path.write_bytes(b"")
+        with open(_sidecar(store.path), "w", encoding="utf-8") as file:
+            json.dump({"version": SIDECAR_VERSION, "teams": store.teams}, file)
+        return store
+
+    @classmethod
+    def open(cls, path):
+        """Store over an existing file written by a `create`d store, memory-mapped; appends go to the file."""
+        path = Path(path)
+        with open(_sidecar(path), "r", encoding="utf-8") as file:
+            sidecar = json.load(file)
+        if sidecar.get("version") != SIDECAR_VERSION:
+            raise ValueError(f"{path} was written by an unsupported BracketStore version")
+        store = cls(sidecar["teams"], capacity=1)
+        store.path = path
+        return store
+
+    @classmethod
+    def open_or_create(cls, path, teams):
+        """`open` the store at `path` if it and its teams file exist (appends extend it), else `create` one for `teams`."""
+        path = Path(path)
+        if path.exists() and _sidecar(path).exists():
+            return cls.open(path)
+        return cls.create(path, teams)
+
+    def append(self, codes):
+        """Adds replicas' codes (an int or an array of them)."""
+        codes = np.atleast_1d(np.asarray(codes, dtype=np.uint64))
+        if self.path is not None:
+            with open(self.path, "ab") as file:
+                file.write(codes.astype("<u8").tobytes())
+            self._mapped = None
+            return
+        needed = self._size + len(codes)
+        if needed > len(self._buffer):
+            grown = np.empty(max(needed, 2 * len(self._buffer)), dtype=np.uint64)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        self._buffer[self._size:needed] = codes
+        self._size = needed
+
+    @property
+    def codes(self):
+        """All codes so far, in replica order (read-only view)."""
+        if self.path is None:
+            view = self._buffer[:self._size]
+            view.flags.writeable = False
+            return view
+        if self._mapped is None:
+            size = self.path.stat().st_size // 8
+            self._mapped = (np.memmap(self.path, dtype="<u8", mode="r", shape=(size,)) if size
+                            else np.empty(0, dtype=np.uint64))
+        return self._mapped
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getstate__(self):
+        return {"teams": self.teams, "codes": np.array(self.codes)}
+
+    def __setstate__(self, state):
+        self.__init__(state["teams"], state["codes"])
+
+    # --- Queries ---
+
+    def _round(self, round_name):
+        if isinstance(round_name, int):
+            return round_name
+        if round_name not in self.round_names:
+            raise ValueError(f"Unknown round {round_name!r}; expected one of {self.round_names}")
+        return self.round_names.index(round_name)
+
+    def decode(self, code):
+        """One bracket as winners per round, first entry the full field (the visualize_bracket format)."""
+        rounds = [list(self.teams)]
+        for winners in decode_winners([code], len(self.teams)):
+            rounds.append([self.teams[slot] for slot in winners[0]])
+        return rounds
+
+    def most_frequent(self, top=10):
+        """The `top` most common full brackets: [(code, count, share)], most common first."""
+        codes = self.codes
+        if not len(codes):
+            return []
+        unique, counts = np.unique(codes, return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:top]
+        return [(int(unique[i]), int(counts[i]), float(counts[i] / len(codes))) for i in order]
+
+    def advanced(self, team, round_name):
+        """
+        Boolean mask of the replicas in which `team` won its game in
+        `round_name` (a name from round_names, e.g. "Final Four" for winning
+        the regional final, or a round index). A team wins that game exactly
+        when it won every game on its path, so this is one mask-and-compare.
+        """
+        slot, last = self.index[team], self._round(round_name)
+        mask = value = 0
+        for r, offset in enumerate(round_offsets(len(self.teams))[:last + 1]):
+            bit = 1 << (offset + (slot >> (r + 1)))
+            mask |= bit
+            if (slot >> r) & 1:
+                value |= bit
+        return (self.codes & np.uint64(mask)) == np.uint64(value)
+
+    def given(self, team, round_name):
+        """Store of the replicas in which `team` won its game in `round_name`."""
+        return BracketStore(self.teams, self.codes[self.advanced(team, round_name)])
+
+    def probability(self, team, round_name, given=None):
+        """Share of replicas (optionally of `given`, a (team, round) pair) in which `team` won in `round_name`."""
+        store = self.given(*given) if given else self
+        return float(np.mean(store.advanced(team, round_name))) if len(store) else float('nan')
+
+    def round_marginals(self):
+        """
+        Share of replicas in which each team won each round, in the format of
+        bracket_probabilities ('teams', 'rounds', 'advancement', 'table',
+        'champion'), so most_likely_bracket works on it too.
+        """
+        num_teams, codes = len(self.teams), self.codes
+        wins = np.zeros((num_teams, self.num_rounds))
+        for start in range(0, len(codes), DECODE_CHUNK):
+            for r, winners in enumerate(decode_winners(codes[start:start + DECODE_CHUNK], num_teams)):
+                wins[:, r] += np.bincount(winners.ravel(), minlength=num_teams)
+        advancement = wins / max(len(codes), 1)
+        return {
+            'teams': self.teams,
+            'rounds': self.round_names,
+            'advancement': advancement,
+            'table': {team: dict(zip(self.round_names, row)) for team, row in zip(self.teams, advancement.tolist())},
+            'champion': {team: float(p) for team, p in zip(self.teams, advancement[:, -1])},
+            'replicas': len(codes)
+        }
+
+    def matchup_win_counts(self):
+        """Plain {sorted team pair: {winner: count}} over every game played, as the tournament runner used to keep."""
+        num_teams, codes = len(self.teams), self.codes
+        # Bins are (upper slot, lower slot, winner slot).
+        totals = np.zeros(num_teams ** 3, dtype=np.int64)
+        for start in range(0, len(codes), DECODE_CHUNK):
+            previous = np.arange(num_teams, dtype=np.intp)[None, :]
+            for winners in decode_winners(codes[start:start + DECODE_CHUNK], num_teams):
+                upper = np.broadcast_to(previous[:, 0::2], winners.shape)
+                lower = np.broadcast_to(previous[:, 1::2], winners.shape)
+                keys = (upper * num_teams + lower) * num_teams + winners
+                totals += np.bincount(keys.ravel(), minlength=num_teams ** 3)
+                previous = winners.astype(np.intp)
+
+        counts = {}
+        for key in np.flatnonzero(totals).tolist():
+            pair, winner = divmod(key, num_teams)
+            team_a, team_b = (self.teams[slot] for slot in divmod(pair, num_teams))
+            counts.setdefault(tuple(sorted((team_a, team_b))), {})[self.teams[winner]] = int(totals[key])
+        return counts
+
+
+def _sidecar(path):
+    return path.with_name(path.name + ".json")
@@ -1,5 +1,7 @@
 # bayesian.py
 import math
+import numpy as np
+from helpers.instrumentation import timed
 
 def log5(stat_a, stat_b, league_avg_stat):
     """
@@ -11,6 +13,7 @@ def log5(stat_a, stat_b, league_avg_stat):
         return 0.5
     return (stat_a - stat_a * stat_b) / denominator
 
+@timed("calculate_four_factors_probabilities")
 def calculate_four_factors_probabilities(team_stats, opp_stats, league_avg_stats):
     """
     CORRECTED: This function now correctly frames all defensive stats as "success rates"
@@ -68,3 +71,49 @@ def calculate_four_factors_probabilities(team_stats, opp_stats, league_avg_stats
         'p_ft_make': team_stats['FT_pct'], # FT% is considered independent of opponent
         'p_offensive_rebound': adj_orb_pct
     }
+
+
+def log5_array(stat_a, stat_b):
+    """log5 on arrays (broadcast elementwise), 0.5 wherever the denominator is 0."""
+    stat_a, stat_b = np.asarray(stat_a, dtype=float), np.asarray(stat_b, dtype=float)
+    denominator = stat_a + stat_b - 2 * stat_a * stat_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, 0.5, (stat_a - stat_a * stat_b) / denominator)
+
+
+@timed("calculate_four_factors_probabilities_batch")
+def calculate_four_factors_probabilities_batch(team_stats, opp_stats, league_avg_stats):
+    """
+    calculate_four_factors_probabilities for K matchups at once. `team_stats`
+    and `opp_stats` map each stat key to an array of K values (the offense and
+    the defense of each matchup); returns the same keys as the scalar version,
+    each an array of K probabilities.
+    """
+    def column(stats, key):
+        return np.asarray(stats[key], dtype=float)
+
+    three_rate = column(team_stats, '3PAr')
+    two_pct, three_pct = column(team_stats, '2P_pct'), column(team_stats, '3P_pct')
+    p_fga, p_shooting_foul = column(team_stats, 'p_fga'), column(team_stats, 'p_shooting_foul')
+
+    # Shooting: scale 2P% and 3P% by the log5-adjusted eFG%, as in the scalar version.
+    team_efg = (two_pct * (1 - three_rate)) + (three_pct * 1.5 * three_rate)
+    adj_efg = log5_array(team_efg, 1 - column(opp_stats, 'def_eFG_pct'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaling_factor = np.where(team_efg > 0, adj_efg / team_efg, 1.0)
+    adj_orb_pct = log5_array(column(team_stats, 'ORB_pct'), 1 - column(opp_stats, 'def_ORB_pct'))
+
+    p_and_one = 0.03 * p_shooting_foul
+    p_shooting_foul = p_shooting_foul - p_and_one
+    return {
+        'p_fga_2': p_fga * (1 - three_rate),
+        'p_fga_3': p_fga * three_rate,
+        'p_turnover': column(team_stats, 'p_turnover'),
+        'p_foul_on_2': p_shooting_foul * (1 - three_rate),
+        'p_foul_on_3': p_shooting_foul * three_rate,
+        'p_and_one': p_and_one,
+        'p_make_2': np.minimum(two_pct * scaling_factor, 0.95),
+        'p_make_3': np.minimum(three_pct * scaling_factor, 0.95),
+        'p_ft_make': column(team_stats, 'FT_pct'),
+        'p_offensive_rebound': adj_orb_pct
+    }
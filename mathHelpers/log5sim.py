@@ -1,13 +1,14 @@
 import numpy as np
+from statistics import NormalDist
 
-from scipy.stats import norm
 
-
-from helpers.getTeams import getTeams
 from helpers.findTeam import findTeam 
 from helperFunctions import data
-from helpers.prepare_stats import prepare_team_stats, calculate_league_averages
-from mathHelpers.log5 import calculate_four_factors_probabilities
+from helpers.prepare_stats import prepare_team_stats, season_league_averages
+from mathHelpers.log5 import calculate_four_factors_probabilities, calculate_four_factors_probabilities_batch
+from mathHelpers.possessionEngine import compile_chain, simulate_team_games, uniform_stream
+from helpers.instrumentation import timed, timer, count
+from models import MatchupResult
 
 
 points_per_state = {
@@ -15,6 +16,8 @@ points_per_state = {
     'Shooting Foul 2-Shots': 0, 'Shooting Foul 3-Shots': 0, 'FT 1-of-2': 0, 'FT 2-of-2': 1,
     'FT 1-of-3': 0, 'FT 2-of-3': 1, 'FT 3-of-3': 1, 'Make 2 + Foul (And-One)': 2, 'And-One FT': 1, 'End': 0
 }
+MATCHUP_MODES = ("simulation", "analytic", "adaptive")
+@timed("create_transition_matrix")
 def create_transition_matrix(probs):
     states = list(points_per_state.keys()); matrix = np.zeros((len(states), len(states))); state_idx = {state: i for i, state in enumerate(states)}
     p_make_2, p_make_3, p_ft_make, p_orb = probs['p_make_2'], probs['p_make_3'], probs['p_ft_make'], probs['p_offensive_rebound']
@@ -34,19 +37,125 @@ def create_transition_matrix(probs):
     matrix[state_idx['And-One FT'], state_idx['End']] = 1 - ((1 - p_ft_make) * p_orb); matrix[state_idx['End'], state_idx['End']] = 1
     row_sums = matrix.sum(axis=1); row_sums[row_sums == 0] = 1; matrix = matrix / row_sums[:, np.newaxis]
     return matrix
+@timed("simulate_game")
 def simulate_game(team1_matrix, team2_matrix, num_possessions, max_steps_per_possession=15):
-    states = list(points_per_state.keys()); state_index = {state: i for i, state in enumerate(states)}; team_points = {1: 0, 2: 0}
-    total_state_counts = {state: 0 for state in states}; current_team_idx = 1
+    states = list(points_per_state.keys()); points = list(points_per_state.values()); end = len(states) - 1
+    chains = {1: compile_chain(team1_matrix), 2: compile_chain(team2_matrix)}; uniforms = uniform_stream()
+    team_points = {1: 0, 2: 0}; state_counts = [0] * len(states); current_team_idx = 1
     for _ in range(int(num_possessions * 2)):
-        transition_matrix = team1_matrix if current_team_idx == 1 else team2_matrix
-        current_state = 'Start'; steps = 0
-        while current_state != 'End' and steps < max_steps_per_possession:
-            team_points[current_team_idx] += points_per_state.get(current_state, 0); total_state_counts[current_state] += 1
-            row = transition_matrix[state_index[current_state]]; current_state = np.random.choice(states, p=row); steps += 1
-        total_state_counts['End'] += 1; team_points[current_team_idx] += points_per_state.get(current_state, 0); current_team_idx = 3 - current_team_idx
+        draw = chains[current_team_idx].draw_one; current_state = 0; steps = 0
+        while current_state != end and steps < max_steps_per_possession:
+            team_points[current_team_idx] += points[current_state]; state_counts[current_state] += 1
+            current_state = draw(current_state, uniforms); steps += 1
+        state_counts[end] += 1; team_points[current_team_idx] += points[current_state]; current_team_idx = 3 - current_team_idx
+    total_state_counts = dict(zip(states, state_counts))
+    count("simulate_game.games"); count("simulate_game.possessions", int(num_possessions * 2))
+    count("simulate_game.transitions", sum(total_state_counts.values()) - total_state_counts['End'])
     return team_points[1], team_points[2], total_state_counts
 
-import numpy as np
+@timed("simulate_games_batch")
+def simulate_games_batch(team1_matrix, team2_matrix, num_possessions, num_games, max_steps_per_possession=15, rng=None,
+                         sampling=None, game_offset=0):
+    """
+    Simulates `num_games` games at once as integer state arrays.
+
+    Same possession split and scoring as `simulate_game` (team 1 gets the odd
+    possession), but every transition of a step is drawn in one vectorized call.
+    With a `sampling` plan (mathHelpers.varianceReduction.SamplingPlan) the
+    draws are keyed by (game, possession, step) instead of taken from `rng`;
+    `game_offset` numbers the games of this batch after earlier batches.
+    Returns (team1 score array, team2 score array, state counts summed over all games).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    states = list(points_per_state.keys()); points = np.array(list(points_per_state.values()))
+    total_possessions = int(num_possessions * 2)
+    team1_possessions = (total_possessions + 1) // 2
+    team2_possessions = total_possessions // 2
+
+    draws1 = draws2 = None
+    if sampling is not None:
+        draws1 = sampling.draws(1, num_games, game_offset, team1_possessions)
+        draws2 = sampling.draws(2, num_games, game_offset, team2_possessions)
+    score1, steps1, _ = simulate_team_games(team1_matrix, points, team1_possessions, num_games, rng, max_steps=max_steps_per_possession, draws=draws1)
+    score2, steps2, _ = simulate_team_games(team2_matrix, points, team2_possessions, num_games, rng, max_steps=max_steps_per_possession, draws=draws2)
+
+    counts = steps1 + steps2
+    counts[states.index('End')] += total_possessions * num_games
+    total_state_counts = {state: int(n) for state, n in zip(states, counts)}
+    count("simulate_game.games", num_games); count("simulate_game.possessions", total_possessions * num_games)
+    count("simulate_game.transitions", int(steps1.sum() + steps2.sum()))
+    return score1, score2, total_state_counts
+
+def possession_points_pmf(transition_matrix, max_steps_per_possession=15):
+    """
+    Exact points distribution of a single possession, with no sampling.
+
+    Pushes probability mass over (state, points so far) through the absorbing
+    chain one step at a time, the same truncated walk `simulate_game` takes:
+    each step banks the points of the current state, mass reaching 'End' is
+    final, and whatever is still live after the last step keeps its state's points.
+    Returns an array whose index is points scored.
+    """
+    states = list(points_per_state.keys()); points = list(points_per_state.values())
+    end_idx = states.index('End'); max_points = (max_steps_per_possession + 1) * max(points)
+    mass = np.zeros((len(states), max_points + 1)); mass[states.index('Start'), 0] = 1.0
+    pmf = np.zeros(max_points + 1)
+
+    for _ in range(max_steps_per_possession):
+        banked = np.zeros_like(mass)
+        for i, pts in enumerate(points):
+            banked[i, pts:] = mass[i, :max_points + 1 - pts]
+        mass = transition_matrix.T @ banked
+        pmf += mass[end_idx]; mass[end_idx] = 0
+        if not mass.any():
+            break
+
+    for i, pts in enumerate(points):
+        pmf[pts:] += mass[i, :max_points + 1 - pts]
+    return np.trim_zeros(pmf, 'b')
+
+def game_points_pmf(possession_pmf, num_team_possessions):
+    """
+    Distribution of a team's total over `num_team_possessions` independent
+    possessions: the possession PMF convolved with itself via one FFT power.
+    """
+    if num_team_possessions <= 0:
+        return np.ones(1)
+    size = num_team_possessions * (len(possession_pmf) - 1) + 1
+    fft_size = 1 << (size - 1).bit_length()
+    pmf = np.fft.irfft(np.fft.rfft(possession_pmf, fft_size) ** num_team_possessions, fft_size)[:size]
+    pmf = np.clip(pmf, 0, None)
+    return pmf / pmf.sum()
+
+@timed("analytic_matchup")
+def analytic_matchup(team1_matrix, team2_matrix, num_possessions, max_steps_per_possession=15):
+    """
+    Exact game-score distributions for both teams with the possession split
+    `simulate_game` uses, plus the win probability (ties count as losses, as in
+    the simulation), tie probability, expected scores, spread and total.
+    """
+    total_possessions = int(num_possessions * 2)
+    team1_pmf = game_points_pmf(possession_points_pmf(team1_matrix, max_steps_per_possession), (total_possessions + 1) // 2)
+    team2_pmf = game_points_pmf(possession_points_pmf(team2_matrix, max_steps_per_possession), total_possessions // 2)
+
+    # P(team2 < k) for every score k team1 can reach.
+    team2_below = np.concatenate(([0.0], np.cumsum(team2_pmf)))
+    team2_below = team2_below[np.minimum(np.arange(len(team1_pmf)), len(team2_pmf))]
+    overlap = min(len(team1_pmf), len(team2_pmf))
+
+    team1_mean = float(np.dot(np.arange(len(team1_pmf)), team1_pmf))
+    team2_mean = float(np.dot(np.arange(len(team2_pmf)), team2_pmf))
+    return {
+        'team1_pmf': team1_pmf,
+        'team2_pmf': team2_pmf,
+        'p_win': float(np.dot(team1_pmf, team2_below)),
+        'p_tie': float(np.dot(team1_pmf[:overlap], team2_pmf[:overlap])),
+        'team1_mean': team1_mean,
+        'team2_mean': team2_mean,
+        'spread': team1_mean - team2_mean,
+        'total': team1_mean + team2_mean
+    }
+
 
 def get_barthag_win_prob(barthag1, barthag2):
     """
@@ -60,6 +169,110 @@ def get_barthag_win_prob(barthag1, barthag2):
     return (barthag1 - barthag1 * barthag2) / denominator
 
 
+@timed("build_matchup_matrices")
+def build_matchup_matrices(team1_stats, team2_stats, league_averages):
+    """Both teams' transition matrices for this pairing: (team1_matrix, team2_matrix)."""
+    team1_probs = calculate_four_factors_probabilities(team1_stats, team2_stats, league_averages)
+    team2_probs = calculate_four_factors_probabilities(team2_stats, team1_stats, league_averages)
+    return create_transition_matrix(team1_probs), create_transition_matrix(team2_probs)
+
+
+@timed("create_transition_matrix_batch")
+def create_transition_matrix_batch(probs):
+    """
+    create_transition_matrix for K matchups: `probs` maps each probability key
+    to an array of K values (see calculate_four_factors_probabilities_batch);
+    returns a (K, 16, 16) tensor with every row normalized.
+    """
+    states = list(points_per_state.keys()); state_idx = {state: i for i, state in enumerate(states)}
+    num_matchups = len(np.atleast_1d(probs['p_make_2']))
+    matrix = np.zeros((num_matchups, len(states), len(states)))
+
+    def set_row(source, targets):
+        for target, value in targets.items():
+            matrix[:, state_idx[source], state_idx[target]] += value
+
+    p_make_2, p_make_3, p_ft_make, p_orb = probs['p_make_2'], probs['p_make_3'], probs['p_ft_make'], probs['p_offensive_rebound']
+    p_missed_ft_orb = (1 - p_ft_make) * p_orb
+    set_row('Start', {
+        'Make 2': probs['p_fga_2'] * p_make_2, 'Missed Shot': probs['p_fga_2'] * (1 - p_make_2) + probs['p_fga_3'] * (1 - p_make_3),
+        'Make 3': probs['p_fga_3'] * p_make_3, 'Turnover': probs['p_turnover'], 'Shooting Foul 2-Shots': probs['p_foul_on_2'],
+        'Shooting Foul 3-Shots': probs['p_foul_on_3'], 'Make 2 + Foul (And-One)': probs['p_and_one']
+    })
+    for source in ('Make 2', 'Make 3', 'Turnover', 'End'):
+        set_row(source, {'End': 1})
+    set_row('Missed Shot', {'Offensive Rebound': p_orb, 'End': 1 - p_orb})
+    for source, target in (('Offensive Rebound', 'Start'), ('Shooting Foul 2-Shots', 'FT 1-of-2'), ('Shooting Foul 3-Shots', 'FT 1-of-3'),
+                           ('FT 1-of-2', 'FT 2-of-2'), ('FT 1-of-3', 'FT 2-of-3'), ('FT 2-of-3', 'FT 3-of-3'),
+                           ('Make 2 + Foul (And-One)', 'And-One FT')):
+        set_row(source, {target: 1})
+    for source in ('FT 2-of-2', 'FT 3-of-3', 'And-One FT'):
+        set_row(source, {'Offensive Rebound': p_missed_ft_orb, 'End': 1 - p_missed_ft_orb})
+    row_sums = matrix.sum(axis=2, keepdims=True); row_sums[row_sums == 0] = 1
+    return matrix / row_sums
+
+
+def stat_columns(team_stats):
+    """Prepared stats as {stat key: array over teams}, from a list of prepared-stats dicts or a dict of columns."""
+    if isinstance(team_stats, dict):
+        return {key: np.asarray(values, dtype=float) for key, values in team_stats.items()}
+    return {key: np.array([stats[key] for stats in team_stats], dtype=float) for key in team_stats[0]}
+
+
+def ordered_pairs(num_teams):
+    """(offense, defense) index arrays of every ordered pair of distinct teams."""
+    offense, defense = np.nonzero(~np.eye(num_teams, dtype=bool))
+    return offense, defense
+
+
+@timed("build_matchup_matrices_batch")
+def build_matchup_matrices_batch(team_stats, league_averages, offense=None, defense=None):
+    """
+    Transition matrices for many matchups in one vectorized pass. `team_stats`
+    holds every team's prepared stats (see stat_columns); matchup k is team
+    offense[k] attacking team defense[k], and the default is every ordered
+    pair of distinct teams (4,032 for a 64-team field). Matrix k is what
+    build_matchup_matrices gives the offense for that pairing, so the two
+    matrices of a game are the entries for (i, j) and (j, i).
+
+    Returns {'offense', 'defense', 'probabilities' (arrays of K), 'matrices'
+    (K x 16 x 16)}. At 2 KB per matrix, every pair of a full season
+    (~130,000) takes about 270 MB.
+    """
+    columns = stat_columns(team_stats)
+    if offense is None or defense is None:
+        offense, defense = ordered_pairs(len(next(iter(columns.values()))))
+    offense, defense = np.asarray(offense, dtype=np.intp), np.asarray(defense, dtype=np.intp)
+    probs = calculate_four_factors_probabilities_batch(
+        {key: values[offense] for key, values in columns.items()},
+        {key: values[defense] for key, values in columns.items()},
+        league_averages
+    )
+    return {'offense': offense, 'defense': defense, 'probabilities': probs, 'matrices': create_transition_matrix_batch(probs)}
+
+
+def blend_win_probabilities(p_win_log5, p_win_pythag, p_win_barthag, pythag_weight, barthag_weight):
+    log5_weight = 1.0 - pythag_weight - barthag_weight
+    return (
+        (p_win_log5 * log5_weight) + 
+        (p_win_pythag * pythag_weight) + 
+        (p_win_barthag * barthag_weight)
+    )
+
+
+def matchup_win_probability(team1_stats, team2_stats, league_averages, exponent, pythag_weight=0.10, barthag_weight=0, matrices=None):
+    """
+    Blended team1 win probability with the possession model solved exactly
+    (no sampling, no printing). Pass `matrices` to reuse prebuilt ones.
+    """
+    team1_matrix, team2_matrix = matrices or build_matchup_matrices(team1_stats, team2_stats, league_averages)
+    possessions = (team1_stats["poss_per_g"] + team2_stats["poss_per_g"]) / 2
+    p_win_log5 = analytic_matchup(team1_matrix, team2_matrix, possessions)['p_win']
+    p_win_pythag = get_pythagorean_win_prob(team1_stats, team2_stats, exponent, league_averages)
+    p_win_barthag = get_barthag_win_prob(team1_stats['BARTHAG'], team2_stats['BARTHAG'])
+    return blend_win_probabilities(p_win_log5, p_win_pythag, p_win_barthag, pythag_weight, barthag_weight)
+
+
 def simulate_matchup(
     team1_name, team1_stats, 
     team2_name, team2_stats, 
@@ -67,75 +280,164 @@ def simulate_matchup(
     exponent, 
     pythag_weight=0.10,
     barthag_weight=0,
-    num_simulations=500
+    num_simulations=500,
+    rng=None,
+    mode="simulation",
+    matrices=None,
+    verbose=True,
+    batch_size=250,
+    target_width=0.04,
+    confidence=0.95,
+    sampling=None
 ):
-    print(f"\nSimulating matchup: {team1_name} vs {team2_name}")
+    """
+    Predicts one game and returns a MatchupResult. mode="simulation" plays
+    `num_simulations` games with the possession model; mode="analytic" solves
+    it exactly; mode="adaptive" plays batches of `batch_size` games (at most
+    `num_simulations`) until the possession-model interval is narrower than
+    `target_width` or the blended probability is clearly on one side of 0.5
+    (see simulate_until_confident). Both simulation modes accept a `sampling`
+    plan for common random numbers / antithetic draws. With verbose=False
+    nothing is printed; use format_matchup_result to render a result later.
+    """
+    if mode not in MATCHUP_MODES:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {MATCHUP_MODES}")
+    if mode != "analytic" and num_simulations < 1:
+        raise ValueError(f"{mode} mode needs num_simulations >= 1, got {num_simulations}")
+
     possessions = (team1_stats["poss_per_g"] + team2_stats["poss_per_g"]) / 2
     
-    team1_probs = calculate_four_factors_probabilities(team1_stats, team2_stats, league_averages)
-    team2_probs = calculate_four_factors_probabilities(team2_stats, team1_stats, league_averages)
-    
-    team1_matrix = create_transition_matrix(team1_probs)
-    team2_matrix = create_transition_matrix(team2_probs)
+    team1_matrix, team2_matrix = matrices or build_matchup_matrices(team1_stats, team2_stats, league_averages)
     
-    team1_scores = []
-    team2_scores = []
-    score_diffs = []
-
-    print(f"Running {num_simulations} simulations...")
-    for i in range(num_simulations):
-        if (i + 1) % 100 == 0 or i == num_simulations - 1:
-            print(f"\r  Simulation {i + 1}/{num_simulations}", end="")
-            
-        score1, score2, _ = simulate_game(team1_matrix, team2_matrix, possessions)
-        
-        team1_scores.append(score1)
-        team2_scores.append(score2)
-        score_diffs.append(score1 - score2)
-    
-    print(f"\r  Simulation Complete.                         ")
-
     # --- Calculate All Probabilities ---
-    
-    # 1. Probability from the detailed simulation
-    p_win_log5 = sum(1 for diff in score_diffs if diff > 0) / num_simulations
-    
-    # 2. Probability from Pythagorean Expectation
+
+    # Probabilities from Pythagorean Expectation and the BARTHAG rating
     p_win_pythag = get_pythagorean_win_prob(team1_stats, team2_stats, exponent, league_averages)
-    
-    # 3. Probability from BARTHAG rating
     p_win_barthag = get_barthag_win_prob(team1_stats['BARTHAG'], team2_stats['BARTHAG'])
+
+    # Probability from the possession model: exact ("analytic") or simulated
+    log5_interval = stop_reason = None
+    if mode == "analytic":
+        exact = analytic_matchup(team1_matrix, team2_matrix, possessions)
+        p_win_log5 = exact['p_win']
+        team1_avg, team2_avg, spread_mean = exact['team1_mean'], exact['team2_mean'], exact['spread']
+        team1_hist, team2_hist = exact['team1_pmf'], exact['team2_pmf']
+        team1_scores = team2_scores = state_counts = None
+        num_simulations = 0
+    else:
+        if mode == "adaptive":
+            fixed = blend_win_probabilities(0.0, p_win_pythag, p_win_barthag, pythag_weight, barthag_weight)
+            team1_scores, team2_scores, state_counts, stop_reason = simulate_until_confident(
+                team1_matrix, team2_matrix, possessions, rng=rng,
+                log5_weight=1.0 - pythag_weight - barthag_weight, fixed_probability=fixed,
+                max_simulations=num_simulations, batch_size=batch_size,
+                target_width=target_width, confidence=confidence, sampling=sampling
+            )
+            num_simulations = len(team1_scores)
+        else:
+            team1_scores, team2_scores, state_counts = simulate_games_batch(team1_matrix, team2_matrix, possessions, num_simulations, rng=rng, sampling=sampling)
+        score_diffs = team1_scores - team2_scores
+        log5_wins = np.count_nonzero(score_diffs > 0)
+        p_win_log5 = log5_wins / num_simulations
+        log5_interval = wilson_interval(log5_wins, num_simulations, confidence)
+        team1_avg, team2_avg, spread_mean = float(np.mean(team1_scores)), float(np.mean(team2_scores)), float(np.mean(score_diffs))
+        team1_hist = np.bincount(team1_scores) / num_simulations
+        team2_hist = np.bincount(team2_scores) / num_simulations
     
     # --- Blend the results ---
-    log5_weight = 1.0 - pythag_weight - barthag_weight
-    final_win_prob = (
-        (p_win_log5 * log5_weight) + 
-        (p_win_pythag * pythag_weight) + 
-        (p_win_barthag * barthag_weight)
+    final_win_prob = blend_win_probabilities(p_win_log5, p_win_pythag, p_win_barthag, pythag_weight, barthag_weight)
+
+    # Determine the winner based on our robust win probability calculation.
+    winner_name = team1_name if final_win_prob > 0.5 else team2_name
+    result = MatchupResult(
+        team1_name=team1_name, team2_name=team2_name, winner=winner_name,
+        win_prob=float(final_win_prob), p_win_log5=float(p_win_log5),
+        p_win_pythag=float(p_win_pythag), p_win_barthag=float(p_win_barthag),
+        pythag_weight=pythag_weight, barthag_weight=barthag_weight,
+        team1_mean=team1_avg, team2_mean=team2_avg, spread=spread_mean, total=team1_avg + team2_avg,
+        mode=mode, num_simulations=num_simulations,
+        team1_hist=team1_hist, team2_hist=team2_hist,
+        team1_scores=team1_scores, team2_scores=team2_scores, state_counts=state_counts,
+        log5_interval=log5_interval, stop_reason=stop_reason
     )
 
-    # --- Calculate Final Averages ---
-    team1_avg = np.mean(team1_scores)
-    team2_avg = np.mean(team2_scores)
-    spread_mean = np.mean(score_diffs)
-    
-    # --- Print Corrected and Consistent Results ---
-    print("\n--- Model Predictions ---")
-    print(f"Predicted Final Score: {team1_name} {team1_avg:.1f} - {team2_name} {team2_avg:.1f}")
-    print(f"{team1_name} Win Probability: {final_win_prob:.2%}")
-
-    print("\n--- Betting Market Analysis ---")
-    print(f"Predicted Spread: {team1_name} {spread_mean:-.1f}")
-    print(f"Predicted Total (Over/Under): {team1_avg + team2_avg:.1f}")
-    
+    if verbose:
+        with timer("simulate_matchup.report"):
+            print(format_matchup_result(result))
+    return result
 
-    # 3. Calculate the average score differential (the spread).
-    spread_mean = np.mean(score_diffs)
-    
 
-    # Determine the winner based on our robust win probability calculation.
-    winner_name = team1_name if final_win_prob > 0.5 else team2_name
-    return winner_name
+def wilson_interval(successes, trials, confidence=0.95):
+    """Wilson score interval for a binomial proportion: (low, high)."""
+    if trials == 0:
+        return (0.0, 1.0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (float(center - half_width), float(center + half_width))
+
+
+def simulate_until_confident(team1_matrix, team2_matrix, num_possessions, rng=None, log5_weight=1.0,
+                             fixed_probability=0.0, max_simulations=5000, batch_size=250,
+                             target_width=0.04, confidence=0.95, max_steps_per_possession=15, sampling=None):
+    """
+    Simulates in batches until one of:
+      - "interval": the Wilson interval on the possession-model win
+        probability is narrower than `target_width`;
+      - "decided": the blended probability, log5_weight * interval +
+        `fixed_probability` (the weighted Pythagorean and BARTHAG parts), lies
+        entirely on one side of 0.5, so more games cannot change the pick;
+      - "budget": `max_simulations` games have been played.
+    Returns (team1 scores, team2 scores, state counts, stop reason).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    scores1, scores2, counts = [], [], None
+    played = wins = 0
+    stop_reason = "budget"
+    while played < max_simulations:
+        n = min(batch_size, max_simulations - played)
+        score1, score2, batch_counts = simulate_games_batch(team1_matrix, team2_matrix, num_possessions, n, max_steps_per_possession, rng,
+                                                           sampling=sampling, game_offset=played)
+        scores1.append(score1)
+        scores2.append(score2)
+        counts = batch_counts if counts is None else {state: counts[state] + batch_counts[state] for state in counts}
+        played += n
+        wins += int(np.count_nonzero(score1 > score2))
+
+        low, high = wilson_interval(wins, played, confidence)
+        if high - low < target_width:
+            stop_reason = "interval"
+            break
+        if fixed_probability + log5_weight * low > 0.5 or fixed_probability + log5_weight * high < 0.5:
+            stop_reason = "decided"
+            break
+    return np.concatenate(scores1), np.concatenate(scores2), counts, stop_reason
+
+
+def format_matchup_result(result):
+    """The printed matchup report for a MatchupResult."""
+    if result.mode == "analytic":
+        method = "Possession model solved exactly"
+    else:
+        method = f"Ran {result.num_simulations} simulations"
+        if result.stop_reason:
+            method += f" (adaptive, stopped: {result.stop_reason})"
+        if result.log5_interval:
+            low, high = result.log5_interval
+            method += f"; possession-model interval {low:.1%} - {high:.1%}"
+    return "\n".join([
+        f"\nSimulating matchup: {result.team1_name} vs {result.team2_name}",
+        f"{method}.",
+        "\n--- Model Predictions ---",
+        f"Predicted Final Score: {result.team1_name} {result.team1_mean:.1f} - {result.team2_name} {result.team2_mean:.1f}",
+        f"{result.team1_name} Win Probability: {result.win_prob:.2%}",
+        f"  (possession model {result.p_win_log5:.2%}, Pythagorean {result.p_win_pythag:.2%}, BARTHAG {result.p_win_barthag:.2%})",
+        "\n--- Betting Market Analysis ---",
+        f"Predicted Spread: {result.team1_name} {result.spread:-.1f}",
+        f"Predicted Total (Over/Under): {result.total:.1f}",
+    ])
 def get_pythagorean_win_prob(team1_stats, team2_stats, exponent, league_averages):
     """
     Calculates the win probability for team1 against team2 using Pythagorean Expectation and backtested exponent.
@@ -154,10 +456,7 @@ def main():
     """Main execution function demonstrating the new, more accurate workflow."""
 
 
-    all_teams_csv = getTeams("cbb25.csv")
-    if not all_teams_csv: return
-
-    league_averages = calculate_league_averages(all_teams_csv, data)
+    league_averages = season_league_averages("cbb25.csv")
 
     team1_name = "wofford"
     team2_name = "tennessee"
@@ -0,0 +1,128 @@
+import hashlib
+import os
+
+import numpy as np
+
+from helpers.seasonData import load_season, CACHE_DIR as SEASON_CACHE_DIR
+from mathHelpers.pythagoreanExponent import season_exponent
+
+PAIRWISE_CACHE_DIR = SEASON_CACHE_DIR.parent / "pairwise"
+# Layers of the stored (3, N, N) array.
+LAYERS = ('pythagorean', 'barthag', 'blended')
+
+
+# --- Elementwise forms (arguments broadcast, so pairs can be a grid or a list of games) ---
+
+def pythagorean_log_ratio(log_oe_a, log_de_a, log_oe_b, log_de_b):
+    """
+    log(team b's expected score / team a's expected score) from log ADJOE and
+    log ADJDE. Expected scores are ADJOE_a * ADJDE_b / PPG; the league PPG
+    cancels in the ratio, so it is not needed.
+    """
+    return (log_oe_b + log_de_a) - (log_oe_a + log_de_b)
+
+
+def pythagorean_probability(log_ratio, exponent):
+    """P(team a beats team b) from pythagorean_log_ratio: 1 / (1 + exp(exponent * log_ratio)), which does not overflow."""
+    return 1.0 / (1.0 + np.exp(exponent * log_ratio))
+
+
+def barthag_log5(a, b):
+    """get_barthag_win_prob: log5 on BARTHAG ratings a and b, 0.5 where it is undefined."""
+    denominator = a + b - 2 * a * b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, 0.5, (a - a * b) / denominator)
+
+
+def pythagorean_matrix(adj_oe, adj_de, exponent):
+    """get_pythagorean_win_prob for every ordered pair: P[i, j] is the chance team i beats team j."""
+    log_oe, log_de = np.log(adj_oe), np.log(adj_de)
+    log_ratio = pythagorean_log_ratio(log_oe[:, None], log_de[:, None], log_oe[None, :], log_de[None, :])
+    return pythagorean_probability(log_ratio, exponent)
+
+
+def barthag_matrix(barthag):
+    """get_barthag_win_prob (log5 on BARTHAG) for every ordered pair."""
+    return barthag_log5(barthag[:, None], barthag[None, :])
+
+
+class PairwiseMatrix:
+    """
+    Win probabilities for every ordered pair of teams in a season. `pythagorean`,
+    `barthag` and `blended` are N x N views (memory-mapped when loaded from the
+    cache) indexed by the season's row order; `probability(a, b, layer)` looks
+    a pairing up by team name.
+    """
+
+    def __init__(self, season, teams, matrices, exponent, pythag_weight, barthag_weight):
+        self.season = season
+        self.teams = teams
+        self.exponent = exponent
+        self.pythag_weight = pythag_weight
+        self.barthag_weight = barthag_weight
+        self.matrices = matrices
+        self.pythagorean, self.barthag, self.blended = matrices
+        self.index = season.index
+
+    def probability(self, team_a, team_b, layer='blended'):
+        """P(team_a beats team_b) from `layer`, or None if either team is unknown."""
+        i, j = self.season.team_index(team_a), self.season.team_index(team_b)
+        if i is None or j is None:
+            return None
+        return float(self.matrices[LAYERS.index(layer)][i, j])
+
+    def rankings(self, layer='blended'):
+        """Teams ordered by average win probability against the rest of the league."""
+        matrix = np.asarray(self.matrices[LAYERS.index(layer)])
+        n = len(self.teams)
+        strength = (np.nansum(matrix, axis=1) - np.diag(matrix)) / max(n - 1, 1)
+        order = np.argsort(-strength, kind='stable')
+        return [(str(self.teams[i]), float(strength[i])) for i in order]
+
+
+def pairwise_matrix(season, exponent=None, pythag_weight=0.5, barthag_weight=0.5, cache=True, mmap=True):
+    """
+    N x N Pythagorean, BARTHAG-log5 and blended matrices for a season file (see
+    season_file for the accepted forms), computed with broadcasting in one pass.
+
+    `exponent=None` fits the season's exponent. The blend is the weighted
+    average of the two rating models (weights are normalized); the possession
+    model is too costly for the full league and is left to per-game callers.
+    The (3, N, N) result is stored under data/.cache/pairwise, keyed by the
+    inputs, and loaded back memory-mapped.
+    """
+    data = load_season(season)
+    adj_oe = np.asarray(data['ADJOE'], dtype=float)
+    adj_de = np.asarray(data['ADJDE'], dtype=float)
+    barthag = np.asarray(data['BARTHAG'], dtype=float)
+    if exponent is None:
+        exponent = season_exponent(data)
+
+    digest = hashlib.sha1()
+    for part in (adj_oe, adj_de, barthag):
+        digest.update(part.tobytes())
+    digest.update(repr((float(exponent), float(pythag_weight), float(barthag_weight))).encode())
+    path = PAIRWISE_CACHE_DIR / f"{data.source.rsplit('.', 1)[0]}-{digest.hexdigest()[:16]}.npy"
+
+    matrices = None
+    if cache and path.exists():
+        try:
+            matrices = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        except ValueError:
+            matrices = None
+    if matrices is None:
+        pythag = pythagorean_matrix(adj_oe, adj_de, exponent)
+        barthag_probs = barthag_matrix(barthag)
+        blended = (pythag_weight * pythag + barthag_weight * barthag_probs) / (pythag_weight + barthag_weight)
+        matrices = np.stack([pythag, barthag_probs, blended])
+        for layer in matrices:
+            np.fill_diagonal(layer, 0.5)
+        if cache:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp, matrices, allow_pickle=False)
+            os.replace(tmp, path)
+            if mmap:
+                matrices = np.load(path, mmap_mode='r', allow_pickle=False)
+
+    return PairwiseMatrix(data, data.teams, matrices, float(exponent), pythag_weight, barthag_weight)
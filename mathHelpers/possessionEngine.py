@@ -0,0 +1,286 @@
+import numpy as np
+
+# Buckets per row of the inverse-CDF guide table (a power of two, indexed by
+# the top bits of each raw random word).
+GUIDE_BITS = 10
+
+
+class TransitionSampler:
+    """
+    Draws next states for many possessions at once from a transition matrix.
+
+    Uses an inverse-CDF guide table: the bucket of each uniform gives a lower
+    bound on its successor column, and only draws that land in a bucket
+    straddling a cumulative boundary need another comparison. Results are the
+    same as a per-row searchsorted. Rows that do not sum to 1 send their
+    leftover mass to the last state.
+    """
+
+    def __init__(self, matrix, guide_bits=GUIDE_BITS):
+        matrix = np.asarray(matrix, dtype=float)
+        self.n_states = matrix.shape[0]
+        self.guide_size = guide_size = 1 << guide_bits
+        self.bucket_shift = np.uint64(64 - guide_bits)
+        cum = np.minimum(np.cumsum(matrix, axis=1), 1.0)
+        self.flat_cum = cum.ravel()
+        bucket_edges = np.arange(guide_size + 1) / guide_size
+        first = np.stack([np.searchsorted(row, bucket_edges, side='right') for row in cum])
+        first = np.minimum(first, self.n_states - 1)
+        # Bucket b of row s only needs a comparison if a boundary falls inside it.
+        self.guide = first[:, :-1].ravel()
+        self.ambiguous = (first[:, 1:] != first[:, :-1]).ravel()
+
+    def draw(self, states, bits):
+        """
+        Next state for each entry of `states` given raw 64-bit random words. The
+        top bits pick the bucket directly; only ambiguous buckets convert their
+        word to the same double `Generator.random` would have produced.
+        """
+        n = self.n_states
+        keys = states * self.guide_size
+        keys += (bits >> self.bucket_shift).view(np.int64)
+        next_state = self.guide[keys]
+
+        # Walk forward past the boundaries inside ambiguous buckets.
+        pending = np.flatnonzero(self.ambiguous[keys])
+        if pending.size:
+            uniforms = (bits[pending] >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+            while pending.size:
+                below = self.flat_cum[states[pending] * n + next_state[pending]] <= uniforms
+                keep = below & (next_state[pending] < n - 1)
+                pending, uniforms = pending[keep], uniforms[keep]
+                next_state[pending] += 1
+        return next_state
+
+
+# Compiled chains kept per distinct matrix (keyed by its bytes).
+CHAIN_CACHE_SIZE = 256
+_chain_cache = {}
+
+
+def _alias_table(probs):
+    """Walker/Vose alias table for `probs` (sums to 1): (keep probability, alias column) per column."""
+    n = len(probs)
+    scaled = [p * n for p in probs]
+    keep, alias = [1.0] * n, list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        lo, hi = small.pop(), large.pop()
+        keep[lo], alias[lo] = scaled[lo], hi
+        scaled[hi] += scaled[lo] - 1.0
+        (small if scaled[hi] < 1.0 else large).append(hi)
+    return keep, alias
+
+
+class CompiledChain:
+    """
+    Sparse form of a transition matrix for the possession engine.
+
+    Each state keeps only its successors, with a Walker alias table over them
+    padded to a power-of-two width: the top bits of a random word pick a
+    column and the rest are the coin flip against that column's threshold, so
+    a draw costs the same whatever the row. A row with a single successor
+    (deterministic) needs no draw at all, and runs of deterministic states are
+    collapsed: a lane landing on `s` ends up at `jump_target[s]` after
+    `jump_length[s]` forced moves, passing through the states counted in
+    `jump_visits[s]` (FT 1-of-2 -> FT 2-of-2, Offensive Rebound -> Start,
+    Make 2 -> End). Rows that do not sum to 1 send their leftover mass to the
+    last state, as TransitionSampler does.
+    """
+
+    def __init__(self, matrix, end_state=-1):
+        matrix = np.asarray(matrix, dtype=float)
+        n = self.n_states = matrix.shape[0]
+        end_state %= n
+        self.successors, self.probabilities = [], []
+        for row in np.clip(matrix, 0.0, None):
+            total = row.sum()
+            if total < 1.0:
+                row = row.copy()
+                row[-1] += 1.0 - total
+            row = row / row.sum()
+            successors = np.flatnonzero(row)
+            self.successors.append(successors)
+            self.probabilities.append(row[successors])
+
+        # Alias tables, one block of `width` slots per state. Slot 2k holds
+        # column k's successor and slot 2k + 1 its alias.
+        self.width_bits = max(int(np.ceil(np.log2(max(len(succ) for succ in self.successors)))), 1)
+        width = 1 << self.width_bits
+        self.column_shift = np.uint64(64 - self.width_bits)
+        fraction = float(1 << (64 - self.width_bits))
+        starts = np.array([k << (64 - self.width_bits) for k in range(width)], dtype=np.uint64)
+        self.thresholds = np.zeros(n * width, dtype=np.uint64)
+        self.slots = np.zeros(2 * n * width, dtype=np.intp)
+        self._keep, self._slots = [], []
+        for state, (successors, probs) in enumerate(zip(self.successors, self.probabilities)):
+            padded = np.zeros(width)
+            padded[:len(successors)] = probs
+            keep, alias = _alias_table(padded.tolist())
+            columns = np.zeros(width, dtype=np.intp)
+            columns[:len(successors)] = successors
+            # A word in column k's range keeps k below k's threshold, else takes its alias.
+            offsets = np.minimum(np.round(np.array(keep) * fraction), fraction - 1).astype(np.uint64)
+            self.thresholds[state * width:(state + 1) * width] = starts + offsets
+            self.slots[2 * state * width:2 * (state + 1) * width:2] = columns
+            self.slots[2 * state * width + 1:2 * (state + 1) * width:2] = columns[alias]
+            self._keep.append(keep)
+            self._slots.append(list(zip(columns.tolist(), columns[alias].tolist())))
+
+        self.deterministic = np.array([succ[0] if len(succ) == 1 and i != end_state else -1
+                                       for i, succ in enumerate(self.successors)], dtype=np.intp)
+
+        # Follow each deterministic run to the first state that needs a draw (or the end).
+        self.jump_target = np.arange(n, dtype=np.intp)
+        self.jump_length = np.zeros(n, dtype=np.int64)
+        self.jump_visits = np.zeros((n, n), dtype=np.int64)
+        for start in range(n):
+            state, path = start, []
+            while self.deterministic[state] >= 0 and len(path) <= n:
+                path.append(state)
+                state = self.deterministic[state]
+            if path and len(path) <= n:
+                self.jump_target[start], self.jump_length[start] = state, len(path)
+                np.add.at(self.jump_visits[start], path, 1)
+        self._width = width
+        self._deterministic = self.deterministic.tolist()
+
+    def draw(self, states, bits):
+        """Next state for each entry of `states` from raw 64-bit words."""
+        slot = states << self.width_bits
+        slot |= (bits >> self.column_shift).view(np.int64)
+        flip = bits >= self.thresholds[slot]
+        slot <<= 1
+        slot += flip
+        return self.slots[slot]
+
+    def draw_one(self, state, uniforms):
+        """Scalar draw; takes a uniform from the iterator `uniforms` only if the row needs one."""
+        forced = self._deterministic[state]
+        if forced >= 0:
+            return forced
+        scaled = next(uniforms) * self._width
+        column = int(scaled)
+        kept, aliased = self._slots[state][column]
+        return kept if scaled - column < self._keep[state][column] else aliased
+
+
+def compile_chain(matrix, end_state=-1):
+    """CompiledChain for `matrix`, reused for repeated calls with the same matrix."""
+    matrix = np.ascontiguousarray(matrix, dtype=float)
+    key = (matrix.shape, matrix.tobytes(), end_state)
+    chain = _chain_cache.get(key)
+    if chain is None:
+        if len(_chain_cache) >= CHAIN_CACHE_SIZE:
+            _chain_cache.pop(next(iter(_chain_cache)))
+        chain = _chain_cache[key] = CompiledChain(matrix, end_state)
+    return chain
+
+
+def uniform_stream(block=256):
+    """Endless uniforms from the global numpy RNG, drawn a block at a time (for the scalar simulators)."""
+    while True:
+        yield from np.random.random_sample(block).tolist()
+
+
+def simulate_team_games(matrix, points, possessions_per_game, num_games, rng, start_state=0, end_state=-1, max_steps=15, draws=None):
+    """
+    Simulates `possessions_per_game` possessions for one team in each of `num_games` games.
+
+    Every game is a lane that plays its possessions back to back, so each step
+    advances all live games with one vectorized draw. Within a possession each
+    step adds the points of the current state, counts it and draws the next
+    state. After `max_steps` transitions (or on reaching `end_state`) the points
+    of the final state are added, matching the scalar simulators.
+
+    The matrix is compiled into a CompiledChain. Points and counts are booked
+    when a lane lands in a state, together with the deterministic run that
+    follows it, so forced moves (free throws, offensive rebounds, made shots)
+    cost no draw and no loop step; a run that would go past `max_steps` is
+    taken one state at a time as before. Random words come from `rng` (drawn
+    through the alias tables) unless `draws` is given: a callable
+    draws(games, possessions, steps) returning one 64-bit word per live lane,
+    keyed by game index, possession number and step within the possession
+    (see mathHelpers.varianceReduction.KeyedDraws). Keyed draws go through the
+    inverse-CDF TransitionSampler instead, since antithetic and stratified
+    draws need a monotone map from uniform to state.
+
+    Returns (score per game, per-state step counts, per-state final counts).
+    """
+    points = np.asarray(points)
+    n_states = len(points)
+    end_state %= n_states
+    scores = np.zeros(num_games, dtype=np.int64)
+    step_counts = np.zeros(n_states, dtype=np.int64)
+    final_counts = np.zeros(n_states, dtype=np.int64)
+    if possessions_per_game <= 0 or num_games <= 0 or start_state == end_state:
+        return scores, step_counts, final_counts
+
+    chain = compile_chain(matrix, end_state)
+    sampler = chain if draws is None else TransitionSampler(matrix)
+    # What landing in each state brings: its deterministic run, up to the next draw.
+    advance = chain.jump_length + 1
+    target = chain.jump_target
+    arrive_visits = chain.jump_visits + np.eye(n_states, dtype=np.int64)[target]
+    arrive_points = arrive_visits @ points
+    landings = np.zeros(n_states, dtype=np.int64)
+    undone = np.zeros(n_states, dtype=np.int64)
+
+    lanes = np.arange(num_games)
+    current = np.full(num_games, start_state, dtype=np.intp)
+    running = np.full(num_games, points[start_state], dtype=np.int64)
+    steps = np.zeros(num_games, dtype=np.int64)
+    remaining = np.full(num_games, possessions_per_game, dtype=np.int64)
+
+    while lanes.size:
+        if draws is None:
+            bits = rng.bit_generator.random_raw(lanes.size)
+        else:
+            bits = draws(lanes, possessions_per_game - remaining, steps)
+        landed = sampler.draw(current, bits)
+        landings += np.bincount(landed, minlength=n_states)
+        steps += advance[landed]
+        current = target[landed]
+        running += arrive_points[landed]
+
+        late = np.flatnonzero(steps >= max_steps)
+        if late.size:
+            # Runs that overshoot max_steps are undone: the lane stays where it landed.
+            over = late[steps[late] > max_steps]
+            if over.size:
+                first = landed[over]
+                steps[over] -= chain.jump_length[first]
+                current[over] = first
+                running[over] += points[first] - arrive_points[first]
+                undone += np.bincount(first, minlength=n_states)
+
+            # Possessions cut off by max_steps keep the points of the state they stopped in.
+            cut = late[(steps[late] >= max_steps) & (current[late] != end_state)]
+            final_counts += np.bincount(current[cut], minlength=n_states)
+            running[cut] += points[end_state]
+            current[cut] = end_state
+
+        # A lane that reaches the end starts its next possession on the same step.
+        at_end = current == end_state
+        remaining -= at_end
+        steps *= ~at_end
+        current -= (current - start_state) * at_end
+        if points[start_state]:
+            running += points[start_state] * (at_end & (remaining > 0))
+
+        finished = np.flatnonzero(at_end & (remaining == 0))
+        if finished.size:
+            scores[lanes[finished]] = running[finished]
+            keep = np.ones(lanes.size, dtype=bool)
+            keep[finished] = False
+            lanes, current, running, steps, remaining = (
+                lanes[keep], current[keep], running[keep], steps[keep], remaining[keep]
+            )
+
+    # Every state a lane passed through took a step there, except where it finished.
+    possessions = possessions_per_game * num_games
+    final_counts[end_state] += possessions - final_counts.sum()
+    step_counts += (landings - undone) @ arrive_visits + undone - final_counts
+    step_counts[start_state] += possessions
+    return scores, step_counts, final_counts
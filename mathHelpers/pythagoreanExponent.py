@@ -1,50 +1,125 @@
-from helpers.getTeams import getTeams
+from helpers.seasonData import load_season
+from helpers.teamRepository import DATA_DIR
 import numpy as np
 
-def best_pythagorean_exponent(file):
-    teams = getTeams(file)
-    exponents = np.arange(0.001, 20.001, 0.001)
+# Exponent grid searched by the original brute-force fit.
+MIN_EXPONENT = 0.001
+MAX_EXPONENT = 20.0
+EXPONENT_STEP = 0.001
+GOLDEN_RATIO = (np.sqrt(5) - 1) / 2
 
-    best_exponent = None
-    smallest_total_error = float('inf')
+def season_arrays(season):
+    """
+    Arrays of points for, points against (per 100 possessions, from
+    ADJOE/ADJDE and ADJ_T) and actual win percentage for a season file (read
+    from the columnar season cache) or an already loaded SeasonData. Teams
+    with missing or invalid data are skipped.
+    """
+    season = load_season(season)
+    adj_oe, adj_de, adj_tempo = season["ADJOE"], season["ADJDE"], season["ADJ_T"]
+    wins, games = season["W"], season["G"]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pts_for = adj_oe * 100 / adj_tempo
+        pts_against = adj_de * 100 / adj_tempo
+        actual = wins / games
+    valid = np.isfinite(pts_for) & np.isfinite(pts_against) & np.isfinite(actual) & (pts_for > 0) & (pts_against > 0)
+    return pts_for[valid], pts_against[valid], actual[valid]
 
-    for exp in exponents:
-        total_error = 0
-        valid_team_count = 0
+def exponent_errors(exponents, pts_for, pts_against, actual, chunk_size=2048):
+    """
+    Average absolute error of the Pythagorean expectation for every exponent,
+    evaluated as an (exponents x teams) matrix. pf^e / (pf^e + pa^e) is
+    computed as 1 / (1 + (pa/pf)^e) from the log ratio, which does not
+    overflow for large exponents. Exponents are processed in chunks to bound
+    memory.
+    """
+    exponents = np.atleast_1d(np.asarray(exponents, dtype=float))
+    log_ratio = np.log(pts_against / pts_for)
+    errors = np.empty(exponents.size)
+    for start in range(0, exponents.size, chunk_size):
+        block = exponents[start:start + chunk_size, None]
+        expected = 1.0 / (1.0 + np.exp(block * log_ratio))
+        errors[start:start + chunk_size] = np.abs(expected - actual).mean(axis=1)
+    return errors
 
-        for team in teams:
-            try:
-                adj_oe = float(team["ADJOE"])
-                adj_de = float(team["ADJDE"])
-                adj_tempo = float(team["ADJ_T"])
-                wins = float(team["W"])
-                games = float(team["G"])
+def _grid_search(arrays, low, high, step):
+    exponents = np.arange(low, high + step / 2, step)
+    errors = exponent_errors(exponents, *arrays)
+    best = int(np.argmin(errors))
+    return exponents[best], errors[best]
 
-                pts_for = adj_oe * 100 / adj_tempo
-                pts_against = adj_de * 100 / adj_tempo
+def _coarse_to_fine_search(arrays, low, high, step, coarse_step=0.1):
+    """Grid at `coarse_step`, then repeatedly zoom in around the best point at 10x finer steps."""
+    current = coarse_step
+    best, error = _grid_search(arrays, low, high, current)
+    while current > step:
+        finer = max(current / 10, step)
+        best, error = _grid_search(arrays, max(low, best - current), min(high, best + current), finer)
+        current = finer
+    return best, error
 
-                expected_win_pct = pts_for**exp / (pts_for**exp + pts_against**exp)
-                actual_win_pct = wins / games
+def _golden_section_search(arrays, low, high, tol):
+    """Golden-section search; assumes the error is unimodal in the exponent."""
+    error_at = lambda e: exponent_errors(e, *arrays)[0]
+    a, b = low, high
+    c, d = b - GOLDEN_RATIO * (b - a), a + GOLDEN_RATIO * (b - a)
+    fc, fd = error_at(c), error_at(d)
+    while b - a > tol:
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - GOLDEN_RATIO * (b - a)
+            fc = error_at(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + GOLDEN_RATIO * (b - a)
+            fd = error_at(d)
+    best = (a + b) / 2
+    return best, error_at(best)
 
+def fit_exponent(pts_for, pts_against, actual, mode="grid", low=MIN_EXPONENT, high=MAX_EXPONENT, step=EXPONENT_STEP):
+    """
+    Best exponent and its average error for already-parsed season arrays.
 
-                error = abs(expected_win_pct - actual_win_pct)
-                total_error += error
-                valid_team_count += 1
+    mode="grid" scans every `step` between `low` and `high` (same answer as
+    the original loop), "coarse" does a coarse-to-fine grid ending at `step`
+    resolution, and "golden" runs a golden-section search to within `step`.
+    """
+    arrays = (pts_for, pts_against, actual)
+    if mode == "grid":
+        best, error = _grid_search(arrays, low, high, step)
+    elif mode == "coarse":
+        best, error = _coarse_to_fine_search(arrays, low, high, step)
+    elif mode == "golden":
+        best, error = _golden_section_search(arrays, low, high, step)
+    else:
+        raise ValueError(f"Unknown mode '{mode}', expected 'grid', 'coarse' or 'golden'")
+    return float(best), float(error)
 
-            except (KeyError, ValueError, ZeroDivisionError):
-                continue  # Skip teams with missing or invalid data
+def season_exponent(season, mode="coarse"):
+    """Best exponent for a season file or SeasonData (see season_arrays), with a coarse-to-fine fit by default."""
+    return fit_exponent(*season_arrays(season), mode=mode)[0]
 
-        if valid_team_count == 0:
-            continue
-
-        avg_error = total_error / valid_team_count
-
-        if avg_error < smallest_total_error:
-            smallest_total_error = avg_error
-            best_exponent = exp
+def best_pythagorean_exponent(file, mode="grid"):
+    pts_for, pts_against, actual = season_arrays(file)
+    if actual.size == 0:
+        print(f"No valid team rows in {file}")
+        return None
 
+    best_exponent, smallest_total_error = fit_exponent(pts_for, pts_against, actual, mode=mode)
     print(f"Best exponent for {file}: {best_exponent:.3f} with average error: {smallest_total_error:.5f}")
     return best_exponent
 
+def season_files():
+    """Every per-season file (data/cbbXX.csv), oldest first."""
+    return sorted(path.name for path in DATA_DIR.glob("cbb[0-9][0-9].csv"))
+
+def best_pythagorean_exponents(files=None, mode="grid"):
+    """
+    Fits every season file (all data/cbbXX.csv by default) in one call.
+    Returns {file: best exponent}.
+    """
+    return {file: best_pythagorean_exponent(file, mode=mode) for file in (files or season_files())}
+
 # Run it
-best_pythagorean_exponent("cbb25.csv") # best for 2025 is 4.386 with average error of 0.09415
+if __name__ == "__main__":
+    best_pythagorean_exponent("cbb25.csv") # best for 2025 is 4.386 with average error of 0.09415
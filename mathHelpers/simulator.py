@@ -1,9 +1,9 @@
 import numpy as np
-from scipy.stats import norm
-from helpers.getTeams import getTeams
 from helpers.findTeam import findTeam
+from helpers.matchupCache import MatchupCache, matchup_key
 from mathHelpers.bayesian import probabilities
 from mathHelpers.unweighted import probabilitiesUnweighted
+from mathHelpers.possessionEngine import compile_chain, simulate_team_games, uniform_stream
 
 points_per_state = {
     'Start': 0,
@@ -20,13 +20,21 @@ points_per_state = {
 
 import numpy as np
 
-def simulate_game(team1_matrix, team2_matrix, points_per_state, num_possessions, show_progress=False):
-    import numpy as np
+def _norm_cdf(x, loc=0.0, scale=1.0):
+    """scipy.stats.norm.cdf, with scipy imported on first use (it is slow to load)."""
+    from scipy.stats import norm
+    return norm.cdf(x, loc=loc, scale=scale)
 
+def simulate_game(team1_matrix, team2_matrix, points_per_state, num_possessions, show_progress=False):
     states = list(points_per_state.keys())
-    state_index = {state: i for i, state in enumerate(states)}
-    state_counts = {state: 0 for state in states}
+    points = list(points_per_state.values())
+    end = len(states) - 1
+    state_counts = [0] * len(states)
     team_points = {1: 0, 2: 0}
+    # Rows are normalized once and drawn through alias tables (see possessionEngine.CompiledChain).
+    chains = {1: compile_chain(normalize_transition_matrix(team1_matrix)),
+              2: compile_chain(normalize_transition_matrix(team2_matrix))}
+    uniforms = uniform_stream()
 
     current_team = 1
     possession_count = 0
@@ -35,26 +43,20 @@ def simulate_game(team1_matrix, team2_matrix, points_per_state, num_possessions,
         if show_progress:
             print(f"\rPossession {possession_count + 1}/{num_possessions}", end="")
 
-        transition_matrix = team1_matrix if current_team == 1 else team2_matrix
-        current_state = 'Start'
+        draw = chains[current_team].draw_one
+        current_state = 0
         possession_count += 0.5
         steps = 0
 
-        while current_state != 'End' and steps < 10:
-            row = transition_matrix[state_index[current_state]]
-            row = np.maximum(row, 0)
-            total = row.sum()
-            next_state = 'End' if total == 0 else np.random.choice(states, p=row / total)
-
-            team_points[current_team] += points_per_state.get(next_state, 0)
-            state_counts[next_state] += 1
-
-            current_state = next_state
+        while current_state != end and steps < 10:
+            current_state = draw(current_state, uniforms)
+            team_points[current_team] += points[current_state]
+            state_counts[current_state] += 1
             steps += 1
 
         # Force End count if needed
-        if current_state != 'End':
-            state_counts['End'] += 1
+        if current_state != end:
+            state_counts[end] += 1
 
         current_team = 3 - current_team  # Switch teams
 
@@ -62,7 +64,7 @@ def simulate_game(team1_matrix, team2_matrix, points_per_state, num_possessions,
     if show_progress:
         print()
 
-    return team_points[1], team_points[2], state_counts
+    return team_points[1], team_points[2], dict(zip(states, state_counts))
 
 
 def create_transition_matrix(probs):
@@ -108,7 +110,6 @@ def simulate_matchup(team1_name, team2_name, num_simulations=500):
     print(f"\nSimulating matchup: {team1_name} vs {team2_name}")
 
     # Get team stats
-    teams = getTeams("cbb25.csv")
     team1_stats = findTeam(team1_name, "cbb25.csv")
     team2_stats = findTeam(team2_name, "cbb25.csv")
 
@@ -158,7 +159,7 @@ def simulate_matchup(team1_name, team2_name, num_simulations=500):
     diff_std = np.sqrt(team1_std**2 + team2_std**2)
 
     # Probability that Team 1 wins (normal dist. approximation)
-    p_team1_wins = 1 - norm.cdf(0, loc=diff_mean, scale=diff_std)
+    p_team1_wins = 1 - _norm_cdf(0, diff_mean, diff_std)
 
     print(f"\n{team1_avg:.1f} ± {team1_std:.1f}")
     print(f"{team2_avg:.1f} ± {team2_std:.1f}")
@@ -170,7 +171,6 @@ def unweighted_simulate_matchup(team1_name, team2_name, num_simulations=500):
     print(f"\nSimulating matchup: {team1_name} vs {team2_name}")
 
     # Get team stats
-    teams = getTeams("cbb25.csv")
     team1_stats = findTeam(team1_name, "cbb25.csv")
     team2_stats = findTeam(team2_name, "cbb25.csv")
 
@@ -220,7 +220,7 @@ def unweighted_simulate_matchup(team1_name, team2_name, num_simulations=500):
     diff_std = np.sqrt(team1_std**2 + team2_std**2)
 
     # Probability that Team 1 wins (normal dist. approximation)
-    p_team1_wins = 1 - norm.cdf(0, loc=diff_mean, scale=diff_std)
+    p_team1_wins = 1 - _norm_cdf(0, diff_mean, diff_std)
 
     print(f"\n{team1_avg:.1f} ± {team1_std:.1f}")
     print(f"{team2_avg:.1f} ± {team2_std:.1f}")
@@ -229,6 +229,120 @@ def unweighted_simulate_matchup(team1_name, team2_name, num_simulations=500):
 
     return team1_name if p_team1_wins > 0.5 else team2_name
 
+# --- Batched path ---
+
+# Per-pairing possessions and normalized matrices, shared by every batch call.
+_matchup_cache = MatchupCache()
+
+
+def normalize_transition_matrix(matrix):
+    """
+    The row handling simulate_game does at every step, done once: negative
+    entries are clipped to 0, rows are scaled to sum to 1 and empty rows go
+    straight to End.
+    """
+    matrix = np.maximum(np.asarray(matrix, dtype=float), 0)
+    totals = matrix.sum(axis=1)
+    empty = totals == 0
+    matrix[empty, -1] = 1
+    totals[empty] = 1
+    return matrix / totals[:, np.newaxis]
+
+
+def simulate_games_batch(team1_matrix, team2_matrix, points_per_state, num_possessions, num_games, rng=None, max_steps=10):
+    """
+    Plays `num_games` games of simulate_game at once on the vectorized
+    possession engine: same possession count (the half-possession loop gives
+    ceil(2 * num_possessions) possessions, team 1 first), same 10-step cap and
+    the same scoring on each state entered. Matrices must already be
+    normalized (see normalize_transition_matrix).
+    Returns (team1 scores, team2 scores, state counts summed over all games).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    states = list(points_per_state.keys())
+    points = np.array(list(points_per_state.values()))
+    total_possessions = int(np.ceil(num_possessions * 2))
+    team1_possessions = (total_possessions + 1) // 2
+    team2_possessions = total_possessions // 2
+
+    score1, steps1, final1 = simulate_team_games(team1_matrix, points, team1_possessions, num_games, rng, max_steps=max_steps)
+    score2, steps2, final2 = simulate_team_games(team2_matrix, points, team2_possessions, num_games, rng, max_steps=max_steps)
+
+    # simulate_game counts every state entered (never Start) and one End per possession.
+    counts = steps1 + steps2 + final1 + final2
+    counts[0] = 0
+    counts[-1] = total_possessions * num_games
+    return score1, score2, {state: int(n) for state, n in zip(states, counts)}
+
+
+def normal_win_probability(team1_scores, team2_scores):
+    """Team 1's win probability from the normal approximation to the score difference, as in simulate_matchup."""
+    diff_mean = np.mean(team1_scores) - np.mean(team2_scores)
+    diff_std = np.sqrt(np.std(team1_scores) ** 2 + np.std(team2_scores) ** 2)
+    if diff_std == 0:
+        return float(diff_mean > 0)
+    return float(1 - _norm_cdf(0, diff_mean, diff_std))
+
+
+def prepare_legacy_matchup(team1_name, team2_name, file="cbb25.csv", weighted=True):
+    """Possessions and normalized transition matrices for one pairing, or None if a team is missing."""
+    team1_stats = findTeam(team1_name, file)
+    team2_stats = findTeam(team2_name, file)
+    if not team1_stats or not team2_stats:
+        return None
+    possessions = (float(team1_stats["ADJ_T"]) + float(team2_stats["ADJ_T"])) / 2
+    model = probabilities if weighted else probabilitiesUnweighted
+    return {
+        'possessions': possessions,
+        'team1_matrix': normalize_transition_matrix(create_transition_matrix(model(team1_stats, team2_stats, possessions))),
+        'team2_matrix': normalize_transition_matrix(create_transition_matrix(model(team2_stats, team1_stats, possessions)))
+    }
+
+
+def batch_matchup(team1_name, team2_name, num_simulations=500, rng=None, file="cbb25.csv", weighted=True, cache=None):
+    """
+    simulate_matchup without the per-game loop: the pairing's matrices come
+    from `cache` (the module-wide matchup cache by default) and all games are
+    simulated as arrays. Returns a dict of score means/stds, the normal-approx
+    win probability and the winner, or None if a team is missing.
+    """
+    cache = _matchup_cache if cache is None else cache
+    key = matchup_key(team1_name, team2_name, file, weighted=weighted)
+    entry = cache.get(key)
+    if entry is None:
+        entry = prepare_legacy_matchup(team1_name, team2_name, file, weighted)
+        if entry is None:
+            return None
+        cache.put(key, entry)
+
+    team1_scores, team2_scores, state_counts = simulate_games_batch(
+        entry['team1_matrix'], entry['team2_matrix'], points_per_state, entry['possessions'], num_simulations, rng
+    )
+    p_team1_wins = normal_win_probability(team1_scores, team2_scores)
+    return {
+        'team1_mean': float(np.mean(team1_scores)), 'team1_std': float(np.std(team1_scores)),
+        'team2_mean': float(np.mean(team2_scores)), 'team2_std': float(np.std(team2_scores)),
+        'p_win': p_team1_wins,
+        'winner': team1_name if p_team1_wins > 0.5 else team2_name,
+        'state_counts': state_counts
+    }
+
+
+def simulate_matchup_batch(team1_name, team2_name, num_simulations=500, rng=None, verbose=True, weighted=True):
+    """Drop-in for simulate_matchup / unweighted_simulate_matchup on the batched path; returns the winner."""
+    result = batch_matchup(team1_name, team2_name, num_simulations, rng, weighted=weighted)
+    if result is None:
+        print(f"Could not get stats for one or both teams: {team1_name}, {team2_name}")
+        return None
+    if verbose:
+        print(f"\nSimulating matchup: {team1_name} vs {team2_name} ({num_simulations} games)")
+        print(f"{result['team1_mean']:.1f} ± {result['team1_std']:.1f}")
+        print(f"{result['team2_mean']:.1f} ± {result['team2_std']:.1f}")
+        print(f"Probability {team1_name} wins: {result['p_win']:.2%}")
+        print(f"Predicted winner: {result['winner']}")
+    return result['winner']
+
+
 def main():
     team1 = "florida"
     team2 = "missouri"
@@ -1,27 +1,22 @@
 import csv
 from pathlib import Path
-from helpers.getTeams import getTeams
 
-def variance(input_csv="cbb25", stats_csv="stats2025", output_csv="stats2025_with_variance.csv"):
-    # Step 1: Load base efficiency data
-    base_teams = getTeams(input_csv)
+import numpy as np
 
-    adj_oes = [float(team['ADJOE']) for team in base_teams]
-    adj_des = [float(team['ADJDE']) for team in base_teams]
+from helpers.seasonData import load_season
 
-    max_oe = max(adj_oes)
-    max_de = max(adj_des)
+def variance(input_csv="cbb25", stats_csv="stats2025", output_csv="stats2025_with_variance.csv"):
+    # Step 1: Load base efficiency data (columns from the season loader)
+    season = load_season(input_csv)
 
     # Compute normalized alpha and beta
-    for team in base_teams:
-        alpha = float(team['ADJOE']) / max_oe
-        beta = float(team['ADJDE']) / max_de
-        total = alpha + beta
-        team['Alpha'] = alpha / total
-        team['Beta'] = beta / total
+    alpha = season['ADJOE'] / np.nanmax(season['ADJOE'])
+    beta = season['ADJDE'] / np.nanmax(season['ADJDE'])
+    total = alpha + beta
 
     # Step 2: Create a dictionary for quick team lookup
-    alpha_beta_map = {team['Team']: {'Alpha': team['Alpha'], 'Beta': team['Beta']} for team in base_teams}
+    alpha_beta_map = {team: {'Alpha': a, 'Beta': b}
+                      for team, a, b in zip(season.teams.tolist(), (alpha / total).tolist(), (beta / total).tolist())}
 
     # Step 3: Read the stats2025 file and append alpha/beta where matched
     updated_rows = []
@@ -46,7 +41,9 @@ def variance(input_csv="cbb25", stats_csv="stats2025", output_csv="stats2025_wit
         writer.writerows(updated_rows)
 
     print(f"Updated file written to {output_path}")
-variance()
+
+if __name__ == "__main__":
+    variance()
 
 
 
@@ -0,0 +1,247 @@
+import numpy as np
+
+from mathHelpers.log5sim import simulate_games_batch
+
+# splitmix64 increment and finalizer multipliers.
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX2 = np.uint64(0x94D049BB133111EB)
+# How the first draw of each possession (the Start-state event) is made.
+START_DRAWS = ("random", "stratified", "sobol")
+
+
+def _mix(z):
+    """splitmix64 finalizer on a uint64 array (wrapping arithmetic)."""
+    with np.errstate(over='ignore'):
+        z = (z ^ (z >> np.uint64(30))) * MIX1
+        z = (z ^ (z >> np.uint64(27))) * MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def keyed_words(base, keys):
+    """64-bit words for integer `keys`: position `keys` of the splitmix64 stream seeded with `base`."""
+    with np.errstate(over='ignore'):
+        return _mix(np.uint64(base) + (np.asarray(keys, dtype=np.uint64) + np.uint64(1)) * GOLDEN_GAMMA)
+
+
+def _uniform_words(uniforms):
+    """Raw words whose top 53 bits encode `uniforms` (inverse of the sampler's conversion)."""
+    return (np.asarray(uniforms) * 9007199254740992.0).astype(np.uint64) << np.uint64(11)
+
+
+class KeyedDraws:
+    """
+    Random words for simulate_team_games keyed by (game, possession, step), so
+    the same game, possession and step get the same draw in every run that
+    shares the seed, whatever the matrices are: common random numbers.
+
+    With `antithetic`, games 2k and 2k+1 share key k and the odd game uses the
+    bitwise complement (uniform u becomes 1 - u). With `start_draws` other than
+    "random", the first draw of every possession (the Start-state event) comes
+    from a randomized point set over the games of the batch, one dimension per
+    possession: "stratified" is a Latin hypercube (each possession's draws
+    cover every 1/N stratum once), "sobol" a scrambled Sobol sequence.
+    """
+
+    def __init__(self, base, antithetic=False, start_draws="random", num_games=0, game_offset=0, num_possessions=0):
+        self.base = base
+        self.antithetic = antithetic
+        self.start_draws = start_draws
+        self.game_offset = game_offset
+        self.first_stratum = game_offset >> 1 if antithetic else game_offset
+        self.start_points = None
+        if start_draws != "random" and num_games > 0 and num_possessions > 0:
+            num_strata = (num_games + 1) // 2 if antithetic else num_games
+            self.start_points = start_point_set(start_draws, num_strata, num_possessions,
+                                                base ^ GOLDEN_GAMMA, self.first_stratum)
+
+    def __call__(self, games, possessions, steps):
+        games = np.asarray(games, dtype=np.uint64) + np.uint64(self.game_offset)
+        strata = games >> np.uint64(1) if self.antithetic else games
+        keys = (strata << np.uint64(32)) | (np.asarray(possessions, dtype=np.uint64) << np.uint64(16)) \
+            | np.asarray(steps, dtype=np.uint64)
+        words = keyed_words(self.base, keys)
+
+        if self.start_points is not None:
+            first = np.flatnonzero(steps == 0)
+            if first.size:
+                rows = (strata[first] - np.uint64(self.first_stratum)).astype(np.intp)
+                words[first] = _uniform_words(self.start_points[rows, possessions[first]])
+        if self.antithetic:
+            odd = (games & np.uint64(1)).astype(bool)
+            words[odd] = ~words[odd]
+        return words
+
+
+def start_point_set(kind, num_points, dimensions, seed_word, skip=0):
+    """
+    `num_points` x `dimensions` uniforms for the Start-state draws: a Latin
+    hypercube ("stratified", a fresh one per `skip`) or a scrambled Sobol
+    sequence ("sobol") advanced past the first `skip` points, so consecutive
+    batches continue one sequence.
+    """
+    import warnings
+    from scipy.stats import qmc
+
+    if kind == "sobol":
+        engine = qmc.Sobol(dimensions, scramble=True, seed=int(seed_word))
+        with warnings.catch_warnings():
+            # Sobol balance is best at powers of two; other sizes are still valid draws.
+            warnings.simplefilter("ignore", UserWarning)
+            if skip:
+                engine.fast_forward(skip)
+            return engine.random(num_points)
+    return qmc.LatinHypercube(dimensions, seed=int(keyed_words(seed_word, skip))).random(num_points)
+
+
+class SamplingPlan:
+    """
+    Variance-reduced sampling for simulate_games_batch / simulate_matchup.
+    Every run built from the same `seed` uses the same draw for a given
+    (team slot, game, possession, step), so two settings compared with one plan
+    see common random numbers. `seed` may be an int, None (fresh entropy) or a
+    numpy SeedSequence.
+    """
+
+    def __init__(self, seed=0, antithetic=True, start_draws="sobol"):
+        if start_draws not in START_DRAWS:
+            raise ValueError(f"start_draws must be one of {START_DRAWS}, got {start_draws!r}")
+        sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.seed_word = sequence.generate_state(1, np.uint64)[0]
+        self.antithetic = antithetic
+        self.start_draws = start_draws
+
+    def draws(self, stream, num_games, game_offset=0, num_possessions=0):
+        """
+        KeyedDraws for team slot `stream` over games game_offset .. game_offset
+        + num_games - 1, each with `num_possessions` possessions.
+        """
+        base = keyed_words(self.seed_word, stream)
+        return KeyedDraws(base, self.antithetic, self.start_draws, num_games, game_offset, num_possessions)
+
+
+# --- Diagnostics ---
+
+def _estimates(score1, score2):
+    diffs = (score1 - score2).astype(float)
+    return float(np.mean(diffs > 0)), float(np.mean(diffs))
+
+
+def _pair_correlation(score1, score2):
+    """Correlation of the spread between the two games of each antithetic pair."""
+    diffs = (score1 - score2).astype(float)
+    pairs = len(diffs) // 2
+    if pairs < 2:
+        return float('nan')
+    return float(np.corrcoef(diffs[0:2 * pairs:2], diffs[1:2 * pairs:2])[0, 1])
+
+
+def _variance_report(plain, reduced, num_games):
+    plain, reduced = np.asarray(plain), np.asarray(reduced)
+    report = {}
+    for i, name in enumerate(('p_win', 'spread')):
+        plain_var = float(np.var(plain[:, i], ddof=1))
+        reduced_var = float(np.var(reduced[:, i], ddof=1))
+        ratio = plain_var / reduced_var if reduced_var > 0 else float('inf')
+        report[name] = {
+            'plain_mean': float(np.mean(plain[:, i])),
+            'reduced_mean': float(np.mean(reduced[:, i])),
+            'plain_variance': plain_var,
+            'reduced_variance': reduced_var,
+            'variance_ratio': ratio,
+            # Plain simulations needed to match the reduced estimator's precision.
+            'equivalent_simulations': ratio * num_games
+        }
+    return report
+
+
+def variance_reduction_diagnostics(team1_matrix, team2_matrix, num_possessions, num_games=500, replications=20,
+                                   seed=0, antithetic=True, start_draws="sobol"):
+    """
+    Estimates the win probability and mean spread `replications` times with
+    plain draws and with a SamplingPlan, and compares each estimator's variance
+    across replications. `variance_ratio` is plain / reduced variance, i.e. the
+    factor fewer simulations the plan needs for the same precision.
+    """
+    plain_seeds = np.random.SeedSequence(seed).spawn(replications)
+    plan_seeds = np.random.SeedSequence(seed).spawn(2 * replications)[replications:]
+    plain, reduced, correlations = [], [], []
+    for plain_seed, plan_seed in zip(plain_seeds, plan_seeds):
+        score1, score2, _ = simulate_games_batch(team1_matrix, team2_matrix, num_possessions, num_games,
+                                                 rng=np.random.default_rng(plain_seed))
+        plain.append(_estimates(score1, score2))
+        plan = SamplingPlan(plan_seed, antithetic, start_draws)
+        score1, score2, _ = simulate_games_batch(team1_matrix, team2_matrix, num_possessions, num_games, sampling=plan)
+        reduced.append(_estimates(score1, score2))
+        if antithetic:
+            correlations.append(_pair_correlation(score1, score2))
+
+    report = _variance_report(plain, reduced, num_games)
+    report['settings'] = {'num_games': num_games, 'replications': replications,
+                          'antithetic': antithetic, 'start_draws': start_draws}
+    report['pair_correlation'] = float(np.mean(correlations)) if correlations else None
+    return report
+
+
+def common_random_numbers_diagnostics(matrices_a, matrices_b, num_possessions, num_games=500, replications=20,
+                                      seed=0, antithetic=False, start_draws="random"):
+    """
+    Variance of the estimated difference between two settings, e.g. two
+    weightings of the same matchup or two teams against one opponent, each a
+    (team1 matrix, team2 matrix) pair. "plain" runs the settings on independent
+    streams; "reduced" runs both with the same SamplingPlan.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(3 * replications)
+    plain, reduced = [], []
+    for r in range(replications):
+        runs = [simulate_games_batch(*matrices, num_possessions, num_games, rng=np.random.default_rng(s))
+                for matrices, s in ((matrices_a, seeds[r]), (matrices_b, seeds[replications + r]))]
+        plain.append(np.subtract(_estimates(*runs[0][:2]), _estimates(*runs[1][:2])))
+        plan = SamplingPlan(seeds[2 * replications + r], antithetic, start_draws)
+        runs = [simulate_games_batch(*matrices, num_possessions, num_games, sampling=plan)
+                for matrices in (matrices_a, matrices_b)]
+        reduced.append(np.subtract(_estimates(*runs[0][:2]), _estimates(*runs[1][:2])))
+
+    report = _variance_report(plain, reduced, num_games)
+    report['settings'] = {'num_games': num_games, 'replications': replications,
+                          'antithetic': antithetic, 'start_draws': start_draws}
+    return report
+
+
+def format_diagnostics(report, title="Variance reduction"):
+    settings = report['settings']
+    lines = [f"--- {title} ({settings['replications']} x {settings['num_games']} games, "
+             f"antithetic={settings['antithetic']}, start draws={settings['start_draws']}) ---",
+             f"{'Estimate':<10}{'Plain mean':>12}{'Reduced mean':>14}{'Plain var':>12}{'Reduced var':>13}{'Ratio':>8}"]
+    for name in ('p_win', 'spread'):
+        entry = report[name]
+        lines.append(f"{name:<10}{entry['plain_mean']:>12.4f}{entry['reduced_mean']:>14.4f}"
+                     f"{entry['plain_variance']:>12.3g}{entry['reduced_variance']:>13.3g}{entry['variance_ratio']:>7.2f}x")
+    if report.get('pair_correlation') is not None:
+        lines.append(f"Antithetic pair correlation (spread): {report['pair_correlation']:.3f}")
+    return "\n".join(lines)
+
+
+def main():
+    from helpers.findTeam import findTeam
+    from helperFunctions import data
+    from helpers.prepare_stats import prepare_team_stats, season_league_averages
+    from mathHelpers.log5sim import build_matchup_matrices
+
+    team1, team2, team3 = "duke", "houston", "auburn"
+    league_averages = season_league_averages("cbb25.csv")
+    stats = {team: prepare_team_stats(findTeam(team, "cbb25.csv"), data(team)) for team in (team1, team2, team3)}
+    possessions = (stats[team1]["poss_per_g"] + stats[team2]["poss_per_g"]) / 2
+    matrices = build_matchup_matrices(stats[team1], stats[team2], league_averages)
+
+    for start_draws in START_DRAWS:
+        print(format_diagnostics(variance_reduction_diagnostics(*matrices, possessions, start_draws=start_draws)))
+        print()
+    # Two teams against the same opponent: duke vs houston and auburn vs houston.
+    other = build_matchup_matrices(stats[team3], stats[team2], league_averages)
+    print(format_diagnostics(common_random_numbers_diagnostics(matrices, other, possessions),
+                             title=f"{team1} vs {team2} minus {team3} vs {team2}"))
+
+
+if __name__ == "__main__":
+    main()
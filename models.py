@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from typing import Any, Optional
+
+import numpy as np
 
 @dataclass
 class TeamStats:
@@ -65,4 +68,130 @@ class TeamStats:
             self.opp_fg3, self.opp_fg3a, self.opp_fg3_pct, self.opp_ft, self.opp_fta, self.opp_ft_pct,
             self.opp_orb, self.opp_drb, self.opp_trb, self.opp_ast, self.opp_stl, self.opp_blk,
             self.opp_tov, self.opp_pf, self.opp_pts, self.opp_efg
-        ) 
\ No newline at end of file
+        )
+
+
+# Numeric TeamStats fields in declaration order: the columns of a TeamStatsTable.
+STAT_COLUMNS = tuple(f.name for f in fields(TeamStats) if f.name != 'team_name')
+# Stats read back as int; the possession estimates are annotated int but built from floats.
+INT_COLUMNS = frozenset(f.name for f in fields(TeamStats) if f.type in (int, 'int')) - {'expected_possessions', 'possessions'}
+
+
+class TeamStatsTable:
+    """
+    Struct-of-arrays TeamStats for a whole league: `values` is one contiguous
+    float64 row per team (columns in STAT_COLUMNS order) and `names` the team
+    names. `table['fg2']` or `table.column('fg2')` is a zero-copy view of one
+    stat for every team; `table.get(name)` / `table[i]` returns a TeamStatsView
+    with the TeamStats attribute API.
+    """
+    __slots__ = ('names', 'values', 'index', '_columns')
+
+    def __init__(self, names, values):
+        self.names = list(names)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        if self.values.shape != (len(self.names), len(STAT_COLUMNS)):
+            raise ValueError(f"Expected a {len(self.names)} x {len(STAT_COLUMNS)} array, got {self.values.shape}")
+        self.index = {}
+        for i, name in enumerate(self.names):
+            self.index.setdefault(str(name).strip().lower(), i)
+        self._columns = {name: i for i, name in enumerate(STAT_COLUMNS)}
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds the table from TeamStats (or any objects with its attributes)."""
+        records = list(records)
+        values = np.array([[getattr(record, name) for name in STAT_COLUMNS] for record in records], dtype=np.float64)
+        return cls([record.team_name for record in records], values.reshape(len(records), len(STAT_COLUMNS)))
+
+    def column(self, name):
+        return self.values[:, self._columns[name]]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        return TeamStatsView(self, int(key) % len(self.names))
+
+    def get(self, team_name):
+        """TeamStatsView for `team_name` (case-insensitive), or None."""
+        row = self.index.get(str(team_name).strip().lower())
+        return None if row is None else TeamStatsView(self, row)
+
+    def __contains__(self, team_name):
+        return str(team_name).strip().lower() in self.index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return (TeamStatsView(self, row) for row in range(len(self.names)))
+
+
+class TeamStatsView:
+    """
+    One team's row of a TeamStatsTable, read through the TeamStats attribute
+    names (integer stats come back as int). Holds only the table and the row
+    number; nothing is copied until to_team_stats().
+    """
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def team_name(self):
+        return self.table.names[self.row]
+
+    def to_tuple(self):
+        return (self.team_name,) + tuple(getattr(self, name) for name in STAT_COLUMNS)
+
+    def to_team_stats(self):
+        return TeamStats(*self.to_tuple())
+
+    def __repr__(self):
+        return f"TeamStatsView({self.team_name!r})"
+
+
+def _column_property(index, name):
+    if name in INT_COLUMNS:
+        return property(lambda self: int(self.table.values[self.row, index]))
+    return property(lambda self: float(self.table.values[self.row, index]))
+
+
+for _index, _name in enumerate(STAT_COLUMNS):
+    setattr(TeamStatsView, _name, _column_property(_index, _name))
+
+
+@dataclass
+class MatchupResult:
+    """
+    Everything `simulate_matchup` computes for one game. Probabilities are for
+    team1; `win_prob` is the blend of the three components. Score
+    distributions are indexed by points: `team1_hist`/`team2_hist` are the
+    simulated frequencies or the exact pmf, and the raw simulated scores are
+    kept in `team1_scores`/`team2_scores` (None in analytic mode).
+    """
+    team1_name: str
+    team2_name: str
+    winner: str
+    win_prob: float
+    p_win_log5: float
+    p_win_pythag: float
+    p_win_barthag: float
+    pythag_weight: float
+    barthag_weight: float
+    team1_mean: float
+    team2_mean: float
+    spread: float
+    total: float
+    mode: str
+    num_simulations: int
+    team1_hist: Any = field(default=None, repr=False)
+    team2_hist: Any = field(default=None, repr=False)
+    team1_scores: Optional[Any] = field(default=None, repr=False)
+    team2_scores: Optional[Any] = field(default=None, repr=False)
+    state_counts: Optional[dict] = field(default=None, repr=False)
+    # Simulation modes: Wilson interval on p_win_log5; adaptive mode: why it stopped.
+    log5_interval: Optional[tuple] = None
+    stop_reason: Optional[str] = None
\ No newline at end of file
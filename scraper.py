@@ -1,33 +1,29 @@
-import requests
-from bs4 import BeautifulSoup
 from helperFunctions import getTeams
-from scraperFunctions.generalScraper import scrape_team_data, write_to_csv
+from scraperFunctions.pageFetcher import PageFetcher
+from scraperFunctions.statsRefresh import refresh_stats
 
 
-def main():
+def main(offline=False, full=False):
     print("\n===== STARTING SCRAPER =====")
     print("Getting list of teams...")
-    teams = getTeams()
-    print(f"Found {len(teams)} teams to scrape")
+    teams = list(dict.fromkeys(getTeams()))
+    print(f"Found {len(teams)} teams to check")
     
-    scraped_data = []
-    for i, team_name in enumerate(teams, 1):
-        print(f"\n[{i}/{len(teams)}] Scraping data for {team_name}...")
-        team_data = scrape_team_data(team_name)
-        if team_data:
-            print(f"✓ Successfully scraped data for {team_name}")
-            scraped_data.append(team_data)
-        else:
-            print(f"✗ Failed to scrape data for {team_name}")
+    # Only teams whose games played changed since the last run are re-scraped (--full: all of them)
+    with PageFetcher(offline=offline) as fetcher:
+        summary = refresh_stats(teams, fetcher, force=full)
     
-    print(f"\nSuccessfully scraped data for {len(scraped_data)} out of {len(teams)} teams")
+    for team_name in summary['failed']:
+        print(f"✗ Failed to scrape data for {team_name}")
+    print(f"Fetcher: {fetcher.stats['requests']} requests, {fetcher.stats['cache_hits']} cache hits, "
+          f"{fetcher.stats['revalidated']} revalidated, {fetcher.stats['retries']} retries")
     
-    # Write the scraped data to a CSV file
-    print("\nWriting data to CSV file...")
-    write_to_csv(scraped_data)
-    print("CSV file updated successfully")
+    print(f"\nScraped {summary['scraped']} teams ({summary['unchanged']} unchanged, {len(summary['failed'])} failed)")
+    print(f"stats2025.csv: {summary['updated']} rows updated, {summary['inserted']} inserted; "
+          f"{summary['caches_invalidated']} cached matchups invalidated")
     
     print("\n===== SCRAPER COMPLETED =====")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import sys
+    main(offline="--offline" in sys.argv, full="--full" in sys.argv)
\ No newline at end of file
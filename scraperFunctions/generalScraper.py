@@ -1,247 +1,284 @@
 import sys
 sys.path.append(r'C:\Users\alber\Documents\cbbGamePredictorUpdated')
 from helperFunctions import getTeams, data
-import requests
-from bs4 import BeautifulSoup
 import csv
 from models import TeamStats
 import os
+from html.parser import HTMLParser
+from scraperFunctions.pageFetcher import PageFetcher
 
-def scrape_team_data(team_name):
-    # Construct the URL with the team name
-    url = f"https://www.sports-reference.com/cbb/schools/{team_name}/men/2025.html"
-    
-    # Send a GET request to the website
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for HTTP errors (e.g., 404, 429)
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to retrieve data for {team_name}. Error: {e}")
-        return None
-    
-    # Check if the request was successful
-    if response.status_code != 200:
-        print(f"Failed to retrieve data for {team_name}. Status code: {response.status_code}")
+try:
+    from lxml import html as lxml_html  # optional, faster parse backend
+except ImportError:
+    lxml_html = None
+
+SEASON = 2025
+_default_fetcher = None
+
+def default_fetcher():
+    """Process-wide PageFetcher (pooled session, rate limit, on-disk cache), created on first use."""
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = PageFetcher()
+    return _default_fetcher
+
+def team_page_path(team_name, season=SEASON):
+    return f"/cbb/schools/{team_name}/men/{season}.html"
+
+def fetch_team_html(team_name, fetcher=None, season=SEASON):
+    """Raw HTML of a team's season page (from the response cache when fresh), or None."""
+    fetcher = fetcher or default_fetcher()
+    return fetcher.fetch(team_page_path(team_name, season))
+
+def scrape_team_data(team_name, fetcher=None, season=SEASON):
+    html = fetch_team_html(team_name, fetcher, season)
+    if html is None:
+        print(f"Failed to retrieve data for {team_name}.")
         return None
-    
-    # Parse the HTML content using BeautifulSoup
-    soup = BeautifulSoup(response.content, "html.parser")
-    
-    # Add new code to get advanced stats using XPath
-    team_bpm = 0.0
-    try:
-        # Use full XPath to find the BPM cell directly
-        bpm_cell = soup.select_one('html > body > div:nth-child(4) > div:nth-child(5) > div:nth-child(12) > div:nth-child(5) > div:nth-child(1) > table > tfoot > tr > td:nth-child(25)')
-        if bpm_cell:
-            # Try multiple ways to get the BPM value
-            if bpm_cell.string and bpm_cell.string.strip():
-                team_bpm = float(bpm_cell.string.strip())
-                print(f"Found team BPM from string: {team_bpm}")
-            elif bpm_cell.get('csk'):
-                team_bpm = float(bpm_cell.get('csk'))
-                print(f"Found team BPM from csk: {team_bpm}")
-            elif bpm_cell.get_text(strip=True):
-                team_bpm = float(bpm_cell.get_text(strip=True))
-                print(f"Found team BPM from text: {team_bpm}")
+    return parse_team_html(html, team_name)
+
+def scrape_teams(team_names, fetcher=None, season=SEASON, backend=None):
+    """
+    Fetches every team page concurrently through `fetcher`, then parses them.
+    Returns {team_name: stats dict or None}. Pass PageFetcher(offline=True)
+    to re-parse cached pages without touching the network.
+    """
+    fetcher = fetcher or default_fetcher()
+    paths = {team_name: team_page_path(team_name, season) for team_name in team_names}
+    pages = fetcher.fetch_all(paths.values())
+
+    results = {}
+    for team_name, path in paths.items():
+        html = pages.get(path)
+        if html is None:
+            print(f"Failed to retrieve data for {team_name}.")
+            results[team_name] = None
         else:
-            print("BPM cell not found using XPath")
-    except (AttributeError, ValueError) as e:
-        print(f"Error extracting BPM using XPath: {e}")
-        team_bpm = 0.0
+            results[team_name] = parse_team_html(html, team_name, backend)
+    return results
+
+# --- Parse stage ---
+# Counting stats read from the first Team/Opponent totals cells on the page.
+TEAM_COUNT_STATS = ["games", "mp", "fg", "fga", "fg2", "fg2a", "fg3", "fg3a", "ft", "fta",
+                    "orb", "drb", "trb", "ast", "stl", "blk", "tov", "pf", "pts"]
+OPP_COUNT_STATS = ["opp_" + stat for stat in TEAM_COUNT_STATS if stat not in ("games", "mp")]
+# Percentages, and the made/attempted pair used when the cell is blank or missing.
+PCT_STATS = {
+    "fg_pct": ("fg", "fga"), "fg2_pct": ("fg2", "fg2a"), "fg3_pct": ("fg3", "fg3a"), "ft_pct": ("ft", "fta"),
+    "opp_fg_pct": ("opp_fg", "opp_fga"), "opp_fg2_pct": ("opp_fg2", "opp_fg2a"),
+    "opp_fg3_pct": ("opp_fg3", "opp_fg3a"), "opp_ft_pct": ("opp_ft", "opp_fta")
+}
+PARSER_BACKENDS = ("lxml", "stdlib")
+
+class _StatCellParser(HTMLParser):
+    """
+    Streams a page once, keeping the text and attributes of the first
+    <td data-stat=...> for every stat (what soup.find would return) and the
+    first BPM cell inside a table footer (the team row of the advanced table).
+    Tables inside HTML comments are skipped, as BeautifulSoup does.
+    """
 
-    # Scraping data for team
-    games_element = soup.find("td", {"data-stat": "games"})
-    mp_element = soup.find("td", {"data-stat": "mp"})
-    fg_element = soup.find("td", {"data-stat": "fg"})
-    fga_element = soup.find("td", {"data-stat": "fga"})
-    fg_pct_element = soup.find("td", {"data-stat": "fg_pct"})
-    fg2_element = soup.find("td", {"data-stat": "fg2"})
-    fg2a_element = soup.find("td", {"data-stat": "fg2a"})
-    fg2_pct_element = soup.find("td", {"data-stat": "fg2_pct"})
-    fg3_element = soup.find("td", {"data-stat": "fg3"})
-    fg3a_element = soup.find("td", {"data-stat": "fg3a"})
-    fg3_pct_element = soup.find("td", {"data-stat": "fg3_pct"})
-    ft_element = soup.find("td", {"data-stat": "ft"})
-    fta_element = soup.find("td", {"data-stat": "fta"})
-    ft_pct_element = soup.find("td", {"data-stat": "ft_pct"})
-    orb_element = soup.find("td", {"data-stat": "orb"})
-    drb_element = soup.find("td", {"data-stat": "drb"})
-    trb_element = soup.find("td", {"data-stat": "trb"})
-    ast_element = soup.find("td", {"data-stat": "ast"})
-    stl_element = soup.find("td", {"data-stat": "stl"})
-    blk_element = soup.find("td", {"data-stat": "blk"})
-    tov_element = soup.find("td", {"data-stat": "tov"})
-    pf_element = soup.find("td", {"data-stat": "pf"})
-    pts_element = soup.find("td", {"data-stat": "pts"})
-    bpm_element = soup.find("td", {"data-stat": "bpm"})
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cells = {}
+        self.footer_bpm = None
+        self._tfoot_depth = 0
+        self._cell = None
 
-    # Scraping data for opposing team
-    opp_fg_element = soup.find("td", {"data-stat": "opp_fg"})
-    opp_fga_element = soup.find("td", {"data-stat": "opp_fga"})
-    opp_fg_pct_element = soup.find("td", {"data-stat": "opp_fg_pct"})
-    opp_fg2_element = soup.find("td", {"data-stat": "opp_fg2"})
-    opp_fg2a_element = soup.find("td", {"data-stat": "opp_fg2a"})
-    opp_fg2_pct_element = soup.find("td", {"data-stat": "opp_fg2_pct"})
-    opp_fg3_element = soup.find("td", {"data-stat": "opp_fg3"})
-    opp_fg3a_element = soup.find("td", {"data-stat": "opp_fg3a"})
-    opp_fg3_pct_element = soup.find("td", {"data-stat": "opp_fg3_pct"})
-    opp_ft_element = soup.find("td", {"data-stat": "opp_ft"})
-    opp_fta_element = soup.find("td", {"data-stat": "opp_fta"})
-    opp_ft_pct_element = soup.find("td", {"data-stat": "opp_ft_pct"})
-    opp_orb_element = soup.find("td", {"data-stat": "opp_orb"})
-    opp_drb_element = soup.find("td", {"data-stat": "opp_drb"})
-    opp_trb_element = soup.find("td", {"data-stat": "opp_trb"})
-    opp_ast_element = soup.find("td", {"data-stat": "opp_ast"})
-    opp_stl_element = soup.find("td", {"data-stat": "opp_stl"})
-    opp_blk_element = soup.find("td", {"data-stat": "opp_blk"})
-    opp_tov_element = soup.find("td", {"data-stat": "opp_tov"})
-    opp_pf_element = soup.find("td", {"data-stat": "opp_pf"})
-    opp_pts_element = soup.find("td", {"data-stat": "opp_pts"})
+    def handle_starttag(self, tag, attrs):
+        if tag == "td":
+            self._close_cell()
+            attrs = dict(attrs)
+            if "data-stat" in attrs:
+                self._cell = (attrs["data-stat"], attrs, [], self._tfoot_depth > 0)
+        elif tag == "tfoot":
+            self._tfoot_depth += 1
+        elif tag == "tr":
+            self._close_cell()
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "tr"):
+            self._close_cell()
+        elif tag == "tfoot":
+            self._close_cell()
+            self._tfoot_depth = max(0, self._tfoot_depth - 1)
+
+    def handle_data(self, data):
+        if self._cell:
+            self._cell[2].append(data)
+
+    def _close_cell(self):
+        if self._cell is None:
+            return
+        stat, attrs, parts, in_footer = self._cell
+        self._cell = None
+        cell = ("".join(parts).strip(), attrs)
+        self.cells.setdefault(stat, cell)
+        if in_footer and stat == "bpm" and self.footer_bpm is None:
+            self.footer_bpm = cell
+
+def _extract_with_stdlib(html):
+    parser = _StatCellParser()
+    parser.feed(html.decode("utf-8", "replace") if isinstance(html, bytes) else html)
+    parser.close()
+    parser._close_cell()
+    return parser.cells, parser.footer_bpm
+
+def _extract_with_lxml(html):
+    root = lxml_html.document_fromstring(html)
+    cells = {}
+    for td in root.iter("td"):
+        stat = td.get("data-stat")
+        if stat is not None and stat not in cells:
+            cells[stat] = (td.text_content().strip(), dict(td.attrib))
+    footer = root.xpath('//tfoot//td[@data-stat="bpm"]')
+    footer_bpm = (footer[0].text_content().strip(), dict(footer[0].attrib)) if footer else None
+    return cells, footer_bpm
+
+def extract_stat_cells(html, backend=None):
+    """
+    One pass over a team page. Returns ({data-stat: (text, attributes)} for the
+    first cell of each stat, footer BPM cell or None). `backend` is "lxml"
+    (default when installed) or "stdlib" (html.parser, no tree is built).
+    """
+    backend = backend or ("lxml" if lxml_html is not None else "stdlib")
+    if backend == "lxml":
+        if lxml_html is None:
+            raise ImportError("lxml is not installed; use backend='stdlib'")
+        return _extract_with_lxml(html)
+    if backend == "stdlib":
+        return _extract_with_stdlib(html)
+    raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+
+def _footer_bpm_value(cell):
+    """Team BPM from the footer cell's text, falling back to its csk sort key; 0.0 if absent."""
+    if cell is None:
+        print("Team BPM cell not found")
+        return 0.0
+    text, attrs = cell
+    try:
+        return float(text or attrs.get("csk") or 0.0)
+    except ValueError as e:
+        print(f"Error extracting team BPM: {e}")
+        return 0.0
+
+def parse_team_html(html, team_name, backend=None):
+    """
+    Extracts the team and opponent season totals from a team page's HTML.
+    Returns None (after printing which) if counting stats are missing or
+    malformed; a blank percentage cell is recomputed from made/attempted.
+    """
+    cells, footer_bpm = extract_stat_cells(html, backend)
+
+    missing = [stat for stat in TEAM_COUNT_STATS + OPP_COUNT_STATS if not cells.get(stat, ("",))[0]]
+    if missing:
+        print(f"Missing stats for {team_name}: {', '.join(missing)}")
+        return None
 
     try:
-        # Convert team stats
-        games = int(games_element.get_text(strip=True))
-        mp = int(mp_element.get_text(strip=True))
-        fg = int(fg_element.get_text(strip=True))
-        fga = int(fga_element.get_text(strip=True))
-        fg_pct = float(fg_pct_element.get_text(strip=True))
-        fg2 = int(fg2_element.get_text(strip=True))
-        fg2a = int(fg2a_element.get_text(strip=True))
-        fg2_pct = float(fg2_pct_element.get_text(strip=True))
-        fg3 = int(fg3_element.get_text(strip=True))
-        fg3a = int(fg3a_element.get_text(strip=True))
-        fg3_pct = float(fg3_pct_element.get_text(strip=True))
-        ft = int(ft_element.get_text(strip=True))
-        fta = int(fta_element.get_text(strip=True))
-        ft_pct = float(ft_pct_element.get_text(strip=True))
-        orb = int(orb_element.get_text(strip=True))
-        drb = int(drb_element.get_text(strip=True))
-        trb = int(trb_element.get_text(strip=True))
-        ast = int(ast_element.get_text(strip=True))
-        stl = int(stl_element.get_text(strip=True))
-        blk = int(blk_element.get_text(strip=True))
-        tov = int(tov_element.get_text(strip=True))
-        pf = int(pf_element.get_text(strip=True))
-        pts = int(pts_element.get_text(strip=True))
-        bpm = float(bpm_element.get('data-sort', '0.0')) if bpm_element else 0.0
-        print(bpm)
-        # Convert opposing team stats
-        opp_fg = int(opp_fg_element.get_text(strip=True))
-        opp_fga = int(opp_fga_element.get_text(strip=True))
-        opp_fg_pct = float(opp_fg_pct_element.get_text(strip=True))
-        opp_fg2 = int(opp_fg2_element.get_text(strip=True))
-        opp_fg2a = int(opp_fg2a_element.get_text(strip=True))
-        opp_fg2_pct = float(opp_fg2_pct_element.get_text(strip=True))
-        opp_fg3 = int(opp_fg3_element.get_text(strip=True))
-        opp_fg3a = int(opp_fg3a_element.get_text(strip=True))
-        opp_fg3_pct = float(opp_fg3_pct_element.get_text(strip=True))
-        opp_ft = int(opp_ft_element.get_text(strip=True))
-        opp_fta = int(opp_fta_element.get_text(strip=True))
-        opp_ft_pct = float(opp_ft_pct_element.get_text(strip=True))
-        opp_orb = int(opp_orb_element.get_text(strip=True))
-        opp_drb = int(opp_drb_element.get_text(strip=True))
-        opp_trb = int(opp_trb_element.get_text(strip=True))
-        opp_ast = int(opp_ast_element.get_text(strip=True))
-        opp_stl = int(opp_stl_element.get_text(strip=True))
-        opp_blk = int(opp_blk_element.get_text(strip=True))
-        opp_tov = int(opp_tov_element.get_text(strip=True))
-        opp_pf = int(opp_pf_element.get_text(strip=True))
-        opp_pts = int(opp_pts_element.get_text(strip=True))
+        stats = {stat: int(cells[stat][0].replace(",", "")) for stat in TEAM_COUNT_STATS + OPP_COUNT_STATS}
+        for stat, (made, attempted) in PCT_STATS.items():
+            text = cells.get(stat, ("",))[0]
+            if text:
+                stats[stat] = float(text)
+            else:
+                stats[stat] = stats[made] / stats[attempted] if stats[attempted] else 0.0
     except ValueError as e:
         print(f"Failed to convert points to integers for {team_name}. Error: {e}")
         return None
-        
-    efg = (fg + 0.5 * fg3) / fga
-    opp_efg = (opp_fg + 0.5 * opp_fg3) / opp_fga
-    
-    print("finished scrape_team_data")
-    print(mp)
-    print(fg)
+    team_bpm = _footer_bpm_value(footer_bpm)
+
+    fg, fga, fg3 = stats["fg"], stats["fga"], stats["fg3"]
+    opp_fg, opp_fga, opp_fg3 = stats["opp_fg"], stats["opp_fga"], stats["opp_fg3"]
+    efg = (fg + 0.5 * fg3) / fga if fga else 0.0
+    opp_efg = (opp_fg + 0.5 * opp_fg3) / opp_fga if opp_fga else 0.0
     
     # Return raw data dictionary
     return {
         "Team Name": team_name,
-        "Games": games,
-        "Minutes Played": mp,
+        "Games": stats["games"],
+        "Minutes Played": stats["mp"],
         "Field Goals Made": fg,
         "Field Goals Attempted": fga,
-        "Field Goal Percentage": fg_pct,
-        "2P Made": fg2,
-        "2P Attempted": fg2a,
-        "2P Percentage": fg2_pct,
+        "Field Goal Percentage": stats["fg_pct"],
+        "2P Made": stats["fg2"],
+        "2P Attempted": stats["fg2a"],
+        "2P Percentage": stats["fg2_pct"],
         "3P Made": fg3,
-        "3P Attempted": fg3a,
-        "3P Percentage": fg3_pct,
-        "Free Throws Made": ft,
-        "Free Throws Attempted": fta,
-        "Free Throw Percentage": ft_pct,
-        "Offensive Rebounds": orb,
-        "Defensive Rebounds": drb,
-        "Total Rebounds": trb,
-        "Assists": ast,
-        "Steals": stl,
-        "Blocks": blk,
-        "Turnovers": tov,
-        "Personal Fouls": pf,
-        "Total Points": pts,
+        "3P Attempted": stats["fg3a"],
+        "3P Percentage": stats["fg3_pct"],
+        "Free Throws Made": stats["ft"],
+        "Free Throws Attempted": stats["fta"],
+        "Free Throw Percentage": stats["ft_pct"],
+        "Offensive Rebounds": stats["orb"],
+        "Defensive Rebounds": stats["drb"],
+        "Total Rebounds": stats["trb"],
+        "Assists": stats["ast"],
+        "Steals": stats["stl"],
+        "Blocks": stats["blk"],
+        "Turnovers": stats["tov"],
+        "Personal Fouls": stats["pf"],
+        "Total Points": stats["pts"],
         "Effective Field Goal %": efg,
-        "Expected Possessions": tov + fg2a + fg3a + ft // 2.15,
+        "Expected Possessions": stats["tov"] + stats["fg2a"] + stats["fg3a"] + stats["ft"] // 2.15,
         "Possessions": 0,
-        "Box Plus/Minus": team_bpm,
         "Opponent Field Goals Made": opp_fg,
         "Opponent Field Goals Attempted": opp_fga,
-        "Opponent Field Goal Percentage": opp_fg_pct,
-        "Opponent 2P Made": opp_fg2,
-        "Opponent 2P Attempted": opp_fg2a,
-        "Opponent 2P Percentage": opp_fg2_pct,
+        "Opponent Field Goal Percentage": stats["opp_fg_pct"],
+        "Opponent 2P Made": stats["opp_fg2"],
+        "Opponent 2P Attempted": stats["opp_fg2a"],
+        "Opponent 2P Percentage": stats["opp_fg2_pct"],
         "Opponent 3P Made": opp_fg3,
-        "Opponent 3P Attempted": opp_fg3a,
-        "Opponent 3P Percentage": opp_fg3_pct,
-        "Opponent Free Throws Made": opp_ft,
-        "Opponent Free Throws Attempted": opp_fta,
-        "Opponent Free Throw Percentage": opp_ft_pct,
-        "Opponent Offensive Rebounds": opp_orb,
-        "Opponent Defensive Rebounds": opp_drb,
-        "Opponent Total Rebounds": opp_trb,
-        "Opponent Assists": opp_ast,
-        "Opponent Steals": opp_stl,
-        "Opponent Blocks": opp_blk,
-        "Opponent Turnovers": opp_tov,
-        "Opponent Personal Fouls": opp_pf,
-        "Opponent Total Points": opp_pts,
+        "Opponent 3P Attempted": stats["opp_fg3a"],
+        "Opponent 3P Percentage": stats["opp_fg3_pct"],
+        "Opponent Free Throws Made": stats["opp_ft"],
+        "Opponent Free Throws Attempted": stats["opp_fta"],
+        "Opponent Free Throw Percentage": stats["opp_ft_pct"],
+        "Opponent Offensive Rebounds": stats["opp_orb"],
+        "Opponent Defensive Rebounds": stats["opp_drb"],
+        "Opponent Total Rebounds": stats["opp_trb"],
+        "Opponent Assists": stats["opp_ast"],
+        "Opponent Steals": stats["opp_stl"],
+        "Opponent Blocks": stats["opp_blk"],
+        "Opponent Turnovers": stats["opp_tov"],
+        "Opponent Personal Fouls": stats["opp_pf"],
+        "Opponent Total Points": stats["opp_pts"],
         "Opponent Effective Field Goal %": opp_efg,
         "Box Plus/Minus": team_bpm
     }
 
+# Column order of stats2025.csv.
+CSV_HEADERS = [
+    "Team Name", "Games", "Minutes Played", "Field Goals Made", "Field Goals Attempted", 
+    "Field Goal Percentage", "2P Made", "2P Attempted", 
+    "2P Percentage", "3P Made", "3P Attempted", "3P Percentage",
+    "Free Throws Made", "Free Throws Attempted", "Free Throw Percentage",
+    "Offensive Rebounds", "Defensive Rebounds", "Total Rebounds",
+    "Assists", "Steals", "Blocks", "Turnovers", "Personal Fouls", "Total Points", "Effective Field Goal %",
+    "Expected Possessions", "Possessions",
+    "Opponent Field Goals Made", "Opponent Field Goals Attempted", "Opponent Field Goal Percentage",
+    "Opponent 2P Made", "Opponent 2P Attempted", "Opponent 2P Percentage",
+    "Opponent 3P Made", "Opponent 3P Attempted", "Opponent 3P Percentage",
+    "Opponent Free Throws Made", "Opponent Free Throws Attempted", "Opponent Free Throw Percentage",
+    "Opponent Offensive Rebounds", "Opponent Defensive Rebounds", "Opponent Total Rebounds",
+    "Opponent Assists", "Opponent Steals", "Opponent Blocks", "Opponent Turnovers",
+    "Opponent Personal Fouls", "Opponent Total Points", "Opponent Effective Field Goal %",
+    "Box Plus/Minus"
+]
+
 def write_to_csv(data, filename="stats2025.csv"):
-    # Define the headers
-    headers = [
-        "Team Name", "Games", "Minutes Played", "Field Goals Made", "Field Goals Attempted", 
-        "Field Goal Percentage", "2P Made", "2P Attempted", 
-        "2P Percentage", "3P Made", "3P Attempted", "3P Percentage",
-        "Free Throws Made", "Free Throws Attempted", "Free Throw Percentage",
-        "Offensive Rebounds", "Defensive Rebounds", "Total Rebounds",
-        "Assists", "Steals", "Blocks", "Turnovers", "Personal Fouls", "Total Points", "Effective Field Goal %",
-        "Expected Possessions", "Possessions",
-        "Opponent Field Goals Made", "Opponent Field Goals Attempted", "Opponent Field Goal Percentage",
-        "Opponent 2P Made", "Opponent 2P Attempted", "Opponent 2P Percentage",
-        "Opponent 3P Made", "Opponent 3P Attempted", "Opponent 3P Percentage",
-        "Opponent Free Throws Made", "Opponent Free Throws Attempted", "Opponent Free Throw Percentage",
-        "Opponent Offensive Rebounds", "Opponent Defensive Rebounds", "Opponent Total Rebounds",
-        "Opponent Assists", "Opponent Steals", "Opponent Blocks", "Opponent Turnovers",
-        "Opponent Personal Fouls", "Opponent Total Points", "Opponent Effective Field Goal %",
-        "Box Plus/Minus"
-    ]
+    headers = CSV_HEADERS
     
     # Write data to file
     try:
-        # Check if file exists to determine if we need to write headers
-        file_exists = os.path.exists(filename)
+        # Only a new (or empty) file gets the header; appends go below the existing one
+        write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
         
         with open(filename, mode="a", newline="", encoding="utf-8") as file:
             writer = csv.DictWriter(file, fieldnames=headers)
             
-            writer.writeheader()
+            if write_header:
+                writer.writeheader()
             
             if isinstance(data, dict):
                 writer.writerow(data)
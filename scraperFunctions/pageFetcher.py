@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://www.sports-reference.com"
+CACHE_DIR = Path(__file__).parent.parent / "data" / ".cache" / "pages"
+
+# sports-reference blocks clients that go over ~20 requests a minute.
+REQUESTS_PER_MINUTE = 20
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Default for PageFetcher's `cache`, so that an explicit None can mean "no cache".
+_DEFAULT_CACHE = object()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most
+    `capacity`. `acquire` blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ResponseCache:
+    """
+    On-disk cache of page bodies keyed by URL. Each entry is a `<sha1>.html`
+    body plus a `<sha1>.json` sidecar holding the URL, ETag, Last-Modified
+    and fetch time. Entries younger than `max_age` seconds are served without
+    a request; older ones are revalidated with If-None-Match /
+    If-Modified-Since. max_age=None never expires entries.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_age=24 * 60 * 60):
+        self.cache_dir = Path(cache_dir)
+        self.max_age = max_age
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.html", self.cache_dir / f"{key}.json"
+
+    def load(self, url):
+        """The cached entry for `url` ({'url', 'etag', 'last_modified', 'fetched_at', 'body'}), or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            entry['body'] = body_path.read_text(encoding='utf-8')
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return self.max_age is None or time.time() - entry['fetched_at'] < self.max_age
+
+    def store(self, url, body, headers=None):
+        headers = headers or {}
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time()
+        }
+        self._write(url, entry, body)
+        entry['body'] = body
+        return entry
+
+    def touch(self, entry):
+        """Marks a revalidated (304) entry as fetched now."""
+        entry = dict(entry, fetched_at=time.time())
+        body = entry.pop('body')
+        self._write(entry['url'], entry, None)
+        entry['body'] = body
+        return entry
+
+    def _write(self, url, entry, body):
+        # Write to temp files and rename so a crash never leaves a half-written entry.
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        if body is not None:
+            tmp = body_path.with_suffix(f".html.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(body, encoding='utf-8')
+            os.replace(tmp, body_path)
+        tmp = meta_path.with_suffix(f".json.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as file:
+            json.dump(entry, file)
+        os.replace(tmp, meta_path)
+
+
+def retry_delay(response, attempt, backoff):
+    """Seconds to wait before retrying: Retry-After if the server sent one, else exponential backoff with jitter."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return backoff * (2 ** attempt) * (1 + random.random() / 2)
+
+
+class PageFetcher:
+    """
+    Fetches pages through one pooled requests.Session, at most `max_workers`
+    at a time and no faster than `requests_per_minute`. 429/5xx responses and
+    connection errors are retried up to `max_retries` times with backoff.
+    Responses go through `cache` (a ResponseCache; by default one over
+    data/.cache/pages, None disables caching); with offline=True only cached bodies are returned and no request is made.
+
+    `base_url` is what relative paths are joined to, so a local stub server
+    can stand in for sports-reference.
+    """
+
+    def __init__(self, base_url=BASE_URL, max_workers=4, requests_per_minute=REQUESTS_PER_MINUTE,
+                 burst=1, cache=_DEFAULT_CACHE, max_retries=5, backoff=2.0, timeout=30, offline=False):
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst) if requests_per_minute else None
+        self.cache = ResponseCache() if cache is _DEFAULT_CACHE else cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.offline = offline
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = {'requests': 0, 'cache_hits': 0, 'revalidated': 0, 'retries': 0, 'failures': 0}
+        self._stats_lock = threading.Lock()
+
+    def url(self, path):
+        return path if path.startswith(('http://', 'https://')) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def fetch(self, path):
+        """Body of the page at `path` (cached or fetched), or None if it could not be retrieved."""
+        url = self.url(path)
+        cached = self.cache.load(url) if self.cache else None
+        if cached and (self.offline or self.cache.is_fresh(cached)):
+            self._count('cache_hits')
+            return cached['body']
+        if self.offline:
+            print(f"No cached page for {url}")
+            return None
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                self.bucket.acquire()
+            self._count('requests')
+            response = None
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                error = e
+            else:
+                if response.status_code == 304 and cached:
+                    self._count('revalidated')
+                    return self.cache.touch(cached)['body']
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                error = f"status code {response.status_code}"
+            if attempt < self.max_retries:
+                self._count('retries')
+                time.sleep(retry_delay(response, attempt, self.backoff))
+        else:
+            self._count('failures')
+            print(f"Failed to retrieve {url} after {self.max_retries + 1} attempts. Error: {error}")
+            return None
+
+        if response.status_code != 200:
+            self._count('failures')
+            print(f"Failed to retrieve {url}. Status code: {response.status_code}")
+            return None
+        body = response.text
+        if self.cache:
+            self.cache.store(url, body, response.headers)
+        return body
+
+    def fetch_all(self, paths):
+        """Fetches `paths` concurrently. Returns {path: body or None} in input order."""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            bodies = list(pool.map(self.fetch, paths))
+        return dict(zip(paths, bodies))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
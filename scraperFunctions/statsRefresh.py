@@ -0,0 +1,184 @@
+import csv
+import json
+import os
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+from helpers import matchupCache
+from helpers.teamRepository import DATA_DIR, get_repository, normalize_team_name
+from scraperFunctions.generalScraper import CSV_HEADERS, SEASON, default_fetcher, scrape_teams
+
+# Incremental refresh of stats2025.csv: one request for the league-wide games
+# played, then team pages only for teams whose game count moved since their
+# last scrape. Per-team state (games, timestamp) lives next to the other caches.
+STATE_FILE = DATA_DIR / ".cache" / "stats_refresh.json"
+KEY_COLUMN = "Team Name"
+
+
+def school_stats_path(season=SEASON):
+    return f"/cbb/seasons/men/{season}-school-stats.html"
+
+
+class _SchoolGamesParser(HTMLParser):
+    """Pulls (team slug, games) out of every row of the season's school stats table."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.games = {}
+        self._slug = None
+        self._stat = None
+        self._text = []
+        self._row_games = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "tr":
+            self._slug, self._row_games = None, None
+        elif tag == "td":
+            self._stat, self._text = attrs.get("data-stat"), []
+        elif tag == "a" and self._stat == "school_name":
+            parts = (attrs.get("href") or "").split("/")
+            if "schools" in parts and parts.index("schools") + 1 < len(parts):
+                self._slug = parts[parts.index("schools") + 1]
+
+    def handle_endtag(self, tag):
+        if tag == "td":
+            if self._stat == "g":
+                self._row_games = "".join(self._text).strip()
+            self._stat = None
+        elif tag == "tr" and self._slug and self._row_games and self._row_games.isdigit():
+            self.games.setdefault(self._slug, int(self._row_games))
+
+    def handle_data(self, data):
+        if self._stat:
+            self._text.append(data)
+
+
+def fetch_games_played(fetcher=None, season=SEASON):
+    """{team slug: games played} for the whole league from one page, or None if it could not be fetched."""
+    fetcher = fetcher or default_fetcher()
+    html = fetcher.fetch(school_stats_path(season))
+    if html is None:
+        return None
+    parser = _SchoolGamesParser()
+    parser.feed(html)
+    return parser.games
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Error reading refresh state {path}: {e}")
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def read_rows(filename):
+    """Rows of the stats CSV in file order ([] if it does not exist)."""
+    try:
+        with open(filename, "r", newline="", encoding="utf-8") as file:
+            return list(csv.DictReader(file))
+    except FileNotFoundError:
+        return []
+
+
+def upsert_rows(rows, filename="stats2025.csv", headers=CSV_HEADERS):
+    """
+    Replaces the rows of `filename` whose Team Name matches one of `rows` and
+    appends the rest, keeping file order. The new file is written next to the
+    old one and renamed over it, so readers see either version, never a mix.
+    Returns (updated, inserted) counts.
+    """
+    existing = read_rows(filename)
+    incoming = {normalize_team_name(row[KEY_COLUMN]): row for row in rows}
+    updated = 0
+    for i, row in enumerate(existing):
+        key = normalize_team_name(row.get(KEY_COLUMN, ""))
+        if key in incoming:
+            existing[i] = incoming.pop(key)
+            updated += 1
+    existing.extend(incoming.values())
+
+    path = Path(filename)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=headers, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(existing)
+    os.replace(tmp, path)
+    return updated, len(incoming)
+
+
+def invalidate_team_caches(teams, filename="stats2025.csv"):
+    """
+    Drops what was derived from the updated teams' rows: matchup cache entries
+    (prepared stats, matrices, resolved probabilities) for pairings with one of
+    them, and the stats repository's parsed records for them (the repository
+    reloads the file and keeps the other teams' records). League averages come
+    from the season files, not stats2025.csv, so they are untouched.
+    """
+    dropped = matchupCache.invalidate_teams(teams)
+    get_repository(filename, KEY_COLUMN).refresh()
+    return dropped
+
+
+def plan_refresh(teams, games_played, state, rows_present, force=False):
+    """
+    Teams to scrape: every team with `force`, otherwise those missing from the
+    CSV or the state, those whose games played differ from the state, and
+    those the league page does not list (no way to tell, so scrape).
+    """
+    stale = []
+    for team in teams:
+        key = normalize_team_name(team)
+        known = state.get(key)
+        current = (games_played or {}).get(team)
+        if force or key not in rows_present or known is None or current is None or known.get("games") != current:
+            stale.append(team)
+    return stale
+
+
+def refresh_stats(teams, fetcher=None, filename="stats2025.csv", state_path=STATE_FILE, force=False, season=SEASON):
+    """
+    Brings `filename` up to date for `teams`, scraping only the teams that
+    played since their last refresh. Returns a summary dict (checked, scraped,
+    updated, inserted, failed, unchanged, caches_invalidated).
+    """
+    fetcher = fetcher or default_fetcher()
+    state = load_state(state_path)
+    games_played = None if force else fetch_games_played(fetcher, season)
+    if games_played is None and not force:
+        print("Could not read league games played; every team will be scraped.")
+    rows_present = {normalize_team_name(row.get(KEY_COLUMN, "")) for row in read_rows(filename)}
+
+    stale = plan_refresh(teams, games_played, state, rows_present, force)
+    print(f"{len(stale)} of {len(teams)} teams changed since the last refresh")
+    results = scrape_teams(stale, fetcher, season) if stale else {}
+
+    scraped = {team: row for team, row in results.items() if row}
+    failed = [team for team, row in results.items() if not row]
+    summary = {'checked': len(teams), 'scraped': len(scraped), 'failed': failed,
+               'unchanged': len(teams) - len(stale), 'updated': 0, 'inserted': 0, 'caches_invalidated': 0}
+    if not scraped:
+        return summary
+
+    summary['updated'], summary['inserted'] = upsert_rows(list(scraped.values()), filename)
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+    for team, row in scraped.items():
+        state[normalize_team_name(team)] = {"games": int(row["Games"]), "scraped_at": now}
+    save_state(state, state_path)
+    summary['caches_invalidated'] = invalidate_team_caches(scraped, filename)
+    return summary